@@ -0,0 +1,228 @@
+"""Benchmarks every stage of building, exporting and laying out a content graph on a synthetic content repository.
+
+Run `python -m xsoar_dependency_graph.benchmark --output results.json` to write the results as JSON, and pass a
+previous results file as `--baseline` to fail on stages that got slower.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import TypeVar
+
+from .dependency_resolver import DependencyResolver
+from .layout import compute_layout, plotted_component
+from .parsers.basic_parser import BasicParser
+from .parsers.casetype_parser import CaseTypeParser
+from .parsers.integration_parser import IntegrationParser
+from .parsers.layout_parser import LayoutParser
+from .parsers.pack_parser import PackParser
+from .parsers.playbook_parser import PlaybookParser
+from .parsers.script_parser import ScriptParser
+from .synthetic import SyntheticRepoSpec, generate_content_repo
+from .xsoar_dependency_graph import ContentGraph
+
+STAGES = ("discovery", "loading", "ast_scan", "build", "resolution", "linking", "export", "layout")
+
+# Content files parsed by `GraphBuilder`, relative to a pack, and their parsers. Packs are parsed by `PackParser`
+ITEM_PARSERS: dict[str, type[BasicParser]] = {
+    "Playbooks/*.yml": PlaybookParser,
+    "Layouts/*.json": LayoutParser,
+    "IncidentTypes/*.json": CaseTypeParser,
+    "Integrations/**/*.yml": IntegrationParser,
+    "Scripts/**/*.yml": ScriptParser,
+}
+
+T = TypeVar("T")
+
+
+def _timed(timings: dict[str, float], stage: str, function: Callable[[], T]) -> T:
+    start = time.perf_counter()
+    result = function()
+    timings[stage] = time.perf_counter() - start
+    return result
+
+
+def _content_files(repo_path: Path) -> list[tuple[type[BasicParser], Path]]:
+    """Returns the content files of every pack along with their parser class. Packs are parsed from their directory."""
+    content_files: list[tuple[type[BasicParser], Path]] = []
+    for pack in sorted(repo_path.glob("Packs/*")):
+        content_files.append((PackParser, pack))
+        content_files.extend((parser_class, path) for pattern, parser_class in ITEM_PARSERS.items() for path in sorted(pack.glob(pattern)))
+    return content_files
+
+
+def generated_repo(work_path: Path, spec: SyntheticRepoSpec, seed: int) -> tuple[Path, Path, list[dict]]:
+    """Generates the synthetic repository for `spec` and `seed` in a subdirectory of `work_path` named after them,
+    unless a previous run already did. Generation is deterministic, so an existing tree is identical and reused.
+    Returns the repository path, the upstream repository path and the installed content."""
+    key = hashlib.sha256(json.dumps({"spec": asdict(spec), "seed": seed}, sort_keys=True).encode()).hexdigest()[:16]
+    path = work_path / f"synthetic-{key}"
+    # Written last, so a tree without it is incomplete and generated again
+    installed_path = path / "installed_content.json"
+    if not installed_path.exists():
+        shutil.rmtree(path, ignore_errors=True)
+        installed_content = generate_content_repo(path / "repo", spec, seed=seed, upstream_path=path / "upstream")
+        installed_path.write_text(json.dumps(installed_content))
+    return path / "repo", path / "upstream", json.loads(installed_path.read_text())
+
+
+def run_stages(
+    repo_path: Path,
+    upstream_path: Path,
+    installed_content: list[dict],
+    export_path: Path,
+    *,
+    export_format: str = "JSONL",
+    layout_engine: str = "barnes-hut",
+) -> tuple[dict[str, float], ContentGraph]:
+    """Runs every stage in `STAGES` once and returns the seconds spent in each, along with the built graph.
+
+    "discovery", "loading" and "ast_scan" show where parsing time goes: they find the content files the way
+    `GraphBuilder` does, construct their parsers, which load the files, and parse the scripts, which scans their
+    code for executed commands. "build" then parses the packs into a graph from scratch, without installed content,
+    so that "resolution" can resolve every content item against `installed_content` separately. "linking" links
+    the upstream packs.
+    """
+    timings: dict[str, float] = {}
+    content_files = _timed(timings, "discovery", lambda: _content_files(repo_path))
+    parsers = _timed(timings, "loading", lambda: [parser_class(path) for parser_class, path in content_files])
+    scripts = [parser for parser in parsers if isinstance(parser, ScriptParser) and not parser.is_bad_filepath(parser.script_path)]
+    _timed(timings, "ast_scan", lambda: [parser.parse() for parser in scripts])
+
+    content_graph = ContentGraph(repo_path=repo_path, upstream_repo_path=upstream_path)
+    build_stages = dict(content_graph.build_stages(pack_paths=None))
+
+    def build() -> None:
+        build_stages["custom"]()
+        # Building the upstream graph prints the packs it parses
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_stages["upstream"]()
+
+    def resolve() -> None:
+        resolver = DependencyResolver(installed_content)
+        graph = content_graph.custom_graph
+        for node in list(graph.nodes()):
+            resolver.add_dependency_nodes(node, graph)
+
+    _timed(timings, "build", build)
+    _timed(timings, "resolution", resolve)
+    _timed(timings, "linking", build_stages["linking"])
+    export_path.mkdir(parents=True, exist_ok=True)
+    _timed(timings, "export", lambda: content_graph.export(export_path, export_format))
+    _timed(timings, "layout", lambda: compute_layout(plotted_component(content_graph.custom_graph), engine=layout_engine))
+    return timings, content_graph
+
+
+def run_benchmark(
+    work_path: Path,
+    spec: SyntheticRepoSpec | None = None,
+    *,
+    seed: int = 0,
+    repeat: int = 3,
+    export_format: str = "JSONL",
+    layout_engine: str = "barnes-hut",
+) -> dict:
+    """Generates a synthetic content repository in `work_path` (see `generated_repo`) and runs all `STAGES` on it
+    `repeat` times.
+
+    Returns JSON serializable results: the repository `spec` and `seed`, the size of the built graph, the Python
+    version and platform, and the minimum, median and individual run times of every stage in seconds.
+    """
+    spec = spec or SyntheticRepoSpec()
+    repo_path, upstream_path, installed_content = generated_repo(work_path, spec, seed)
+    runs: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    for run in range(repeat):
+        timings, content_graph = run_stages(
+            repo_path, upstream_path, installed_content, work_path / f"export-{run}", export_format=export_format, layout_engine=layout_engine
+        )
+        for stage, seconds in timings.items():
+            runs[stage].append(seconds)
+    graph = content_graph.custom_graph
+    return {
+        "spec": asdict(spec),
+        "seed": seed,
+        "repeat": repeat,
+        "nodes": graph.number_of_nodes(),
+        "edges": graph.number_of_edges(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": {stage: {"min": min(times), "median": statistics.median(times), "runs": times} for stage, times in runs.items()},
+    }
+
+
+def compare_results(
+    results: dict, baseline: dict, *, tolerance: float = 0.25, min_seconds: float = 0.005, statistic: str = "min"
+) -> dict[str, float]:
+    """Compares the stage timings in `results` with those in `baseline`, e.g. a stored `run_benchmark` result.
+
+    Returns the ratio of current to baseline time of every stage that got more than `tolerance` and more than
+    `min_seconds` slower, so an empty result means no regressions. The absolute threshold keeps timer noise in very
+    short stages from being reported. Stages missing from the baseline are ignored. Both results have to be for the
+    same synthetic repository.
+    """
+    if results.get("spec") != baseline.get("spec") or results.get("seed") != baseline.get("seed"):
+        msg = "Benchmark results and baseline were run on different synthetic repositories"
+        raise ValueError(msg)
+    regressions = {}
+    for stage, timings in results["stages"].items():
+        if stage not in baseline["stages"]:
+            continue
+        current, previous = timings[statistic], baseline["stages"][stage][statistic]
+        ratio = current / max(previous, 1e-9)
+        if ratio > 1 + tolerance and current - previous > min_seconds:
+            regressions[stage] = ratio
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for spec_field in fields(SyntheticRepoSpec):
+        parser.add_argument(f"--{spec_field.name.replace('_', '-')}", type=type(spec_field.default), default=spec_field.default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--export-format", default="JSONL")
+    parser.add_argument("--layout-engine", default="barnes-hut")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage, as a fraction")
+    parser.add_argument(
+        "--work-dir", type=Path, help="directory for the generated repository, reused by later runs, a temporary one by default"
+    )
+    args = parser.parse_args(argv)
+
+    spec = SyntheticRepoSpec(**{spec_field.name: getattr(args, spec_field.name) for spec_field in fields(SyntheticRepoSpec)})
+    with tempfile.TemporaryDirectory() if args.work_dir is None else contextlib.nullcontext(args.work_dir) as work_dir:
+        results = run_benchmark(
+            Path(work_dir),
+            spec,
+            seed=args.seed,
+            repeat=args.repeat,
+            export_format=args.export_format,
+            layout_engine=args.layout_engine,
+        )
+    print(f"Graph with {results['nodes']} nodes and {results['edges']} edges")
+    for stage, timings in results["stages"].items():
+        print(f"{stage:<12} min {timings['min']:8.3f}s  median {timings['median']:8.3f}s")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare_results(results, json.loads(args.baseline.read_text()), tolerance=args.tolerance)
+        for stage, ratio in regressions.items():
+            print(f"REGRESSION: {stage} is {ratio:.2f}x slower than the baseline")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -52,6 +52,18 @@ class DependencyResolver:
 
         return content_map
 
+    def get_known_items(self) -> set[str]:
+        """Returns the names of all automations, playbooks and integration commands in installed content."""
+        if not self._map:
+            return set()
+        known = set()
+        for pack in self._map.values():
+            known.update(pack["automations"])
+            known.update(pack["playbooks"])
+            for commands in pack["integrations"].values():
+                known.update(commands)
+        return known
+
     def add_dependency_nodes(self, name: str, graph: Graph) -> None:
         """Searches for a content item across all packs and adds edges to the graph."""
         self._add_script_dependency(name, graph)
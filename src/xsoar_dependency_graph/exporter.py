@@ -1,26 +1,191 @@
+import hashlib
+import io
+import json
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
 
 import networkx as nx
 
-SUPPORTED_OUTPUT_FORMATS = ["GML", "GraphML"]
+from .writers.basic_writer import COMPRESSION_SUFFIXES, BasicWriter, GraphWriter, compression_from_suffix, open_output, safe_file_names
+from .writers.gml_writer import GMLWriter
+from .writers.graphml_writer import GraphMLWriter
+from .writers.html_writer import HTMLWriter
+from .writers.jsonl_writer import JSONLWriter
+from .writers.neo4j_writer import Neo4jWriter
+from .writers.snapshot_writer import SnapshotWriter
+
+SUPPORTED_OUTPUT_FORMATS = ["GML", "GraphML", "HTML", "JSONL", "Neo4j", "Snapshot"]
+
+# Writer class and default file name for each output format
+_WRITERS: dict[str, tuple[type[GraphWriter], str]] = {
+    "GML": (GMLWriter, "output.gml"),
+    "GraphML": (GraphMLWriter, "output.graphml"),
+    "HTML": (HTMLWriter, "output.html"),
+    "JSONL": (JSONLWriter, "output.jsonl"),
+    "Neo4j": (Neo4jWriter, "neo4j"),
+    "Snapshot": (SnapshotWriter, "snapshot"),
+}
+
+# Shard holding edges between packs, and nodes that don't belong to any pack
+CROSS_PACK_SHARD = "_cross_pack"
+SHARD_MANIFEST = "manifest.json"
+
+
+def _shard_of(node: str, data: dict) -> str:
+    if data.get("node_type") == "Content Pack":
+        return node
+    return data.get("pack_name") or CROSS_PACK_SHARD
+
+
+def _write_shard(
+    writer_class: type[BasicWriter], shard: nx.Graph, filepath: Path, compression: str | None, previous_hash: str | None
+) -> str:
+    """Serializes a shard and writes it to `filepath` unless its content hash equals `previous_hash`. The hash is
+    computed over the uncompressed content, since compressed output may embed timestamps."""
+    buffer = io.StringIO()
+    writer_class(shard).write_stream(buffer)
+    content = buffer.getvalue()
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if content_hash != previous_hash or not filepath.exists():
+        with open_output(filepath, compression) as stream:
+            stream.write(content)
+    return content_hash
+
+
+NodePredicate = Callable[[str, dict], bool]
+EdgePredicate = Callable[[str, str, dict], bool]
 
 
 class Exporter:
-    def __init__(self, graph: nx.Graph) -> None:
-        self.graph = graph
+    def __init__(
+        self,
+        graph: nx.Graph,
+        nodes: Iterable[str] | None = None,
+        node_predicate: NodePredicate | None = None,
+        edge_predicate: EdgePredicate | None = None,
+    ) -> None:
+        """Exports `graph`, optionally restricted to the nodes in `nodes` and/or the nodes and edges for which
+        `node_predicate(node, data)` and `edge_predicate(source, target, data)` are true. Edges are only exported
+        when both endpoints are. Restrictions are applied through a read-only view, so nothing is copied."""
+        self.graph = self._restrict(graph, nodes, node_predicate, edge_predicate)
+
+    @staticmethod
+    def _restrict(
+        graph: nx.Graph, nodes: Iterable[str] | None, node_predicate: NodePredicate | None, edge_predicate: EdgePredicate | None
+    ) -> nx.Graph:
+        if nodes is None and node_predicate is None and edge_predicate is None:
+            return graph
+        node_set = set(nodes) if nodes is not None else None
+
+        def filter_node(node: str) -> bool:
+            if node_set is not None and node not in node_set:
+                return False
+            return node_predicate is None or node_predicate(node, graph.nodes[node])
+
+        def filter_edge(source: str, target: str) -> bool:
+            return edge_predicate is None or edge_predicate(source, target, graph.edges[source, target])
+
+        return nx.subgraph_view(graph, filter_node=filter_node, filter_edge=filter_edge)
 
-    def export(self, output_path: Path, output_format: str) -> str:
+    def export(self, output_path: Path, output_format: str, file_name: str | None = None, compression: str | None = None) -> str:
+        """Streams the graph to `output_path`/`file_name` in `output_format`. `compression` is one of "gzip", "bz2"
+        or "xz". If not given, it is inferred from the file name suffix (.gz, .bz2, .xz). Otherwise, the matching
+        suffix is appended to the file name if it is missing. Formats writing several files, such as "Neo4j", use
+        `file_name` as a directory name and compress each file. "Snapshot" can't be compressed."""
         if output_format not in SUPPORTED_OUTPUT_FORMATS:
             msg = f"Output format {output_format} not one of {','.join(SUPPORTED_OUTPUT_FORMATS)}"
             raise ValueError(msg)
-
-        if output_format == "GML":
-            output_path = Path(output_path) / "output.gml"
-            nx.write_gml(self.graph, output_path)
-        elif output_format == "GraphML":
-            output_path = Path(output_path) / "output.graphml"
-            nx.write_graphml(self.graph, output_path)
-        else:
-            msg = f"Invalid output format. Expected one of {','.join(SUPPORTED_OUTPUT_FORMATS)}"
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            msg = f"Compression {compression} not one of {','.join(COMPRESSION_SUFFIXES)}"
             raise ValueError(msg)
+
+        writer_class, default_file_name = _WRITERS[output_format]
+        filepath = Path(output_path) / (file_name or default_file_name)
+        if not writer_class.writes_directory:
+            if compression is None:
+                compression = compression_from_suffix(filepath)
+            elif filepath.suffix != COMPRESSION_SUFFIXES[compression]:
+                filepath = filepath.with_name(filepath.name + COMPRESSION_SUFFIXES[compression])
+
+        writer_class(self.graph).write(filepath, compression)
         return str(self.graph)
+
+    def _partition(self) -> tuple[dict[str, list[str]], dict[str, list[tuple[str, str]]]]:
+        """Splits the graph into one shard per pack (by `pack_name`) and a shard for everything crossing packs.
+        Returns the nodes and edges of every shard, without their attributes, in graph order."""
+        shard_of = {}
+        shard_nodes: dict[str, list[str]] = {CROSS_PACK_SHARD: []}
+        for node, data in self.graph.nodes(data=True):
+            shard_of[node] = _shard_of(node, data)
+            shard_nodes.setdefault(shard_of[node], []).append(node)
+        shard_edges: dict[str, list[tuple[str, str]]] = {name: [] for name in shard_nodes}
+        for source, target in self.graph.edges():
+            shard = shard_of[source] if shard_of[source] == shard_of[target] else CROSS_PACK_SHARD
+            shard_edges[shard].append((source, target))
+        return shard_nodes, shard_edges
+
+    def _shard_graph(self, nodes: list[str], edges: list[tuple[str, str]]) -> nx.Graph:
+        """Builds a shard from its nodes and edges. Endpoints of cross pack edges appear without attributes."""
+        shard = nx.Graph()
+        shard.add_nodes_from((node, self.graph.nodes[node]) for node in nodes)
+        shard.add_edges_from((source, target, self.graph.edges[source, target]) for source, target in edges)
+        return shard
+
+    def export_shards(
+        self, output_path: Path, output_format: str, compression: str | None = None, max_workers: int | None = None
+    ) -> dict:
+        """Writes one file per content pack to `output_path`, plus a shard with edges between packs and nodes that
+        don't belong to any pack. Shards are serialized in parallel by up to `max_workers` processes.
+
+        A manifest with the content hash of every shard is written to `output_path`/manifest.json. Shards whose
+        hash matches the previous manifest are not rewritten, and files of shards that no longer exist are removed.
+        Returns the manifest. Only single file formats can be sharded.
+        """
+        if output_format not in SUPPORTED_OUTPUT_FORMATS or _WRITERS[output_format][0].writes_directory:
+            msg = f"Output format {output_format} can't be sharded"
+            raise ValueError(msg)
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            msg = f"Compression {compression} not one of {','.join(COMPRESSION_SUFFIXES)}"
+            raise ValueError(msg)
+        writer_class, default_file_name = _WRITERS[output_format]
+        suffix = Path(default_file_name).suffix + (COMPRESSION_SUFFIXES[compression] if compression else "")
+        output_path = Path(output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        manifest_path = output_path / SHARD_MANIFEST
+        previous = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"shards": {}}
+        previous_hashes = {
+            name: shard["sha256"] for name, shard in previous["shards"].items() if previous.get("format") == output_format
+        }
+
+        shard_nodes, shard_edges = self._partition()
+        file_names = safe_file_names(shard_nodes, suffix)
+        previous_files = {name: shard["file"] for name, shard in previous["shards"].items()}
+        manifest_shards = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Shards are only built when submitted, and at most two per worker are pending at a time
+            max_pending = 2 * (max_workers or os.cpu_count() or 1)
+            pending: dict[Future, str] = {}
+            for name, nodes in shard_nodes.items():
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        manifest_shards[pending.pop(future)]["sha256"] = future.result()
+                previous_hash = previous_hashes.get(name) if previous_files.get(name) == file_names[name] else None
+                shard = self._shard_graph(nodes, shard_edges[name])
+                future = executor.submit(_write_shard, writer_class, shard, output_path / file_names[name], compression, previous_hash)
+                pending[future] = name
+                manifest_shards[name] = {"file": file_names[name], "nodes": shard.number_of_nodes(), "edges": shard.number_of_edges()}
+            for future, name in pending.items():
+                manifest_shards[name]["sha256"] = future.result()
+
+        current_files = set(file_names.values())
+        for shard in previous.get("shards", {}).values():
+            if shard["file"] not in current_files:
+                (output_path / shard["file"]).unlink(missing_ok=True)
+
+        manifest = {"format": output_format, "compression": compression, "shards": manifest_shards}
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        return manifest
@@ -1,5 +1,9 @@
 """Graph building logic for XSOAR content dependency graphs."""
 
+import hashlib
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import networkx as nx
@@ -13,18 +17,148 @@ from .parsers.pack_parser import PackParser
 from .parsers.playbook_parser import PlaybookParser
 from .parsers.script_parser import ScriptParser
 
+# Node attributes that depend on where the content was parsed from rather than on the content itself, or that
+# are derived from the whole graph by `analytics.compute_centrality` and `ContentGraph.compute_layout`.
+VOLATILE_ATTRIBUTES = frozenset({"source_path", "fingerprint", "degree_centrality", "betweenness", "pagerank", "x", "y"})
+
+# Content item types that are expected to be referenced by other content. Case types and integrations are
+# entry points in their own right and are never reported as orphans.
+ORPHAN_NODE_TYPES = frozenset({"Script", "Playbook", "Layout"})
+
+
+@dataclass
+class ReferenceReport:
+    """Reference problems found while building a content graph.
+
+    `dangling` and `ignored` map a referenced name to the content items referencing it.
+    """
+
+    dangling: dict[str, set[str]] = field(default_factory=dict)
+    orphans: set[str] = field(default_factory=set)
+    ignored: dict[str, set[str]] = field(default_factory=dict)
+
 
 class GraphBuilder:
-    """Builds content graphs by parsing XSOAR content packs and creating nodes/edges."""
+    """Builds content graphs by parsing XSOAR content packs and creating nodes/edges.
+
+    Graphs can be a `networkx.Graph` or a `sqlite_store.SQLiteGraph` for builds that should not be held in memory.
+    """
 
     def __init__(self, resolver: DependencyResolver) -> None:
         self._resolver = resolver
+        # Reverse dependency index (referenced item -> items referencing it) and the content items
+        # defined by each source file or directory. Both are filled in while parsing packs.
+        self.dependents: dict[str, set[str]] = {}
+        self.sources: dict[Path, set[str]] = {}
+        # Content items defined in the parsed packs (item -> node type) and references deliberately left out of
+        # the graph, such as Builtin commands (referenced name -> items referencing it)
+        self.definitions: dict[str, str] = {}
+        self.ignored_references: dict[str, set[str]] = {}
+        # Definitions and references produced by the pack currently being parsed, used for its fingerprint
+        self._contribution: list[str] = []
+
+    def _record_source(self, node: str, source_path: Path, graph: nx.Graph, *, owner: Path | None = None) -> None:
+        """Stores the file a node was parsed from as a node attribute, and indexes the node by `owner`
+        (defaults to the source file itself) for lookups by changed path."""
+        graph.nodes[node]["source_path"] = str(source_path)
+        self.definitions[node] = graph.nodes[node].get("node_type")
+        attributes = sorted((k, str(v)) for k, v in graph.nodes[node].items() if k not in VOLATILE_ATTRIBUTES)
+        self._contribution.append(repr((node, attributes)))
+        key = (owner or source_path).resolve()
+        self.sources.setdefault(key, set()).add(node)
+
+    def _record_references(self, edges: Iterable[tuple]) -> None:
+        """Adds (referencing item, referenced item) edges to the reverse dependency index."""
+        for edge in edges:
+            self.dependents.setdefault(edge[1], set()).add(edge[0])
+            self._contribution.append(repr(tuple(edge)))
+
+    def _record_ignored_references(self, edges: Iterable[tuple]) -> None:
+        """Adds references that were not added to the graph to the ignored references index."""
+        for edge in edges:
+            self.ignored_references.setdefault(edge[1], set()).add(edge[0])
+            self._contribution.append(repr(tuple(edge)))
+
+    def _fingerprint_contribution(self) -> str:
+        """Returns a stable hash of the current pack's contribution, independent of file system order."""
+        digest = hashlib.sha256()
+        for entry in sorted(self._contribution):
+            digest.update(entry.encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _is_linked_to_pack(graph: nx.Graph, pack_name: str, node: str) -> bool:
+        """Returns whether `node` is already connected to its pack node, in which case no edge from the pack to
+        `node` is added."""
+        if isinstance(graph, nx.Graph):
+            try:
+                nx.shortest_path(graph, source=pack_name, target=node)
+            except NetworkXNoPath:
+                return False
+            return True
+        # A path search over the database would read most of it. Storage backends such as SQLiteGraph instead
+        # check with an indexed query whether `node` is adjacent to the pack node or to another item of the pack
+        return graph.is_linked_to_pack(pack_name, node)
+
+    @staticmethod
+    def _item_owner(item_path: Path) -> Path:
+        """Returns the directory of split content items (e.g. Scripts/Foo/Foo.yml) so that changes to code,
+        tests and README files map to the item. Unified items are owned by the file itself."""
+        if item_path.parent.name == item_path.stem:
+            return item_path.parent
+        return item_path
+
+    def nodes_from_paths(self, paths: Iterable[Path]) -> set[str]:
+        """Maps file paths to the content items defined in them. Paths that are not part of a content item
+        map to their content pack node. Paths outside of any parsed pack are ignored."""
+        nodes: set[str] = set()
+        for path in paths:
+            resolved = Path(path).resolve()
+            for candidate in (resolved, *resolved.parents):
+                if candidate in self.sources:
+                    nodes.update(self.sources[candidate])
+                    break
+        return nodes
+
+    def get_dependents(self, nodes: Iterable[str]) -> set[str]:
+        """Returns `nodes` along with every content item that transitively references any of them."""
+        affected = set(nodes)
+        queue = deque(affected)
+        while queue:
+            node = queue.popleft()
+            for dependent in self.dependents.get(node, ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        return affected
+
+    def get_unresolved_references(self) -> set[str]:
+        """Returns the names referenced by parsed content items that are not defined in any parsed pack."""
+        return {name for name in self.dependents if name not in self.definitions}
+
+    def get_reference_report(self, external_definitions: Iterable[str] = ()) -> ReferenceReport:
+        """Reports dangling references, orphaned content items and ignored references in a single pass over the
+        definitions and references recorded while parsing. Names in `external_definitions` (e.g. upstream or
+        installed content) are not reported as dangling."""
+        external = set(external_definitions)
+        report = ReferenceReport(ignored={name: set(items) for name, items in self.ignored_references.items()})
+        for name, items in self.dependents.items():
+            # Builtin commands called from scripts are edges as well, but are reported as ignored
+            if name not in self.definitions and name not in external and name.split("|||")[-1] not in self.ignored_references:
+                report.dangling[name] = set(items)
+        for name, node_type in self.definitions.items():
+            if node_type in ORPHAN_NODE_TYPES and name not in self.dependents:
+                report.orphans.add(name)
+        return report
 
     def create_nodes_from_pack(self, packpath: Path, graph: nx.Graph) -> None:
         """Creates graph nodes from the contents of a content pack.
 
-        Currently creates nodes for playbooks, scripts, layouts, casetypes and integrations.
+        Currently creates nodes for playbooks, scripts, layouts, casetypes and integrations. The pack node gets a
+        `fingerprint` attribute hashing the definitions and references found in the pack, see `graph_diff.diff`.
         """
+        self._contribution = []
         try:
             parser = PackParser(packpath)
             parser.parse()
@@ -34,6 +168,7 @@ class GraphBuilder:
         except FileNotFoundError:
             print(f"WARNING: Failed to parse pack {packpath}. Ignoring pack.")
             return
+        self._record_source(pack_name, packpath, graph)
 
         playbooks = list(packpath.glob("Playbooks/*.yml"))
         if playbooks:
@@ -60,6 +195,8 @@ class GraphBuilder:
         if scripts:
             self._create_nodes_from_scripts(pack_name, scripts, graph)
 
+        graph.nodes[pack_name]["fingerprint"] = self._fingerprint_contribution()
+
     def _create_nodes_from_playbooks(self, pack_name: str, playbooks: list[Path], graph: nx.Graph) -> None:
         """Creates nodes for playbooks and their referenced scripts/playbooks."""
         for playbook_path in playbooks:
@@ -73,7 +210,10 @@ class GraphBuilder:
                 },
             }
             nx.set_node_attributes(graph, attributes)
+            self._record_source(playbook_id, playbook_path, graph)
             edges = parser.parse()
+            self._record_references(edges)
+            self._record_ignored_references(parser.ignored_references)
             script_edges = [(edge[0], edge[1]) for edge in edges if edge[2] == "Script"]
             playbook_edges = [(edge[0], edge[1]) for edge in edges if edge[2] == "Playbook"]
 
@@ -105,9 +245,7 @@ class GraphBuilder:
                 continue
             script_id = parser.get_script_id()
             graph.add_node(script_id, node_type="Script")
-            try:
-                nx.shortest_path(graph, source=pack_name, target=script_id)
-            except NetworkXNoPath:
+            if not self._is_linked_to_pack(graph, pack_name, script_id):
                 graph.add_edge(pack_name, script_id)
             attributes = {
                 script_id: {
@@ -116,7 +254,10 @@ class GraphBuilder:
                 },
             }
             nx.set_node_attributes(graph, attributes)
+            self._record_source(script_id, script_path, graph, owner=self._item_owner(script_path))
             edges = parser.parse()
+            self._record_references(edges)
+            self._record_ignored_references(parser.ignored_references)
             attributes = {}
             for edge in edges:
                 attributes[edge[1]] = {
@@ -141,7 +282,9 @@ class GraphBuilder:
                 },
             }
             nx.set_node_attributes(graph, attributes)
+            self._record_source(layout_id, layout_path, graph)
             edges = parser.parse()
+            self._record_references(edges)
             if edges:
                 graph.add_edges_from(edges)
             for edge in edges:
@@ -160,7 +303,9 @@ class GraphBuilder:
                 },
             }
             nx.set_node_attributes(graph, attributes)
+            self._record_source(casetype_id, casetype_path, graph)
             edges = parser.parse()
+            self._record_references(edges)
             attributes = {}
             for edge in edges:
                 graph.add_edge(edge[0], edge[1])
@@ -185,6 +330,8 @@ class GraphBuilder:
                 },
             }
             nx.set_node_attributes(graph, attributes)
+            owner = self._item_owner(integration_path)
+            self._record_source(integration_id, integration_path, graph, owner=owner)
             edges = parser.parse()
             attributes = {}
             for edge in edges:
@@ -195,3 +342,7 @@ class GraphBuilder:
             if edges:
                 graph.add_edges_from(edges)
                 nx.set_node_attributes(graph, attributes)
+            # Commands are defined by the integration, so a change to the integration affects every command caller
+            for edge in edges:
+                self._record_source(edge[1], integration_path, graph, owner=owner)
+            self._record_references((command, integration) for integration, command in edges)
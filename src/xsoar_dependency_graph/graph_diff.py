@@ -0,0 +1,95 @@
+"""Diffing of content graphs built from two revisions of a content repository."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import networkx as nx
+
+from .graph_builder import VOLATILE_ATTRIBUTES
+
+
+@dataclass
+class GraphDiff:
+    """Differences between two content graphs, limited to the content packs whose fingerprints differ."""
+
+    changed_packs: set[str] = field(default_factory=set)
+    added_nodes: set[str] = field(default_factory=set)
+    removed_nodes: set[str] = field(default_factory=set)
+    added_edges: set[tuple[str, str]] = field(default_factory=set)
+    removed_edges: set[tuple[str, str]] = field(default_factory=set)
+    changed_attributes: dict[str, dict[str, tuple[Any, Any]]] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not self.changed_packs
+
+
+def _pack_fingerprints(graph: nx.Graph) -> dict[str, str | None]:
+    """Returns the fingerprint of every content pack node in the graph."""
+    return {node: data.get("fingerprint") for node, data in graph.nodes(data=True) if data.get("node_type") == "Content Pack"}
+
+
+def _nodes_of_packs(graph: nx.Graph, packs: set[str]) -> set[str]:
+    """Returns the pack nodes in `packs` along with every node defined in one of them."""
+    nodes = {pack for pack in packs if graph.has_node(pack)}
+    nodes.update(node for node, pack_name in graph.nodes(data="pack_name") if pack_name in packs)
+    return nodes
+
+
+def _edge_key(u: str, v: str) -> tuple[str, str]:
+    """Orders the endpoints of an undirected edge so edges compare equal across graphs."""
+    return (u, v) if str(u) <= str(v) else (v, u)
+
+
+def _incident_edges(graph: nx.Graph, nodes: set[str]) -> set[tuple[str, str]]:
+    return {_edge_key(u, v) for u, v in graph.edges(nodes)}
+
+
+def _attribute_changes(old: dict, new: dict, ignored: frozenset[str]) -> dict[str, tuple[Any, Any]]:
+    keys = (old.keys() | new.keys()) - ignored
+    return {key: (old.get(key), new.get(key)) for key in sorted(keys) if old.get(key) != new.get(key)}
+
+
+def diff(old: nx.Graph, new: nx.Graph, ignore_attributes: Iterable[str] = ()) -> GraphDiff:
+    """Compares two content graphs built by `GraphBuilder`.
+
+    Content packs with identical fingerprints are assumed to be unchanged and are skipped entirely. For the
+    remaining packs, nodes, edges and node attributes touching the items defined in those packs are compared.
+    Packs without a fingerprint (e.g. pack nodes added by the dependency resolver) are never compared.
+    Changes of `VOLATILE_ATTRIBUTES`, such as centralities and layout positions, and of `ignore_attributes` are
+    not reported.
+    """
+    ignored = VOLATILE_ATTRIBUTES | frozenset(ignore_attributes)
+    old_fingerprints = _pack_fingerprints(old)
+    new_fingerprints = _pack_fingerprints(new)
+    result = GraphDiff()
+    for pack in old_fingerprints.keys() | new_fingerprints.keys():
+        old_fingerprint = old_fingerprints.get(pack)
+        new_fingerprint = new_fingerprints.get(pack)
+        if old_fingerprint is None and new_fingerprint is None:
+            continue
+        if old_fingerprint != new_fingerprint:
+            result.changed_packs.add(pack)
+    if not result.changed_packs:
+        return result
+
+    # Items may have moved between packs or been removed, so consider items owned in either graph
+    owned = _nodes_of_packs(old, result.changed_packs) | _nodes_of_packs(new, result.changed_packs)
+    old_owned = {node for node in owned if old.has_node(node)}
+    new_owned = {node for node in owned if new.has_node(node)}
+    old_edges = _incident_edges(old, old_owned)
+    new_edges = _incident_edges(new, new_owned)
+    result.added_edges = new_edges - old_edges
+    result.removed_edges = old_edges - new_edges
+
+    # Referenced nodes without a pack of their own are only reachable through edges of the changed packs
+    old_candidates = old_owned.union(*old_edges) if old_edges else old_owned
+    new_candidates = new_owned.union(*new_edges) if new_edges else new_owned
+    result.added_nodes = {node for node in new_candidates if not old.has_node(node)}
+    result.removed_nodes = {node for node in old_candidates if not new.has_node(node)}
+
+    for node in (old_candidates | new_candidates) - result.added_nodes - result.removed_nodes:
+        changes = _attribute_changes(old.nodes[node], new.nodes[node], ignored)
+        if changes:
+            result.changed_attributes[node] = changes
+    return result
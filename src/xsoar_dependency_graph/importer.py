@@ -0,0 +1,155 @@
+"""Reading of graphs exported by `Exporter` back into networkx graphs."""
+
+import bz2
+import gzip
+import json
+import lzma
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any
+from xml.etree.ElementTree import iterparse
+
+import networkx as nx
+
+from .snapshot import load_snapshot
+from .writers.basic_writer import compression_from_suffix
+from .writers.snapshot_writer import MANIFEST_FILE
+
+SUPPORTED_INPUT_FORMATS = ["GML", "GraphML", "JSONL", "Snapshot"]
+
+_FORMAT_SUFFIXES = {".gml": "GML", ".graphml": "GraphML", ".jsonl": "JSONL"}
+_GRAPHML_NAMESPACE = "{http://graphml.graphdrawing.org/xmlns}"
+_BOOLEANS = {"true": True, "false": False, "1": True, "0": False}
+
+
+def open_input(filepath: Path, mode: str = "rt") -> IO:
+    """Opens `filepath` for reading, decompressing files ending in .gz, .bz2 or .xz on the fly."""
+    compression = compression_from_suffix(filepath)
+    encoding = "utf-8" if "t" in mode else None
+    if compression == "gzip":
+        return gzip.open(filepath, mode, encoding=encoding)
+    if compression == "bz2":
+        return bz2.open(filepath, mode, encoding=encoding)
+    if compression == "xz":
+        return lzma.open(filepath, mode, encoding=encoding)
+    return filepath.open(mode, encoding=encoding)
+
+
+def detect_format(path: Path) -> str:
+    """Returns the format of an exported graph from its file name, ignoring any compression suffix."""
+    if path.is_dir() and (path / MANIFEST_FILE).exists():
+        return "Snapshot"
+    suffix = path.with_suffix("").suffix if compression_from_suffix(path) else path.suffix
+    if suffix not in _FORMAT_SUFFIXES:
+        msg = f"Unable to detect graph format of {path}. Expected one of {','.join(SUPPORTED_INPUT_FORMATS)}"
+        raise ValueError(msg)
+    return _FORMAT_SUFFIXES[suffix]
+
+
+def _convert(value: str | None, graphml_type: str) -> Any:  # noqa: ANN401
+    value = value or ""
+    if graphml_type == "boolean":
+        return _BOOLEANS[value.strip().lower()]
+    if graphml_type in ("int", "long"):
+        return int(value)
+    if graphml_type in ("float", "double"):
+        return float(value)
+    return value
+
+
+def _remove_children(graph_elements: list[Any], element: Any) -> None:  # noqa: ANN401
+    """Clears a processed node or edge element and detaches the children of its <graph> parent, which have all been
+    processed or are still referenced by pending parser events."""
+    element.clear()
+    if graph_elements:
+        del graph_elements[-1][:]
+
+
+def read_graphml(filepath: Path) -> nx.Graph:
+    """Reads GraphML with `iterparse`, removing every node and edge element from the document once it has been added
+    to the graph, so the XML document is never held in memory as a whole."""
+    keys: dict[str, tuple[str, str]] = {}
+    defaults: dict[str, dict[str, Any]] = {"node": {}, "edge": {}}
+    graph: nx.Graph = nx.Graph()
+    # Tags of the currently open elements, used to tell graph attributes from node and edge attributes, and the
+    # innermost open <graph> element, whose processed node and edge children are removed
+    open_elements: list[str] = []
+    graph_elements: list[Any] = []
+
+    def attributes(element: Any, scope: str) -> dict[str, Any]:  # noqa: ANN401
+        data = dict(defaults[scope])
+        for child in element.iter(f"{_GRAPHML_NAMESPACE}data"):
+            name, graphml_type = keys[child.get("key")]
+            data[name] = _convert(child.text, graphml_type)
+        return data
+
+    with open_input(filepath, "rb") as stream:
+        for event, element in iterparse(stream, events=("start", "end")):
+            tag = element.tag.removeprefix(_GRAPHML_NAMESPACE)
+            if event == "start":
+                open_elements.append(tag)
+                if tag == "graph":
+                    graph_elements.append(element)
+                    if element.get("edgedefault") == "directed":
+                        graph = nx.DiGraph()
+                continue
+            open_elements.pop()
+            if tag == "graph":
+                graph_elements.pop()
+            if tag == "key":
+                name, graphml_type = element.get("attr.name"), element.get("attr.type", "string")
+                keys[element.get("id")] = (name, graphml_type)
+                default = element.find(f"{_GRAPHML_NAMESPACE}default")
+                if default is not None and element.get("for") in defaults:
+                    defaults[element.get("for")][name] = _convert(default.text, graphml_type)
+            elif tag == "node":
+                graph.add_node(element.get("id"), **attributes(element, "node"))
+                _remove_children(graph_elements, element)
+            elif tag == "edge":
+                graph.add_edge(element.get("source"), element.get("target"), **attributes(element, "edge"))
+                _remove_children(graph_elements, element)
+            elif tag == "data" and open_elements and open_elements[-1] == "graph":
+                name, graphml_type = keys[element.get("key")]
+                graph.graph[name] = _convert(element.text, graphml_type)
+    return graph
+
+
+def read_gml(filepath: Path) -> nx.Graph:
+    with open_input(filepath) as stream:
+        return nx.parse_gml(line.rstrip("\n") for line in stream)
+
+
+def _jsonl_records(filepath: Path) -> Iterator[dict]:
+    with open_input(filepath) as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_jsonl(filepath: Path) -> nx.Graph:
+    graph: nx.Graph = nx.Graph()
+    for record in _jsonl_records(filepath):
+        if record["type"] == "graph":
+            graph = nx.DiGraph() if record.get("directed") else nx.Graph()
+            graph.graph.update(record["attributes"])
+        elif record["type"] == "node":
+            graph.add_node(record["id"], **record["attributes"])
+        elif record["type"] == "edge":
+            graph.add_edge(record["source"], record["target"], **record["attributes"])
+    return graph
+
+
+_READERS = {"GML": read_gml, "GraphML": read_graphml, "JSONL": read_jsonl, "Snapshot": load_snapshot}
+
+
+class Importer:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def load(self, input_format: str | None = None) -> nx.Graph:
+        """Reads the exported graph at `path`. The format is detected from the file name if not given."""
+        input_format = input_format or detect_format(self.path)
+        if input_format not in SUPPORTED_INPUT_FORMATS:
+            msg = f"Input format {input_format} not one of {','.join(SUPPORTED_INPUT_FORMATS)}"
+            raise ValueError(msg)
+        return _READERS[input_format](self.path)
@@ -0,0 +1,562 @@
+"""Graph layout computation with an on-disk position cache."""
+
+import hashlib
+import json
+import os
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+import numpy as np
+
+LAYOUT_SEED = 10396953
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "xsoar-dependency-graph" / "layouts"
+
+
+def graph_fingerprint(graph: nx.Graph) -> str:
+    """Returns a hash of the graph structure (node names and edges), independent of node attributes and of the
+    order nodes and edges were added in."""
+    digest = hashlib.sha256()
+    for node in sorted(str(node) for node in graph.nodes()):
+        digest.update(node.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(b"\1")
+    for edge in sorted(tuple(sorted((str(source), str(target)))) for source, target in graph.edges()):
+        digest.update("\0".join(edge).encode("utf-8"))
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+class LayoutCache:
+    """Stores computed node positions on disk, keyed by the graph fingerprint and the layout parameters."""
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+
+    @staticmethod
+    def key(graph: nx.Graph, **params: Any) -> str:  # noqa: ANN401
+        encoded_params = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(f"{graph_fingerprint(graph)}:{encoded_params}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        """Returns the cached positions for `key`, or None if there are none."""
+        try:
+            with np.load(self._path(key), allow_pickle=False) as cached:
+                return dict(zip(cached["nodes"].tolist(), cached["positions"], strict=True))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, key: str, pos: dict[str, np.ndarray]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Write to a temporary file first, so concurrent plots never read a partially written file
+        temporary_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        nodes = np.array([str(node) for node in pos], dtype=str)
+        positions = np.array([pos[node] for node in pos], dtype=np.float64).reshape(-1, 2)
+        np.savez(temporary_path, nodes=nodes, positions=positions)
+        temporary_path.replace(path)
+
+
+def layout_cache(use_cache: bool, cache_dir: Path | None = None) -> LayoutCache | None:
+    """Returns the layout cache for the `use_cache` and `cache_dir` plotting options. Caching is opt-in: without
+    `use_cache` positions are never cached, and with it they are cached in `cache_dir`, or `DEFAULT_CACHE_DIR`."""
+    if not use_cache:
+        return None
+    return LayoutCache(cache_dir) if cache_dir is not None else LayoutCache()
+
+
+# Quadtree cells within reach of a cell's parent neighbourhood, as offsets from the first child of the parent
+_CHILD_OFFSETS = range(-2, 4)
+_MAX_QUADTREE_DEPTH = 10
+
+
+def _barnes_hut_repulsion(x: np.ndarray, y: np.ndarray, k: float, leaf_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns Fruchterman-Reingold repulsive forces (k^2 / d) approximated with a quadtree.
+
+    The quadtree is represented as one grid per level. At each level, every occupied cell is pushed away from the
+    centres of mass of the cells that are children of its parent's neighbours but not neighbours of itself, the
+    well separated cells not already covered by a coarser level, and its nodes inherit that force. The tree is
+    refined until a node shares its cell with `leaf_size` nodes on average, and nodes in the same or adjacent
+    cells of the finest level repel each other exactly. Every step is vectorized over all cells or nodes.
+    """
+    n = len(x)
+    force_x, force_y = np.zeros(n), np.zeros(n)
+    if n < 2:
+        return force_x, force_y
+    left, bottom = x.min(), y.min()
+    span = max(float(x.max() - left), float(y.max() - bottom), 1e-12) * (1 + 1e-9)
+    unit_x, unit_y = (x - left) / span, (y - bottom) / span
+
+    for level in range(2, _MAX_QUADTREE_DEPTH + 1):
+        size = 2**level
+        cell_x = np.minimum((unit_x * size).astype(np.int64), size - 1)
+        cell_y = np.minimum((unit_y * size).astype(np.int64), size - 1)
+        # Grids are padded by two cells on every side, so neighbourhoods never need bounds checks
+        padded = size + 4
+        occupied, node_cell, mass = np.unique((cell_x + 2) * padded + cell_y + 2, return_inverse=True, return_counts=True)
+        cells = len(occupied)
+        # Empty cells point at a sentinel cell without mass
+        lookup = np.full(padded * padded, cells)
+        lookup[occupied] = np.arange(cells)
+        centre_x = np.append(np.bincount(node_cell, weights=x) / mass, 0.0)
+        centre_y = np.append(np.bincount(node_cell, weights=y) / mass, 0.0)
+        occupied_x, occupied_y = occupied // padded, occupied % padded
+        first_child = (occupied_x & ~1) * padded + (occupied_y & ~1)
+        weights = np.append(mass, 0).astype(np.float64)
+        cell_force_x, cell_force_y = np.zeros(cells), np.zeros(cells)
+        # Cells with the same position within their parent share the same interaction list
+        for parity_x in (0, 1):
+            for parity_y in (0, 1):
+                members = np.flatnonzero(((occupied_x & 1) == parity_x) & ((occupied_y & 1) == parity_y))
+                origin, member_x, member_y = first_child[members], centre_x[members], centre_y[members]
+                sum_x, sum_y = np.zeros(len(members)), np.zeros(len(members))
+                for dx in _CHILD_OFFSETS:
+                    for dy in _CHILD_OFFSETS:
+                        if abs(dx - parity_x) <= 1 and abs(dy - parity_y) <= 1:
+                            continue
+                        other = lookup[origin + dx * padded + dy]
+                        delta_x, delta_y = member_x - centre_x[other], member_y - centre_y[other]
+                        weight = weights[other] / (delta_x * delta_x + delta_y * delta_y + 1e-12)
+                        sum_x += weight * delta_x
+                        sum_y += weight * delta_y
+                cell_force_x[members], cell_force_y[members] = sum_x, sum_y
+        force_x += cell_force_x[node_cell]
+        force_y += cell_force_y[node_cell]
+        if (mass * mass).sum() <= leaf_size * n:
+            break
+
+    # Exact repulsion between nodes in neighbouring cells of the finest level. Pairs in different cells are only
+    # generated in one direction and applied to both nodes.
+    order = np.argsort(node_cell, kind="stable")
+    counts = weights.astype(np.int64)
+    starts = np.cumsum(counts) - counts
+    own_cell = occupied[node_cell]
+    nodes = np.arange(n)
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        neighbour = lookup[own_cell + dx * padded + dy]
+        pair_counts = counts[neighbour]
+        sources = np.repeat(nodes, pair_counts)
+        offsets = np.arange(len(sources)) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        targets = order[np.repeat(starts[neighbour], pair_counts) + offsets]
+        if dx == dy == 0:
+            distinct = sources != targets
+            sources, targets = sources[distinct], targets[distinct]
+        delta_x, delta_y = x[sources] - x[targets], y[sources] - y[targets]
+        weight = 1.0 / (delta_x * delta_x + delta_y * delta_y + 1e-12)
+        pair_x, pair_y = weight * delta_x, weight * delta_y
+        force_x += np.bincount(sources, weights=pair_x, minlength=n)
+        force_y += np.bincount(sources, weights=pair_y, minlength=n)
+        if dx or dy:
+            force_x -= np.bincount(targets, weights=pair_x, minlength=n)
+            force_y -= np.bincount(targets, weights=pair_y, minlength=n)
+    strength = k * k
+    return strength * force_x, strength * force_y
+
+
+def _force_directed_steps(
+    pos: np.ndarray,
+    edges: np.ndarray,
+    iterations: int,
+    temperature: float,
+    leaf_size: int,
+    mobility: np.ndarray | None = None,
+    k: float | None = None,
+) -> Iterator[np.ndarray]:
+    """Runs Fruchterman-Reingold iterations with Barnes-Hut repulsion and linear cooling, yielding the positions
+    after every iteration. Steps are scaled by the per node `mobility`, so nodes with mobility 0 stay where they
+    are. The optimal distance `k` is derived from the area covered by `pos` unless given."""
+    n = len(pos)
+    x, y = pos[:, 0].copy(), pos[:, 1].copy()
+    if k is None:
+        area = float(np.ptp(x) * np.ptp(y))
+        k = np.sqrt(max(area, 1e-12) / n) if n > 1 else 1.0
+    sources, targets = edges[:, 0], edges[:, 1]
+    for iteration in range(iterations):
+        force_x, force_y = _barnes_hut_repulsion(x, y, k, leaf_size)
+        delta_x, delta_y = x[sources] - x[targets], y[sources] - y[targets]
+        scale = np.sqrt(delta_x * delta_x + delta_y * delta_y) / k
+        force_x -= np.bincount(sources, weights=delta_x * scale, minlength=n)
+        force_x += np.bincount(targets, weights=delta_x * scale, minlength=n)
+        force_y -= np.bincount(sources, weights=delta_y * scale, minlength=n)
+        force_y += np.bincount(targets, weights=delta_y * scale, minlength=n)
+        length = np.maximum(np.sqrt(force_x * force_x + force_y * force_y), 1e-12)
+        step = np.minimum(length, temperature * (1 - iteration / iterations)) / length
+        if mobility is not None:
+            step *= mobility
+        x += force_x * step
+        y += force_y * step
+        yield np.column_stack([x, y])
+
+
+def _force_directed(
+    pos: np.ndarray,
+    edges: np.ndarray,
+    iterations: int,
+    temperature: float,
+    leaf_size: int,
+    mobility: np.ndarray | None = None,
+    k: float | None = None,
+) -> np.ndarray:
+    """Returns the positions after all iterations of `_force_directed_steps`."""
+    for pos in _force_directed_steps(pos, edges, iterations, temperature, leaf_size, mobility, k):
+        pass
+    return pos
+
+
+def normalize_positions(pos: np.ndarray) -> np.ndarray:
+    """Centres positions and scales them to [-1, 1] like `networkx.spring_layout`."""
+    pos = pos - pos.mean(axis=0)
+    pos /= max(float(np.abs(pos).max()), 1e-12)
+    return pos
+
+
+class NodePositions(Mapping):
+    """Read-only mapping of nodes to rows of a position array, so positions that change often, e.g. while a layout
+    is refined, can be looked up by node without building a dict for every update."""
+
+    def __init__(self, node_index: dict[str, int], xy: np.ndarray) -> None:
+        self.node_index = node_index
+        self.xy = xy
+
+    def __getitem__(self, node: str) -> np.ndarray:
+        return self.xy[self.node_index[node]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.node_index)
+
+    def __len__(self) -> int:
+        return len(self.node_index)
+
+
+def _coarsen(n: int, edges: np.ndarray, rng: np.random.Generator) -> tuple[np.ndarray, int]:
+    """Maps every node to a node of a coarser graph, returning the mapping and the number of coarse nodes.
+
+    Leaves are collapsed into their neighbour first, which shrinks the star shaped neighbourhoods typical of
+    content packs, and the remaining nodes are paired up by handshake matching on random neighbours.
+    """
+    parent = np.arange(n)
+    sources, targets = edges[:, 0], edges[:, 1]
+    degree = np.bincount(sources, minlength=n) + np.bincount(targets, minlength=n)
+    leaf = degree == 1
+    # For isolated edges between two leaves, keep the smaller node id
+    collapse = leaf[sources] & (~leaf[targets] | (sources > targets))
+    parent[sources[collapse]] = targets[collapse]
+    collapse = leaf[targets] & (~leaf[sources] | (targets > sources))
+    parent[targets[collapse]] = sources[collapse]
+
+    inner = ~leaf[sources] & ~leaf[targets]
+    if inner.any():
+        both_sources = np.concatenate([sources[inner], targets[inner]])
+        both_targets = np.concatenate([targets[inner], sources[inner]])
+        order = np.argsort(both_sources, kind="stable")
+        both_sources, both_targets = both_sources[order], both_targets[order]
+        counts = np.bincount(both_sources, minlength=n)
+        starts = np.cumsum(counts) - counts
+        has_neighbour = counts > 0
+        proposal = np.arange(n)
+        picks = starts[has_neighbour] + (rng.random(int(has_neighbour.sum())) * counts[has_neighbour]).astype(np.int64)
+        proposal[has_neighbour] = both_targets[picks]
+        matched = has_neighbour & (proposal[proposal] == np.arange(n)) & (np.arange(n) < proposal)
+        parent[proposal[matched]] = np.flatnonzero(matched)
+
+    # Leaves may have been collapsed into a node that was matched itself
+    parent = parent[parent]
+    roots, parent = np.unique(parent, return_inverse=True)
+    return parent, len(roots)
+
+
+def barnes_hut_steps(
+    graph: nx.Graph,
+    *,
+    seed: int = LAYOUT_SEED,
+    iterations: int = 30,
+    leaf_size: int = 4,
+    min_coarse_nodes: int = 50,
+) -> Iterator[np.ndarray]:
+    """Computes `barnes_hut_layout` step by step, yielding the positions of all nodes, in the order of
+    `graph.nodes()`, after every iteration. While coarser levels are refined, every node is at the position of
+    the coarse node containing it. The positions are not normalized, see `normalize_positions`."""
+    nodes = list(graph.nodes())
+    if not nodes:
+        return
+    node_index = {node: index for index, node in enumerate(nodes)}
+    edges = np.array([(node_index[u], node_index[v]) for u, v in graph.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    rng = np.random.default_rng(seed)
+
+    levels = [(len(nodes), edges)]
+    parents = []
+    # The node of every level containing each node of the graph
+    members = [np.arange(len(nodes))]
+    while levels[-1][0] > min_coarse_nodes:
+        n, level_edges = levels[-1]
+        parent, coarse_n = _coarsen(n, level_edges, rng)
+        if coarse_n > 0.9 * n:
+            break
+        coarse_edges = np.unique(np.sort(parent[level_edges], axis=1), axis=0)
+        coarse_edges = coarse_edges[coarse_edges[:, 0] != coarse_edges[:, 1]]
+        parents.append(parent)
+        levels.append((coarse_n, coarse_edges))
+        members.append(parent[members[-1]])
+
+    n, level_edges = levels[-1]
+    pos = rng.random((n, 2))
+    yield pos[members[-1]]
+    for pos in _force_directed_steps(pos, level_edges, iterations, temperature=0.1, leaf_size=leaf_size):
+        yield pos[members[-1]]
+    for level, parent in zip(range(len(parents) - 1, -1, -1), reversed(parents), strict=True):
+        n, level_edges = levels[level]
+        k = float(np.sqrt(np.prod(np.ptp(pos, axis=0) + 1e-12) / n))
+        pos = pos[parent] + rng.normal(scale=k, size=(n, 2))
+        yield pos[members[level]]
+        for pos in _force_directed_steps(pos, level_edges, iterations, temperature=2 * k, leaf_size=leaf_size):
+            yield pos[members[level]]
+
+
+def barnes_hut_layout(
+    graph: nx.Graph,
+    *,
+    seed: int = LAYOUT_SEED,
+    iterations: int = 30,
+    leaf_size: int = 4,
+    min_coarse_nodes: int = 50,
+) -> dict[str, np.ndarray]:
+    """Multilevel force directed layout in the style of sfdp.
+
+    The graph is repeatedly coarsened until it has fewer than `min_coarse_nodes` nodes or stops shrinking. The
+    coarsest graph is laid out from random positions, and each finer level starts from the positions of its
+    coarse nodes and is refined with `iterations` Fruchterman-Reingold iterations using Barnes-Hut repulsion.
+    Larger `leaf_size` computes more repulsion exactly, which is slower but more accurate. Positions are centred
+    and scaled to [-1, 1] like `networkx.spring_layout`, and the same `seed` always gives the same layout.
+    """
+    pos = None
+    for pos in barnes_hut_steps(graph, seed=seed, iterations=iterations, leaf_size=leaf_size, min_coarse_nodes=min_coarse_nodes):
+        pass
+    if pos is None:
+        return {}
+    return dict(zip(graph.nodes(), normalize_positions(pos), strict=True))
+
+
+def incremental_layout(
+    graph: nx.Graph,
+    previous_pos: dict[str, np.ndarray],
+    *,
+    seed: int = LAYOUT_SEED,
+    iterations: int = 20,
+    neighbour_mobility: float = 0.1,
+    leaf_size: int = 4,
+    reach: float = 3.0,
+) -> dict[str, np.ndarray]:
+    """Lays out the graph starting from `previous_pos`, moving as few nodes as possible.
+
+    Nodes without a previous position are placed near the mean position of their already placed neighbours,
+    working outwards from the previously positioned nodes. Nodes that can't be reached that way are placed
+    randomly within the previous layout. A short relaxation then moves the new nodes freely, their previously
+    positioned neighbours with `neighbour_mobility`, and keeps every other node fixed.
+
+    The relaxation only involves the moving nodes and the fixed nodes near them: their graph neighbours and
+    nodes within `reach` times the optimal node distance, which act as static sources of force. Its cost
+    depends on the size of the change rather than the size of the graph.
+    """
+    placed = {node: np.asarray(previous_pos[node], dtype=np.float64) for node in graph.nodes() if node in previous_pos}
+    pending = [node for node in graph.nodes() if node not in placed]
+    if not pending:
+        return placed
+    if not placed:
+        return barnes_hut_layout(graph, seed=seed, leaf_size=leaf_size)
+
+    rng = np.random.default_rng(seed)
+    existing = np.array(list(placed.values()))
+    lower, upper = existing.min(axis=0), existing.max(axis=0)
+    k = float(np.sqrt(max(np.prod(upper - lower), 1e-12) / len(existing))) if len(existing) > 1 else 0.1
+    new_nodes = set(pending)
+    while pending:
+        # Only neighbours placed in earlier rounds are used, so the result doesn't depend on the order within a round
+        round_pos = {}
+        for node in pending:
+            anchors = [placed[neighbour] for neighbour in graph.neighbors(node) if neighbour in placed]
+            if anchors:
+                round_pos[node] = np.mean(anchors, axis=0) + rng.normal(scale=k / 2, size=2)
+        if not round_pos:
+            round_pos = {node: lower + rng.random(2) * (upper - lower) for node in pending}
+        placed.update(round_pos)
+        pending = [node for node in pending if node not in round_pos]
+
+    # Moving nodes and their mobility, in graph order so the result doesn't depend on set iteration order
+    mobility = {node: 1.0 for node in graph.nodes() if node in new_nodes}
+    for node in [*mobility]:
+        for neighbour in graph.neighbors(node):
+            mobility.setdefault(neighbour, neighbour_mobility)
+    # Fixed nodes in grid cells next to those of moving nodes, with cells as large as the reach of the forces, and
+    # fixed neighbours of moving nodes
+    cell_size = reach * k
+    moving_cells = np.floor(np.array([placed[node] for node in mobility]) / cell_size).astype(np.int64)
+    near_cells = {(x + dx, y + dy) for x, y in moving_cells.tolist() for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+    neighbours = {neighbour for node in mobility for neighbour in graph.neighbors(node)}
+    fixed = [node for node in graph.nodes() if node not in mobility]
+    fixed_cells = np.floor(np.array([placed[node] for node in fixed]).reshape(-1, 2) / cell_size).astype(np.int64)
+    sources = [node for node, cell in zip(fixed, fixed_cells.tolist(), strict=True) if tuple(cell) in near_cells or node in neighbours]
+
+    nodes = [*mobility, *sources]
+    node_index = {node: index for index, node in enumerate(nodes)}
+    edges = {tuple(sorted((node_index[u], node_index[v]))) for node in mobility for u, v in graph.edges(node) if u != v}
+    pos = np.array([placed[node] for node in nodes])
+    pos = _force_directed(
+        pos,
+        np.array(sorted(edges), dtype=np.int64).reshape(-1, 2),
+        iterations,
+        temperature=k,
+        leaf_size=leaf_size,
+        mobility=np.array([mobility.get(node, 0.0) for node in nodes]),
+        k=k,
+    )
+    placed.update(zip(mobility, pos[: len(mobility)], strict=True))
+    return {node: placed[node] for node in graph.nodes()}
+
+
+def _spring_layout(graph: nx.Graph, *, seed: int = LAYOUT_SEED) -> dict[str, np.ndarray]:
+    return nx.spring_layout(graph, seed=seed)
+
+
+# Layout engines selectable in `compute_layout` and `plot_graph`. "spring" is networkx' Fruchterman-Reingold
+# implementation, which is accurate but scales quadratically, "barnes-hut" scales to graphs with 50k+ nodes.
+LAYOUT_ENGINES = {"spring": _spring_layout, "barnes-hut": barnes_hut_layout}
+
+
+def _pack_rectangles(sizes: np.ndarray) -> np.ndarray:
+    """Packs rectangles of the given (width, height) into rows of roughly equal width, tallest first, and returns
+    the lower left corner of every rectangle. Rows are stacked downwards from the origin."""
+    corners = np.zeros_like(sizes)
+    row_width = max(float(sizes[:, 0].max()), float(np.sqrt((sizes[:, 0] * sizes[:, 1]).sum())))
+    x = top = row_height = 0.0
+    for index in np.argsort(-sizes[:, 1], kind="stable"):
+        width, height = sizes[index]
+        if x > 0 and x + width > row_width:
+            top -= row_height
+            x = row_height = 0.0
+        row_height = max(row_height, height)
+        corners[index] = (x, top - height)
+        x += width
+    return corners
+
+
+def component_layout(
+    graph: nx.Graph,
+    *,
+    engine: str = "spring",
+    seed: int = LAYOUT_SEED,
+    max_workers: int | None = None,
+    parallel_min_nodes: int = 50,
+) -> dict[str, np.ndarray]:
+    """Lays out every connected component independently and packs the component layouts into one picture.
+
+    Components with at least `parallel_min_nodes` nodes are laid out in parallel by up to `max_workers`
+    processes, smaller ones inline. Each component layout is scaled with the square root of its number of nodes,
+    so all components are drawn at a similar density, and the components are packed into rows of roughly equal
+    width, largest first. Positions are centred and scaled to [-1, 1] like `networkx.spring_layout`.
+    """
+    components = [graph.subgraph(nodes).copy() for nodes in nx.connected_components(graph)]
+    if not components:
+        return {}
+    layouts: list[dict | None] = [None] * len(components)
+    large = [index for index, component in enumerate(components) if len(component) >= parallel_min_nodes]
+    if len(large) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {index: executor.submit(LAYOUT_ENGINES[engine], components[index], seed=seed) for index in large}
+            for index, future in futures.items():
+                layouts[index] = future.result()
+    for index, component in enumerate(components):
+        if layouts[index] is None:
+            layouts[index] = LAYOUT_ENGINES[engine](component, seed=seed)
+
+    positions = []
+    for component, layout in zip(components, layouts, strict=True):
+        xy = np.array([layout[node] for node in component], dtype=np.float64).reshape(-1, 2)
+        xy -= xy.min(axis=0)
+        extent = float(xy.max()) if len(xy) > 1 else 0.0
+        if extent > 0:
+            xy *= 2 * np.sqrt(len(component)) / extent
+        positions.append(xy)
+    # Leave a margin of one unit around every component
+    corners = _pack_rectangles(np.array([xy.max(axis=0) + 1 for xy in positions]))
+    pos = {}
+    for component, xy, corner in zip(components, positions, corners, strict=True):
+        pos.update(zip(component, xy + corner + 0.5, strict=True))
+    xy = np.array(list(pos.values()))
+    centre = (xy.min(axis=0) + xy.max(axis=0)) / 2
+    scale = max(float(np.abs(xy - centre).max()), 1e-12)
+    return {node: (position - centre) / scale for node, position in pos.items()}
+
+
+def plotted_component(graph: nx.Graph, all_components: bool = False) -> nx.Graph:
+    """Returns the part of the graph that is plotted, i.e. the largest connected component unless
+    `all_components` is set."""
+    if all_components:
+        return graph
+    # We don't care about isolated nodes at this point.
+    return graph.subgraph(max(nx.connected_components(graph), key=len, default=()))
+
+
+def layout_cache_key(graph: nx.Graph, *, engine: str = "spring", seed: int = LAYOUT_SEED, per_component: bool = False) -> str:
+    """Returns the cache key of the layout `compute_layout` computes for the graph with these parameters."""
+    params = {"algorithm": engine, "seed": seed}
+    if per_component:
+        params["packed"] = True
+    return LayoutCache.key(graph, **params)
+
+
+def cached_layout(graph: nx.Graph, cache: LayoutCache, key: str) -> dict[str, np.ndarray] | None:
+    """Returns the positions cached under `key`, if they are for exactly the nodes of the graph."""
+    pos = cache.get(key)
+    if pos is not None and pos.keys() == set(graph.nodes()):
+        return pos
+    return None
+
+
+def compute_layout(
+    graph: nx.Graph,
+    *,
+    engine: str = "spring",
+    seed: int = LAYOUT_SEED,
+    cache: LayoutCache | None = None,
+    previous_pos: dict[str, np.ndarray] | None = None,
+    per_component: bool = False,
+    max_workers: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Computes layout positions for the graph with one of the `LAYOUT_ENGINES`, reusing positions cached for a
+    graph with the same structure and layout parameters. Node names have to be strings for positions to be
+    cached. With `per_component`, connected components are laid out in parallel by up to `max_workers` processes
+    and packed together (see `component_layout`).
+
+    If `previous_pos` has positions for some of the nodes, only the other nodes are placed (see
+    `incremental_layout`). `engine`, `per_component`, `max_workers` and `cache` are then ignored: new nodes are
+    always placed by the local force refinement of `incremental_layout`, next to their neighbours, whatever engine
+    laid out the previous positions.
+    """
+    if engine not in LAYOUT_ENGINES:
+        msg = f"Layout engine {engine} not one of {','.join(LAYOUT_ENGINES)}"
+        raise ValueError(msg)
+    if previous_pos and any(node in previous_pos for node in graph.nodes()):
+        return incremental_layout(graph, previous_pos, seed=seed)
+    if cache is not None:
+        key = layout_cache_key(graph, engine=engine, seed=seed, per_component=per_component)
+        pos = cached_layout(graph, cache, key)
+        if pos is not None:
+            return pos
+    if per_component:
+        pos = component_layout(graph, engine=engine, seed=seed, max_workers=max_workers)
+    else:
+        pos = LAYOUT_ENGINES[engine](graph, seed=seed)
+    if cache is not None:
+        cache.put(key, pos)
+    return pos
+
+
+def set_position_attributes(graph: nx.Graph, pos: dict[str, np.ndarray]) -> None:
+    """Stores positions as `x` and `y` node attributes, so they are exported along with the graph."""
+    nx.set_node_attributes(graph, {node: {"x": float(xy[0]), "y": float(xy[1])} for node, xy in pos.items()})
@@ -0,0 +1,80 @@
+"""Lightweight index of which content packs define which content items."""
+
+import json
+import re
+from pathlib import Path
+
+from .parsers.basic_parser import BasicParser
+
+# Top level `id: <value>` of playbooks, and `commonfields: ... id: <value>` of scripts and integrations
+_TOP_LEVEL_ID = re.compile(r"^id:[ \t]*(.+?)[ \t]*$", re.MULTILINE)
+_COMMONFIELDS_ID = re.compile(r"^commonfields:[ \t]*\n(?:[ \t]+.*\n)*?[ \t]+id:[ \t]*(.+?)[ \t]*$", re.MULTILINE)
+# The block of an integration's `commands:` list, whose items may start at the indentation of the key itself
+_COMMANDS = re.compile(r"^(?P<indent>[ \t]+)commands:[ \t]*\n(?P<block>(?:(?P=indent)(?:[ \t]|-[ \t]).*\n|[ \t]*\n)*)", re.MULTILINE)
+_LIST_ITEM = re.compile(r"^([ \t]*)-([ \t]+)", re.MULTILINE)
+# `"id": "<value>"` keys of a JSON file, along with their indentation
+_JSON_ID = re.compile(r'^([ \t]*)"id":[ \t]*("(?:[^"\\]|\\.)*")', re.MULTILINE)
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def _command_names(text: str) -> list[str]:
+    """Returns the `name` of every item of the integration's `commands` list, skipping the nested argument names."""
+    commands = _COMMANDS.search(text if text.endswith("\n") else text + "\n")
+    item = _LIST_ITEM.search(commands.group("block")) if commands else None
+    if not item:
+        return []
+    dash, key = len(item.group(1)), len(item.group(1)) + 1 + len(item.group(2))
+    name = re.compile(rf"^(?:[ \t]{{{dash}}}-[ \t]+|[ \t]{{{key}}})name:[ \t]*(.+?)[ \t]*$", re.MULTILINE)
+    return name.findall(commands.group("block"))
+
+
+class PackIndex:
+    """Maps content item names to the packs defining them without fully parsing the packs.
+
+    Content item ids and integration commands are read with regular expressions instead of a YAML or JSON
+    parser, and scripts are not parsed as Python at all. Layouts are indexed by the `Layout-<id>` node name used
+    in the graph, their id being the least indented `"id"` key, so layouts are expected to be indented JSON as
+    written by `demisto-sdk format`.
+    """
+
+    def __init__(self, pack_paths: list[Path]) -> None:
+        self._parser = BasicParser()
+        self._index: dict[str, set[Path]] = {}
+        for pack_path in pack_paths:
+            self._index_pack(pack_path)
+
+    def _add(self, name: str | None, pack_path: Path) -> None:
+        if name:
+            self._index.setdefault(_unquote(name), set()).add(pack_path)
+
+    def _index_pack(self, pack_path: Path) -> None:
+        for playbook_path in pack_path.glob("Playbooks/*.yml"):
+            match = _TOP_LEVEL_ID.search(playbook_path.read_text())
+            self._add(match.group(1) if match else None, pack_path)
+
+        for script_path in Path(pack_path / "Scripts/").rglob("*.yml"):
+            if self._parser.is_bad_filepath(script_path):
+                continue
+            match = _COMMONFIELDS_ID.search(script_path.read_text())
+            self._add(match.group(1) if match else None, pack_path)
+
+        for integration_path in Path(pack_path / "Integrations/").rglob("*.yml"):
+            text = integration_path.read_text()
+            match = _COMMONFIELDS_ID.search(text)
+            self._add(match.group(1) if match else None, pack_path)
+            for command in _command_names(text):
+                self._add(command, pack_path)
+
+        for layout_path in pack_path.glob("Layouts/*.json"):
+            ids = _JSON_ID.findall(layout_path.read_text())
+            layout_id = json.loads(min(ids, key=lambda match: len(match[0]))[1]) if ids else None
+            self._add(f"Layout-{layout_id}" if layout_id else None, pack_path)
+
+    def get_packs(self, name: str) -> set[Path]:
+        """Returns the paths of the packs defining the content item `name`."""
+        return self._index.get(name, set())
@@ -7,6 +7,8 @@ class PlaybookParser(BasicParser):
     def __init__(self, playbook_path: Path) -> None:
         super().__init__()
         self.data = super().load_yaml(playbook_path)
+        # References that are not added as edges, e.g. Builtin commands. Populated by `parse`
+        self.ignored_references: list[tuple] = []
 
     def get_playbook_id(self) -> str:
         return self.data["id"]
@@ -35,4 +37,9 @@ class PlaybookParser(BasicParser):
                 # We know that `parts` will always be a list with at least one element. Therefore,
                 # calling `parts[-1]` will not raise an exception
                 edges.append((playbook_id, parts[-1], "Script"))
+
+            elif task.get("scriptName") or task.get("script"):
+                # Only Builtin references end up here
+                parts = (task.get("scriptName") or task["script"]).split("|||")
+                self.ignored_references.append((playbook_id, parts[-1], "Builtin"))
         return edges
@@ -5,12 +5,58 @@ from xsoar_dependency_graph.utils.ast_utils import FunctionCallFinder
 
 from .basic_parser import BasicParser
 
+# Commonly used commands built into the XSOAR server. Scripts call them like any other command. They stay in the
+# graph, but as they are not content items, they are also reported as ignored rather than dangling references.
+BUILTIN_COMMANDS = frozenset(
+    {
+        "addEntitlement",
+        "addToList",
+        "appendIndicatorField",
+        "associateIndicatorToIncident",
+        "closeInvestigation",
+        "createList",
+        "createNewIncident",
+        "createNewIndicator",
+        "deleteContext",
+        "deleteIndicators",
+        "enrichIndicators",
+        "excludeIndicators",
+        "findIndicators",
+        "getContext",
+        "getEntries",
+        "getEntry",
+        "getFilePath",
+        "getIncidents",
+        "getList",
+        "getUsers",
+        "investigate",
+        "linkIncidents",
+        "markAsNote",
+        "pauseTimer",
+        "removeFromList",
+        "removeIndicatorField",
+        "reopenInvestigation",
+        "resetTimer",
+        "setIncident",
+        "setIndicator",
+        "setList",
+        "setOwner",
+        "setPlaybook",
+        "setPlaybookAccordingToType",
+        "startTimer",
+        "stopTimer",
+        "taskComplete",
+    }
+)
+
 
 class ScriptParser(BasicParser):
     def __init__(self, script_path: Path) -> None:
         super().__init__()
         self.data = super().load_yaml(script_path)
         self.script_path = script_path
+        # References to Builtin commands, which are added as edges but can't resolve to content. Populated by `parse`
+        self.ignored_references: list[tuple] = []
         # print(f"  - parsing {script_path}")
 
     def get_script_id(self) -> str:
@@ -40,6 +86,10 @@ class ScriptParser(BasicParser):
             visitor = FunctionCallFinder()
             visitor.visit(tree)
             edges = [(script_id, item) for item in visitor.script_names]
+            for item in visitor.script_names:
+                name = item.split("|||")[-1]
+                if item.startswith("Builtin|||") or name in BUILTIN_COMMANDS:
+                    self.ignored_references.append((script_id, name, "Builtin"))
 
         except SyntaxError:
             # You may want to check the source code that is being parsed here . One of the
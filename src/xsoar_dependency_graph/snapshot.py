@@ -0,0 +1,142 @@
+"""Reading of binary graph snapshots written by `writers.snapshot_writer.SnapshotWriter`."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+import numpy as np
+
+from .writers.snapshot_writer import MANIFEST_FILE, SNAPSHOT_VERSION
+
+
+class GraphSnapshot:
+    """A graph snapshot opened with NumPy memory mapping.
+
+    Opening a snapshot only reads its manifest. Arrays are mapped into memory when first used, and only the pages
+    touched by a query are read from disk. Use `to_networkx` to restore the full graph.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with (self.path / MANIFEST_FILE).open(encoding="utf-8") as stream:
+            self.manifest = json.load(stream)
+        if self.manifest["version"] != SNAPSHOT_VERSION:
+            msg = f"Unsupported snapshot version {self.manifest['version']} in {self.path}"
+            raise ValueError(msg)
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return self._arrays[name]
+
+    def string(self, index: int) -> str:
+        """Returns the string with the given index in the string table."""
+        offsets = self._array("strings_offsets")
+        return self._array("strings_data")[offsets[index] : offsets[index + 1]].tobytes().decode("utf-8")
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self._array("nodes"))
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self._array("edges"))
+
+    def node_name(self, index: int) -> str:
+        return self.string(int(self._array("nodes")[index]))
+
+    def _find_node(self, node: str) -> int | None:
+        """Returns the index of `node`, using binary search over the nodes ordered by name."""
+        sorted_nodes = self._array("nodes_sorted")
+        low, high = 0, len(sorted_nodes)
+        while low < high:
+            middle = (low + high) // 2
+            if self.node_name(int(sorted_nodes[middle])) < node:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(sorted_nodes) and self.node_name(int(sorted_nodes[low])) == node:
+            return int(sorted_nodes[low])
+        return None
+
+    def _node_index(self, node: str) -> int:
+        index = self._find_node(node)
+        if index is None:
+            raise KeyError(node)
+        return index
+
+    def has_node(self, node: str) -> bool:
+        return self._find_node(node) is not None
+
+    def _value(self, column: dict, index: int) -> tuple[bool, Any]:
+        """Returns whether the column has a value at `index`, and the value."""
+        if not self._array(f"{column['file']}_present")[index]:
+            return False, None
+        value = self._array(column["file"])[index]
+        if column["kind"] == "string":
+            return True, self.string(int(value))
+        if column["kind"] == "json":
+            return True, json.loads(self.string(int(value)))
+        if column["kind"] == "numpy":
+            return True, value
+        return True, value.item()
+
+    def _attributes(self, columns: list[dict], index: int) -> dict[str, Any]:
+        attributes = {}
+        for column in columns:
+            present, value = self._value(column, index)
+            if present:
+                attributes[column["name"]] = value
+        return attributes
+
+    def node_attributes(self, node: str) -> dict[str, Any]:
+        return self._attributes(self.manifest["node_columns"], self._node_index(node))
+
+    def neighbors(self, node: str) -> list[str]:
+        """Returns the neighbours (successors for directed graphs) of `node`."""
+        index = self._node_index(node)
+        indptr = self._array("adjacency_indptr")
+        indices = self._array("adjacency_indices")[indptr[index] : indptr[index + 1]]
+        return [self.node_name(int(neighbor)) for neighbor in indices]
+
+    def _strings(self) -> list[str]:
+        """Decodes the whole string table at once."""
+        data = self._array("strings_data").tobytes()
+        offsets = self._array("strings_offsets").tolist()
+        return [data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:], strict=False)]
+
+    def _columns(self, columns: list[dict], strings: list[str], count: int) -> list[dict[str, Any]]:
+        """Decodes attribute columns into one attribute dict per node or edge."""
+        attributes: list[dict[str, Any]] = [{} for _ in range(count)]
+        for column in columns:
+            values = self._array(column["file"])
+            if column["kind"] != "numpy":
+                values = values.tolist()
+            for index in np.flatnonzero(self._array(f"{column['file']}_present")).tolist():
+                value = values[index]
+                if column["kind"] == "string":
+                    value = strings[value]
+                elif column["kind"] == "json":
+                    value = json.loads(strings[value])
+                attributes[index][column["name"]] = value
+        return attributes
+
+    def to_networkx(self) -> nx.Graph:
+        """Restores the graph the snapshot was written from."""
+        graph = nx.DiGraph() if self.manifest["directed"] else nx.Graph()
+        graph.graph.update(self.manifest["graph"])
+        strings = self._strings()
+        nodes = [strings[index] for index in self._array("nodes").tolist()]
+        node_attributes = self._columns(self.manifest["node_columns"], strings, len(nodes))
+        graph.add_nodes_from(zip(nodes, node_attributes, strict=True))
+        edges = self._array("edges").tolist()
+        edge_attributes = self._columns(self.manifest["edge_columns"], strings, len(edges))
+        graph.add_edges_from((nodes[source], nodes[target], data) for (source, target), data in zip(edges, edge_attributes, strict=True))
+        return graph
+
+
+def load_snapshot(path: Path) -> nx.Graph:
+    """Restores a graph from a snapshot directory."""
+    return GraphSnapshot(path).to_networkx()
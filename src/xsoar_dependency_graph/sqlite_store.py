@@ -0,0 +1,216 @@
+"""SQLite backed graph storage for building content graphs that don't fit comfortably in memory."""
+
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator, MutableMapping
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS node_attributes (
+    node_id INTEGER NOT NULL REFERENCES nodes (id),
+    key TEXT NOT NULL,
+    value,
+    is_json INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (node_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_attributes_key_value ON node_attributes (key, value);
+CREATE TABLE IF NOT EXISTS edges (
+    source INTEGER NOT NULL REFERENCES nodes (id),
+    target INTEGER NOT NULL REFERENCES nodes (id),
+    attributes TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target);
+"""
+
+
+def _encode(value: Any) -> tuple[Any, int]:  # noqa: ANN401
+    """Stores strings and numbers natively so they can be queried with plain SQL, and anything else as JSON."""
+    if type(value) in (str, int, float):
+        return value, 0
+    return json.dumps(value), 1
+
+
+def _decode(value: Any, is_json: int) -> Any:  # noqa: ANN401
+    return json.loads(value) if is_json else value
+
+
+class _NodeAttributes(MutableMapping):
+    """Write-through attribute dict of a single node, as returned by `SQLiteGraph.nodes[node]`."""
+
+    def __init__(self, store: "SQLiteGraph", node_id: int) -> None:
+        self._store = store
+        self._node_id = node_id
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        row = self._store.execute(
+            "SELECT value, is_json FROM node_attributes WHERE node_id = ? AND key = ?", (self._node_id, key)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return _decode(*row)
+
+    def __setitem__(self, key: str, value: Any) -> None:  # noqa: ANN401
+        self._store.write(
+            "INSERT OR REPLACE INTO node_attributes (node_id, key, value, is_json) VALUES (?, ?, ?, ?)",
+            (self._node_id, key, *_encode(value)),
+        )
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._store.write("DELETE FROM node_attributes WHERE node_id = ? AND key = ?", (self._node_id, key))
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._store.execute("SELECT key FROM node_attributes WHERE node_id = ?", (self._node_id,)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._store.execute("SELECT COUNT(*) FROM node_attributes WHERE node_id = ?", (self._node_id,)).fetchone()[0]
+
+
+class _NodeView:
+    def __init__(self, store: "SQLiteGraph") -> None:
+        self._store = store
+
+    def __getitem__(self, node: str) -> _NodeAttributes:
+        node_id = self._store.node_id(node)
+        if node_id is None:
+            raise KeyError(node)
+        return _NodeAttributes(self._store, node_id)
+
+
+class SQLiteGraph:
+    """Undirected graph stored in a SQLite database.
+
+    Implements the subset of the networkx graph API used by `GraphBuilder` and `DependencyResolver`, so it can be
+    passed to `GraphBuilder.create_nodes_from_pack` in place of a `networkx.Graph`. Nothing is cached in Python,
+    so memory use stays bounded regardless of graph size. Writes are committed in transactions of `batch_size`
+    statements. The database can be queried directly with SQL, and `to_networkx` loads it as a `networkx.Graph`.
+
+    Node attributes are stored as (node_id, key, value) rows. Strings and numbers are stored as plain SQL values,
+    other values as JSON with `is_json` set. Edges are stored once, with `source` being the smaller node id.
+    """
+
+    def __init__(self, database_path: Path, batch_size: int = 10_000) -> None:
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(database_path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._pending_writes = 0
+        self.nodes = _NodeView(self)
+
+    def execute(self, sql: str, parameters: tuple | dict = ()) -> sqlite3.Cursor:
+        return self._connection.execute(sql, parameters)
+
+    def write(self, sql: str, parameters: tuple = ()) -> None:
+        """Executes a modifying statement, committing the open transaction every `batch_size` statements."""
+        self._connection.execute(sql, parameters)
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.commit()
+
+    def commit(self) -> None:
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._connection.close()
+
+    def node_id(self, node: str) -> int | None:
+        row = self.execute("SELECT id FROM nodes WHERE name = ?", (node,)).fetchone()
+        return row[0] if row else None
+
+    def _ensure_node(self, node: str) -> int:
+        node_id = self.node_id(node)
+        if node_id is None:
+            self.write("INSERT INTO nodes (name) VALUES (?)", (node,))
+            node_id = self.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return node_id
+
+    def __contains__(self, node: str) -> bool:
+        return self.node_id(node) is not None
+
+    def has_node(self, node: str) -> bool:
+        return node in self
+
+    def add_node(self, node: str, **attr: Any) -> None:  # noqa: ANN401
+        attributes = _NodeAttributes(self, self._ensure_node(node))
+        attributes.update(attr)
+
+    def add_edge(self, u: str, v: str, **attr: Any) -> None:  # noqa: ANN401
+        source, target = sorted((self._ensure_node(u), self._ensure_node(v)))
+        row = self.execute("SELECT attributes FROM edges WHERE source = ? AND target = ?", (source, target)).fetchone()
+        attributes = json.loads(row[0]) if row else {}
+        attributes.update(attr)
+        self.write(
+            "INSERT OR REPLACE INTO edges (source, target, attributes) VALUES (?, ?, ?)", (source, target, json.dumps(attributes))
+        )
+
+    def add_edges_from(self, edges: Iterable[tuple]) -> None:
+        for edge in edges:
+            self.add_edge(edge[0], edge[1], **(edge[2] if len(edge) > 2 and isinstance(edge[2], dict) else {}))
+
+    def neighbors(self, node: str) -> Iterator[str]:
+        node_id = self.node_id(node)
+        if node_id is None:
+            msg = f"The node {node} is not in the graph."
+            raise nx.NetworkXError(msg)
+        rows = self.execute(
+            "SELECT name FROM edges JOIN nodes ON nodes.id = edges.target WHERE edges.source = ? "
+            "UNION SELECT name FROM edges JOIN nodes ON nodes.id = edges.source WHERE edges.target = ?",
+            (node_id, node_id),
+        )
+        return (row[0] for row in rows)
+
+    def is_linked_to_pack(self, pack_name: str, node: str) -> bool:
+        """Returns whether `node` has an edge to the node `pack_name` or to a node whose `pack_name` attribute is
+        `pack_name`. Answered with one query using the edge and attribute indexes.
+
+        This is stricter than the path search `GraphBuilder` runs on in-memory graphs: a script that is only
+        reachable from its pack through other packs' items gets an edge to its pack node in the database only."""
+        node_id = self.node_id(node)
+        if node_id is None:
+            return False
+        row = self.execute(
+            "SELECT 1 FROM (SELECT target AS other FROM edges WHERE source = :node "
+            "UNION ALL SELECT source FROM edges WHERE target = :node) AS adjacent "
+            "WHERE other = (SELECT id FROM nodes WHERE name = :pack) "
+            "OR EXISTS (SELECT 1 FROM node_attributes WHERE node_id = other AND key = 'pack_name' AND value = :pack) LIMIT 1",
+            {"node": node_id, "pack": pack_name},
+        ).fetchone()
+        return row is not None
+
+    def number_of_nodes(self) -> int:
+        return self.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def number_of_edges(self) -> int:
+        return self.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+    def to_networkx(self) -> nx.Graph:
+        """Loads the whole database as a `networkx.Graph`, preserving node insertion order."""
+        self.commit()
+        graph = nx.Graph()
+        graph.add_nodes_from(row[0] for row in self.execute("SELECT name FROM nodes ORDER BY id"))
+        rows = self.execute(
+            "SELECT nodes.name, node_attributes.key, node_attributes.value, node_attributes.is_json "
+            "FROM node_attributes JOIN nodes ON nodes.id = node_attributes.node_id"
+        )
+        for node, key, value, is_json in rows:
+            graph.nodes[node][key] = _decode(value, is_json)
+        rows = self.execute(
+            "SELECT sources.name, targets.name, edges.attributes FROM edges "
+            "JOIN nodes AS sources ON sources.id = edges.source JOIN nodes AS targets ON targets.id = edges.target"
+        )
+        graph.add_edges_from((source, target, json.loads(attributes)) for source, target, attributes in rows)
+        return graph
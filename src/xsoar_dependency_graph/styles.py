@@ -0,0 +1,27 @@
+"""Node colours and labels shared by the plots and the HTML export, kept free of matplotlib imports."""
+
+# Color palette for node types in graph visualization.
+# Uses colorblind-friendly colors from the Okabe-Ito palette.
+NODE_PALETTE = {
+    "Script": "#009E73",
+    "Playbook": "#0072B2",
+    "Content Pack": "#CC79A7",
+    "Layout": "#E69F00",
+    "CaseType": "#D55E00",
+    "Integration": "#56B4E9",
+    "Integration Command": "#F0E442",
+}
+
+# Colour of nodes without a known node type, the networkx default
+DEFAULT_NODE_COLOR = "#1f78b4"
+
+# Display labels for node types in graph legend.
+NODE_TYPE_LABELS = {
+    "Script": "Scripts",
+    "Playbook": "Playbooks",
+    "Content Pack": "Content Packs",
+    "Layout": "Layouts",
+    "CaseType": "Case Types",
+    "Integration": "Integrations",
+    "Integration Command": "Integration Commands",
+}
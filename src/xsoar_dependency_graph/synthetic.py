@@ -0,0 +1,262 @@
+"""Deterministic synthetic content repositories for tests and benchmarks."""
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+# Upstream packs known to `ContentGraph`, by directory and pack name
+UPSTREAM_PACKS = {"Base": "Base", "CommonScripts": "Common Scripts", "CommonPlaybooks": "Common Playbooks"}
+
+SCRIPT_TEMPLATE = '''"""{name} synthetic script."""
+
+import demistomock as demisto
+from CommonServerPython import *
+
+
+def {function}(args: dict) -> dict:
+    results = {{}}
+{calls}
+    return results
+
+
+def main():
+    try:
+        return_results({function}(demisto.args()))
+    except Exception as ex:
+        return_error(f"Failed to execute {name}. Error: {{str(ex)}}")
+
+
+if __name__ in ("__main__", "__builtin__", "builtins"):
+    main()
+'''
+
+
+@dataclass(frozen=True)
+class SyntheticRepoSpec:
+    """Size of a synthetic content repository. Counts are per pack, except `packs` and `installed_packs`.
+
+    Playbooks, scripts and layouts reference `references_per_item` content items on average. A share of
+    `cross_pack_ratio` of those are in other packs, and `external_ratio` in upstream or installed content.
+    """
+
+    packs: int = 20
+    playbooks: int = 5
+    scripts: int = 10
+    layouts: int = 1
+    integrations: int = 1
+    commands_per_integration: int = 5
+    references_per_item: float = 3.0
+    cross_pack_ratio: float = 0.3
+    external_ratio: float = 0.1
+    upstream_items: int = 10
+    installed_packs: int = 2
+
+
+class _Generator:
+    """Writes the packs of a synthetic content repository, drawing every choice from a single seeded RNG."""
+
+    def __init__(self, spec: SyntheticRepoSpec, seed: int) -> None:
+        self.spec = spec
+        self.rng = random.Random(seed)
+        self.pack_names = [f"Synthetic{index:03d}" for index in range(spec.packs)]
+        # Content items of every pack by kind, so references can be drawn before the items are written
+        self.items = {
+            pack: {
+                "playbook": [f"{pack}_Playbook{index:03d}" for index in range(spec.playbooks)],
+                "script": [f"{pack}_Script{index:03d}" for index in range(spec.scripts)],
+                "layout": [f"{pack}_Layout{index:03d}" for index in range(spec.layouts)],
+                "integration": [f"{pack}_Integration{index:03d}" for index in range(spec.integrations)],
+                "command": [
+                    f"{pack.lower()}-{integration}-command-{index}"
+                    for integration in range(spec.integrations)
+                    for index in range(spec.commands_per_integration)
+                ],
+            }
+            for pack in self.pack_names
+        }
+        self.upstream = {
+            "Base": {"script": [f"BaseScript{index:03d}" for index in range(spec.upstream_items)]},
+            "CommonScripts": {"script": [f"CommonScript{index:03d}" for index in range(spec.upstream_items)]},
+            "CommonPlaybooks": {"playbook": [f"CommonPlaybook{index:03d}" for index in range(spec.upstream_items)]},
+        }
+        self.installed = [
+            {
+                "id": f"Installed{index:03d}",
+                "contentItems": {
+                    "automation": [{"name": f"Installed{index:03d}_Script{item:03d}"} for item in range(spec.upstream_items)],
+                    "integration": [
+                        {
+                            "id": f"Installed{index:03d}_Integration",
+                            "commands": [{"name": f"installed{index:03d}-command-{item}"} for item in range(spec.upstream_items)],
+                        }
+                    ],
+                    "playbook": [{"name": f"Installed{index:03d}_Playbook{item:03d}"} for item in range(spec.upstream_items)],
+                },
+            }
+            for index in range(spec.installed_packs)
+        ]
+        self.external = self._external_items()
+
+    def _external_items(self) -> dict[str, list[str]]:
+        """Returns the upstream and installed content items that can be referenced, by kind."""
+        external: dict[str, list[str]] = {"script": [], "playbook": [], "command": []}
+        for pack in self.upstream.values():
+            for kind, names in pack.items():
+                external[kind].extend(names)
+        for pack in self.installed:
+            items = pack["contentItems"]
+            external["script"].extend(item["name"] for item in items["automation"])
+            external["playbook"].extend(item["name"] for item in items["playbook"])
+            external["command"].extend(command["name"] for integration in items["integration"] for command in integration["commands"])
+        return external
+
+    def _references(self, pack: str, kinds: tuple[str, ...]) -> list[tuple[str, str]]:
+        """Draws (kind, name) references from `pack`, other packs and external content."""
+        references = []
+        for _ in range(self.rng.randint(0, round(2 * self.spec.references_per_item))):
+            kind = self.rng.choice(kinds)
+            draw = self.rng.random()
+            if draw < self.spec.external_ratio:
+                candidates = self.external[kind]
+            elif draw < self.spec.external_ratio + self.spec.cross_pack_ratio and len(self.pack_names) > 1:
+                candidates = self.items[self.rng.choice([other for other in self.pack_names if other != pack])][kind]
+            else:
+                candidates = self.items[pack][kind]
+            if candidates:
+                references.append((kind, self.rng.choice(candidates)))
+        return references
+
+    def _task_id(self) -> str:
+        return "-".join(f"{self.rng.getrandbits(bits):0{bits // 4}x}" for bits in (32, 16, 16, 16, 48))
+
+    def _task(self, index: int, name: str, **task: str) -> dict:
+        return {
+            "id": str(index),
+            "taskid": self._task_id(),
+            "type": "regular" if task else "start",
+            "task": {"id": self._task_id(), "version": -1, "name": name, "iscommand": False, "brand": "", **task},
+            "nexttasks": {"#none#": [str(index + 1)]},
+            "separatecontext": False,
+            "view": json.dumps({"position": {"x": 50, "y": 50 + 145 * index}}),
+            "note": False,
+            "timertriggers": [],
+            "ignoreworker": False,
+            "skipunavailable": False,
+            "quietmode": 0,
+        }
+
+    def write_playbook(self, path: Path, playbook_id: str, references: list[tuple[str, str]]) -> None:
+        tasks = {"0": self._task(0, "")}
+        for index, (kind, name) in enumerate(references, start=1):
+            if kind == "playbook":
+                task = {"playbookName": name}
+            elif kind == "command":
+                task = {"script": f"|||{name}"}
+            else:
+                task = {"scriptName": name}
+            tasks[str(index)] = self._task(index, f"Run {name}", **task)
+        # Playbooks commonly use Builtin commands, which are not part of the graph
+        tasks[str(len(tasks))] = self._task(len(tasks), "Close investigation", script="Builtin|||closeInvestigation")
+        playbook = {"id": playbook_id, "version": -1, "name": playbook_id, "starttaskid": "0", "tasks": tasks}
+        path.write_text(yaml.safe_dump(playbook, sort_keys=False))
+
+    def write_script(self, directory: Path, script_id: str, references: list[tuple[str, str]]) -> None:
+        directory.mkdir(parents=True)
+        script = {
+            "commonfields": {"id": script_id, "version": -1},
+            "name": script_id,
+            "comment": f"Synthetic script {script_id}",
+            "args": [{"name": "value", "description": "Input value", "required": False}],
+            "script": "-",
+            "type": "python",
+            "subtype": "python3",
+            "dockerimage": "demisto/python3:3.12.8.1983910",
+            "fromversion": "6.10.0",
+        }
+        calls = [
+            f'    results["{name}"] = demisto.executeCommand("{name}", args)'
+            if index % 2
+            else f'    results["{name}"] = execute_command("{name}", args)'
+            for index, (_, name) in enumerate(references)
+        ]
+        (directory / f"{script_id}.yml").write_text(yaml.safe_dump(script, sort_keys=False))
+        code = SCRIPT_TEMPLATE.format(name=script_id, function=script_id.lower(), calls="\n".join(calls) or "    pass")
+        (directory / f"{script_id}.py").write_text(code)
+
+    def write_layout(self, path: Path, layout_id: str, references: list[tuple[str, str]]) -> None:
+        items = [{"fieldId": "type", "id": "incident-type-field", "sectionItemType": "field"}]
+        sections = [{"id": "info", "name": "Info", "items": items}]
+        for index, (_, name) in enumerate(references):
+            if index % 2:
+                sections.append({"id": f"dynamic-{index}", "name": name, "queryType": "script", "query": name})
+            else:
+                items.append({"id": f"button-{index}", "name": f"Run {name}", "scriptId": name, "sectionItemType": "button"})
+        layout = {"id": layout_id, "name": layout_id, "group": "incident", "version": -1, "detailsV2": {"tabs": [{"id": "main", "sections": sections}]}}
+        path.write_text(json.dumps(layout, indent=4))
+
+    def write_integration(self, directory: Path, integration_id: str, commands: list[str]) -> None:
+        directory.mkdir(parents=True)
+        integration = {
+            "commonfields": {"id": integration_id, "version": -1},
+            "name": integration_id,
+            "display": integration_id,
+            "category": "Utilities",
+            "configuration": [{"name": "url", "display": "Server URL", "type": 0, "required": True}],
+            "script": {
+                "script": "-",
+                "type": "python",
+                "subtype": "python3",
+                "commands": [{"name": command, "description": f"Runs {command}", "arguments": []} for command in commands],
+            },
+        }
+        (directory / f"{integration_id}.yml").write_text(yaml.safe_dump(integration, sort_keys=False))
+        (directory / f"{integration_id}.py").write_text("import demistomock as demisto\n")
+
+    def write_pack(self, path: Path, pack: str, items: dict[str, list[str]], *, references: bool = True) -> None:
+        """Writes a pack with the content `items` by kind. Without `references`, the items don't reference anything."""
+        path.mkdir(parents=True)
+        metadata = {"name": pack, "description": f"Synthetic pack {pack}", "support": "community", "currentVersion": "1.0.0"}
+        (path / "pack_metadata.json").write_text(json.dumps(metadata, indent=4))
+        for directory in ("Playbooks", "Layouts"):
+            if items.get(directory[:-1].lower()):
+                (path / directory).mkdir()
+
+        def draw(kinds: tuple[str, ...]) -> list[tuple[str, str]]:
+            return self._references(pack, kinds) if references else []
+
+        for playbook_id in items.get("playbook", []):
+            self.write_playbook(path / "Playbooks" / f"{playbook_id}.yml", playbook_id, draw(("script", "playbook", "command")))
+        for script_id in items.get("script", []):
+            self.write_script(path / "Scripts" / script_id, script_id, draw(("script", "command")))
+        for layout_id in items.get("layout", []):
+            self.write_layout(path / "Layouts" / f"layoutscontainer-{layout_id}.json", layout_id, draw(("script",)))
+        per_integration = self.spec.commands_per_integration
+        for index, integration_id in enumerate(items.get("integration", [])):
+            commands = items["command"][index * per_integration : (index + 1) * per_integration]
+            self.write_integration(path / "Integrations" / integration_id, integration_id, commands)
+
+
+def generate_content_repo(
+    repo_path: Path, spec: SyntheticRepoSpec | None = None, *, seed: int = 0, upstream_path: Path | None = None
+) -> list[dict]:
+    """Writes a synthetic content repository in content pack structure to `repo_path`, which must not exist yet.
+
+    Every pack has playbooks, split scripts whose code calls `execute_command` and `demisto.executeCommand`,
+    layouts with script buttons and dynamic sections, and integrations with commands, referencing each other as
+    described by `spec`. The same `spec` and `seed` always give byte for byte the same files.
+
+    If `upstream_path` is given, the Base, CommonScripts and CommonPlaybooks packs referenced by the repository are
+    written there, for `ContentGraph(upstream_repo_path=...)`. Returns the installed content metadata referenced by
+    the repository, for `ContentGraph(installed_content=...)`.
+    """
+    spec = spec or SyntheticRepoSpec()
+    generator = _Generator(spec, seed)
+    for pack in generator.pack_names:
+        generator.write_pack(repo_path / "Packs" / pack, pack, generator.items[pack])
+    if upstream_path is not None:
+        for directory, pack in UPSTREAM_PACKS.items():
+            generator.write_pack(upstream_path / "Packs" / directory, pack, generator.upstream[directory], references=False)
+    return generator.installed
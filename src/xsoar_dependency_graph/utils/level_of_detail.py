@@ -0,0 +1,225 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import networkx as nx
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import to_rgba
+
+from ..layout import NodePositions
+from .plot_interaction import PlotInteractionHandler
+
+# Opacity of edges that are neither hidden nor highlighted
+EDGE_ALPHA = 0.4
+
+
+def pack_groups(graph: nx.Graph, nodes_list: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Groups nodes by content pack. Returns the group names and the group index of every node.
+
+    Pack nodes and the items with their `pack_name` form one group named after the pack. Nodes that don't belong
+    to a pack are groups of their own.
+    """
+    keys = []
+    for node in nodes_list:
+        data = graph.nodes[node]
+        keys.append(node if data.get("node_type") == "Content Pack" else data.get("pack_name") or node)
+    groups, group_index = np.unique(np.array(keys, dtype=object).astype(str), return_inverse=True)
+    return groups, group_index
+
+
+class ViewIndex:
+    """Finds the points inside a view rectangle and the edges touching them without scanning every point and edge.
+
+    Points are kept sorted by x, so a view only looks at the points in its x range, and the edges incident to
+    every point are stored contiguously, in compressed sparse row form.
+    """
+
+    def __init__(self, xy: np.ndarray, edge_index: np.ndarray) -> None:
+        endpoints = edge_index.T.reshape(-1)
+        self._incident = np.argsort(endpoints, kind="stable") % max(len(edge_index), 1)
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(endpoints, minlength=len(xy)))])
+        self.set_positions(xy)
+
+    def set_positions(self, xy: np.ndarray) -> None:
+        self._xy = xy
+        self._order = np.argsort(xy[:, 0], kind="stable")
+        self._sorted_x = xy[self._order, 0]
+
+    def points_in(self, xlim: tuple[float, float], ylim: tuple[float, float]) -> np.ndarray:
+        """Returns the sorted indices of the points inside the rectangle `xlim` x `ylim`."""
+        (left, right), (bottom, top) = sorted(xlim), sorted(ylim)
+        start = np.searchsorted(self._sorted_x, left, side="left")
+        stop = np.searchsorted(self._sorted_x, right, side="right")
+        candidates = self._order[start:stop]
+        y = self._xy[candidates, 1]
+        return np.sort(candidates[(y >= bottom) & (y <= top)])
+
+    def edges_touching(self, points: np.ndarray) -> np.ndarray:
+        """Returns the sorted indices of the edges with at least one endpoint in `points`."""
+        starts, stops = self._offsets[points], self._offsets[points + 1]
+        counts = stops - starts
+        if not counts.sum():
+            return np.empty(0, dtype=np.int64)
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return np.unique(self._incident[positions])
+
+
+@dataclass
+class LevelOfDetailRenderer:
+    """Redraws the graph plot for the current view whenever the axes are zoomed or panned.
+
+    When more than `max_nodes` nodes are inside the view, every content pack is drawn as one super-node at the
+    centroid of its items, sized by the number of items, with edges between packs drawn as single lines whose
+    width grows with the number of edges they aggregate. Otherwise, the individual nodes inside the view are
+    drawn, along with their edges. Only nodes and edges touching the view are drawn, and they are looked up in a
+    `ViewIndex`, so the work per frame is bounded by `max_nodes` rather than the size of the graph.
+
+    Zooming changes both axis limits, so the limit callbacks only mark the view as stale, and the plot is updated
+    once on the next draw.
+
+    The node scatter and edge collection are reused for both levels, and the interaction handler is updated to
+    the drawn nodes, so hovering a super-node shows its pack. Nodes hidden by `PlotFilter` are left out of the
+    super-node sizes, centroids and aggregated edges.
+    """
+
+    ax: Axes
+    graph: nx.Graph
+    pos: Mapping[str, np.ndarray]
+    nodes_list: np.ndarray
+    sizes: np.ndarray
+    face_colors: np.ndarray  # RGBA per node
+    edge_colors: np.ndarray  # RGBA per node
+    nodes: PathCollection
+    edges: LineCollection
+    pack_color: str
+    handler: PlotInteractionHandler | None = None
+    max_nodes: int = 2000
+    base_size: float = 30
+    aggregated: bool = field(default=False, init=False)
+    # Per node and per edge opacity of the individual nodes, see `PlotFilter`
+    node_alpha: np.ndarray | None = field(default=None, init=False)
+    edge_alpha: np.ndarray | None = field(default=None, init=False)
+    stale: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        self._node_index = node_index = {node: index for index, node in enumerate(self.nodes_list)}
+        self._edge_index = np.array(
+            [(node_index[u], node_index[v]) for u, v in self.graph.edges() if u in node_index and v in node_index], dtype=np.int64
+        ).reshape(-1, 2)
+
+        self._groups, group_index = pack_groups(self.graph, self.nodes_list)
+        counts = np.bincount(group_index, minlength=len(self._groups))
+        self._group_index = group_index
+        self._group_node_index = {group: index for index, group in enumerate(self._groups.tolist())}
+        # Groups of a single node keep its colours, packs are drawn in the pack colour
+        member = np.empty(len(self._groups), dtype=np.int64)
+        member[group_index] = np.arange(len(group_index))
+        single = counts == 1
+        self._group_face_colors = np.tile(to_rgba(self.pack_color), (len(self._groups), 1))
+        self._group_face_colors[single] = self.face_colors[member[single]]
+        self._group_edge_colors = np.tile(to_rgba("black"), (len(self._groups), 1))
+        self._group_edge_colors[single] = self.edge_colors[member[single]]
+
+        self._view_index = ViewIndex(np.zeros((len(self.nodes_list), 2)), self._edge_index)
+        self._shown = np.ones(len(self.nodes_list), dtype=bool)
+        self._aggregate()
+        self.set_positions(self.pos)
+
+    def _aggregate(self) -> None:
+        """Sizes the groups by their shown nodes and aggregates the edges between shown nodes, so hidden nodes
+        don't count towards super-nodes and their edges."""
+        self._group_counts = np.bincount(self._group_index[self._shown], minlength=len(self._groups))
+        self._group_sizes = self.base_size * np.sqrt(self._group_counts)
+        edge_index = self._edge_index[self._shown[self._edge_index[:, 0]] & self._shown[self._edge_index[:, 1]]]
+        group_edges = np.sort(self._group_index[edge_index], axis=1)
+        group_edges = group_edges[group_edges[:, 0] != group_edges[:, 1]]
+        self._group_edges, self._group_edge_weights = np.unique(group_edges, axis=0, return_counts=True)
+        self._group_edges = self._group_edges.reshape(-1, 2)
+        self._group_view_index = ViewIndex(np.zeros((len(self._groups), 2)), self._group_edges)
+
+    def _set_group_positions(self) -> None:
+        shown_xy = self._xy * self._shown[:, None]
+        self._group_xy = np.stack(
+            [np.bincount(self._group_index, weights=shown_xy[:, axis]) / np.maximum(self._group_counts, 1) for axis in (0, 1)],
+            axis=1,
+        )
+        self._group_pos = NodePositions(self._group_node_index, self._group_xy)
+        self._group_view_index.set_positions(self._group_xy)
+
+    def set_positions(self, pos: Mapping[str, np.ndarray]) -> None:
+        """Moves the nodes to new positions. Call `update` to redraw."""
+        self.set_xy(np.array([pos[node] for node in self.nodes_list], dtype=np.float64).reshape(-1, 2))
+
+    def set_xy(self, xy: np.ndarray) -> None:
+        """Moves the nodes to new positions in `nodes_list` order, e.g. while the layout is being refined. Call
+        `update` to redraw."""
+        self._xy = xy
+        self.pos = NodePositions(self._node_index, xy)
+        self._view_index.set_positions(self._xy)
+        self._set_group_positions()
+
+    def update(self, *_: Any) -> None:
+        """Shows the level of detail matching the current view. Nodes with a `node_alpha` of 0 are hidden at both
+        levels."""
+        self.stale = False
+        shown = self.node_alpha > 0 if self.node_alpha is not None else np.ones(len(self.nodes_list), dtype=bool)
+        if not np.array_equal(shown, self._shown):
+            self._shown = shown
+            self._aggregate()
+            self._set_group_positions()
+
+        view = (self.ax.get_xlim(), self.ax.get_ylim())
+        visible = self._view_index.points_in(*view)
+        visible = visible[shown[visible]]
+        view_index = self._view_index
+        self.aggregated = len(visible) > self.max_nodes
+        if self.aggregated:
+            xy, edge_index, names = self._group_xy, self._group_edges, self._groups
+            view_index = self._group_view_index
+            visible = view_index.points_in(*view)
+            visible = visible[self._group_counts[visible] > 0]
+            face_colors, edge_colors, sizes = self._group_face_colors, self._group_edge_colors, self._group_sizes
+            linewidths = 1 + np.log2(self._group_edge_weights)
+            edge_alpha = np.full(len(edge_index), EDGE_ALPHA)
+            pos = self._group_pos
+        else:
+            xy, edge_index, names = self._xy, self._edge_index, self.nodes_list
+            face_colors, edge_colors, sizes = self.face_colors, self.edge_colors, self.sizes
+            linewidths = np.ones(len(edge_index))
+            edge_alpha = self.edge_alpha if self.edge_alpha is not None else np.full(len(edge_index), EDGE_ALPHA)
+            if self.node_alpha is not None:
+                face_colors, edge_colors = face_colors.copy(), edge_colors.copy()
+                face_colors[:, 3] *= self.node_alpha
+                edge_colors[:, 3] *= self.node_alpha
+            pos = self.pos
+
+        self.nodes.set_offsets(xy[visible])
+        self.nodes.set_sizes(sizes[visible])
+        self.nodes.set_facecolors(face_colors[visible])
+        self.nodes.set_edgecolors(edge_colors[visible])
+        visible_edges = view_index.edges_touching(visible)
+        self.edges.set_segments(xy[edge_index[visible_edges]])
+        self.edges.set_linewidths(linewidths[visible_edges])
+        line_colors = np.zeros((len(visible_edges), 4))
+        line_colors[:, 3] = edge_alpha[visible_edges]
+        self.edges.set_colors(line_colors)
+        if self.handler is not None:
+            self.handler.set_nodes(names[visible], pos)
+
+    def mark_stale(self, *_: Any) -> None:
+        self.stale = True
+
+    def on_draw(self, *_: Any) -> None:
+        """Updates the plot if the view changed since the last draw, and draws it again."""
+        if self.stale:
+            self.update()
+            self.ax.figure.canvas.draw_idle()
+
+    def connect(self) -> None:
+        """Updates the plot once per draw after the view limits changed, and once for the current view."""
+        self.ax.callbacks.connect("xlim_changed", self.mark_stale)
+        self.ax.callbacks.connect("ylim_changed", self.mark_stale)
+        self.ax.figure.canvas.mpl_connect("draw_event", self.on_draw)
+        self.update()
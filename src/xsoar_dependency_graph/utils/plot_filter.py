@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.figure import Figure
+from matplotlib.legend import Legend
+
+from .level_of_detail import EDGE_ALPHA, LevelOfDetailRenderer
+from .plot_interaction import HIGHLIGHT_KEY, PlotInteractionHandler
+
+DIMMED_NODE_ALPHA = 0.15
+DIMMED_EDGE_ALPHA = 0.05
+
+
+@dataclass
+class PlotFilter:
+    """Toggles node types from the legend and highlights the neighbours of clicked nodes.
+
+    Clicking a legend entry hides or shows all nodes of that type, along with their edges. Shift-clicking a node
+    dims everything except the node, its neighbours and its edges, and shift-clicking the background or
+    right-clicking clears the highlight. Both only change the colours of the already drawn scatter and edge
+    collection, so nothing is laid out or drawn again. Neighbours are looked up in a CSR adjacency array built
+    once, in the order of `nodes_list`.
+
+    If a `renderer` is given, the colours are applied through it, so they survive level of detail changes.
+    """
+
+    fig: Figure
+    ax: Axes
+    graph: nx.Graph
+    nodes_list: np.ndarray
+    nodes: PathCollection
+    edges: LineCollection
+    face_colors: np.ndarray  # RGBA per node
+    edge_colors: np.ndarray  # RGBA per node
+    legend: Legend
+    legend_types: list[str]  # node type of every legend entry
+    handler: PlotInteractionHandler
+    renderer: LevelOfDetailRenderer | None = None
+    hidden_types: set[str] = field(default_factory=set)
+    highlighted: int | None = None
+
+    def __post_init__(self) -> None:
+        self._node_index = {node: index for index, node in enumerate(self.nodes_list)}
+        self._node_types = np.array([str(self.graph.nodes[node].get("node_type")) for node in self.nodes_list])
+        self._edge_index = np.array(
+            [(self._node_index[u], self._node_index[v]) for u, v in self.graph.edges()], dtype=np.int64
+        ).reshape(-1, 2)
+        n = len(self.nodes_list)
+        sources = np.concatenate([self._edge_index[:, 0], self._edge_index[:, 1]])
+        targets = np.concatenate([self._edge_index[:, 1], self._edge_index[:, 0]])
+        adjacency = sp.csr_array((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+        self._indptr, self._indices = adjacency.indptr, adjacency.indices
+
+        # Both the marker and the label of a legend entry toggle its node type
+        self._legend_entries: dict[Any, tuple[str, Any, Any]] = {}
+        for node_type, handle, text in zip(self.legend_types, self.legend.legend_handles, self.legend.get_texts(), strict=True):
+            for artist in (handle, text):
+                artist.set_picker(True)
+                self._legend_entries[artist] = (node_type, handle, text)
+
+    def neighbours(self, index: int) -> np.ndarray:
+        """Returns the indices of the neighbours of the node at `index` in `nodes_list`."""
+        return self._indices[self._indptr[index] : self._indptr[index + 1]]
+
+    def apply(self) -> None:
+        """Applies the hidden node types and the highlight to the node and edge colours."""
+        visible = ~np.isin(self._node_types, list(self.hidden_types))
+        node_alpha = visible.astype(np.float64)
+        edge_alpha = EDGE_ALPHA * (visible[self._edge_index[:, 0]] & visible[self._edge_index[:, 1]])
+        if self.highlighted is not None:
+            focus = np.zeros(len(self.nodes_list), dtype=bool)
+            focus[self.neighbours(self.highlighted)] = True
+            focus[self.highlighted] = True
+            node_alpha[~focus] *= DIMMED_NODE_ALPHA
+            incident = (self._edge_index[:, 0] == self.highlighted) | (self._edge_index[:, 1] == self.highlighted)
+            edge_alpha = np.where(incident, 2 * edge_alpha, edge_alpha * DIMMED_EDGE_ALPHA / EDGE_ALPHA)
+        self.handler.set_hidden(self.nodes_list[~visible])
+
+        if self.renderer is not None:
+            self.renderer.node_alpha = node_alpha
+            self.renderer.edge_alpha = edge_alpha
+            self.renderer.update()
+        else:
+            face_colors, edge_colors = self.face_colors.copy(), self.edge_colors.copy()
+            face_colors[:, 3] *= node_alpha
+            edge_colors[:, 3] *= node_alpha
+            self.nodes.set_facecolors(face_colors)
+            self.nodes.set_edgecolors(edge_colors)
+            line_colors = np.zeros((len(edge_alpha), 4))
+            line_colors[:, 3] = edge_alpha
+            self.edges.set_colors(line_colors)
+        self.fig.canvas.draw_idle()
+
+    def on_pick(self, event: Any) -> None:
+        """Toggles the node type of a clicked legend entry."""
+        if event.artist not in self._legend_entries:
+            return
+        node_type, handle, text = self._legend_entries[event.artist]
+        self.hidden_types ^= {node_type}
+        hidden = node_type in self.hidden_types
+        handle.set_alpha(0.3 if hidden else 1.0)
+        text.set_alpha(0.3 if hidden else 1.0)
+        self.apply()
+
+    def on_click(self, event: Any) -> None:
+        """Highlights the neighbourhood of a shift-clicked node, and clears the highlight on shift-clicks elsewhere
+        and right clicks."""
+        if event.inaxes != self.ax or self.legend.contains(event)[0]:
+            return
+        if event.button == 1 and event.key != HIGHLIGHT_KEY:
+            return
+        node = self.handler.node_at(event) if event.button == 1 else None
+        index = self._node_index.get(node)
+        if index == self.highlighted:
+            return
+        self.highlighted = index
+        self.apply()
+
+    def connect(self) -> None:
+        """Connect event handlers to the figure canvas."""
+        self.fig.canvas.mpl_connect("pick_event", self.on_pick)
+        self.fig.canvas.mpl_connect("button_press_event", self.on_click)
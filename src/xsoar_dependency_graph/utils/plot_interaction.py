@@ -1,3 +1,5 @@
+import time
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -6,25 +8,48 @@ import numpy as np
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 from matplotlib.text import Annotation
+from scipy.spatial import cKDTree
+
+# Modifier key for highlighting neighbours (see `PlotFilter`), as a plain left click pins the annotation of a node
+HIGHLIGHT_KEY = "shift"
 
 
 @dataclass
 class PlotInteractionHandler:
-    """Handles mouse interaction events for the graph plot."""
+    """Handles mouse interaction events for the graph plot.
+
+    Nodes under the mouse are found with a KD-tree over the node positions in display coordinates, which is rebuilt
+    lazily after zooming, panning or resizing. Mouse moves arriving within `hover_interval` seconds of each other
+    are coalesced, so only the latest one is handled, and annotations are only redrawn when the hovered node changes.
+
+    Annotations are animated artists. After every full draw of the figure the canvas is cached, and annotation
+    changes are blitted over that background instead of redrawing the whole graph.
+    """
 
     graph: nx.Graph
     fig: Figure
     ax: Axes
-    pos: dict[str, tuple[float, float]]
+    pos: Mapping[str, tuple[float, float]]
     nodes: Any  # matplotlib PathCollection
     nodes_list: np.ndarray
     annotation: Annotation
     pinned_annotations: dict[str, Annotation] = field(default_factory=dict)
+    hover_interval: float = 1 / 60
+    _tree: cKDTree | None = field(default=None, init=False, repr=False)
+    _radii: np.ndarray | None = field(default=None, init=False, repr=False)
+    _hovered: str | None = field(default=None, init=False, repr=False)
+    _pending_event: Any = field(default=None, init=False, repr=False)
+    _last_hover: float = field(default=float("-inf"), init=False, repr=False)
+    _timer: Any = field(default=None, init=False, repr=False)
+    _background: Any = field(default=None, init=False, repr=False)
+    _hidden: frozenset = field(default=frozenset(), init=False, repr=False)
+    _hidden_mask: np.ndarray | None = field(default=None, init=False, repr=False)
 
     def _node_text(self, node: str) -> str:
         """Format node attributes as text for annotation display."""
         node_attr = {"node_name": node}
-        node_attr.update(self.graph.nodes[node])
+        if node in self.graph:
+            node_attr.update(self.graph.nodes[node])
         return "\n".join(f"{k}: {v}" for k, v in node_attr.items())
 
     def _make_annotation(self, *, xy: tuple[float, float], text: str) -> Annotation:
@@ -38,39 +63,114 @@ class PlotInteractionHandler:
             arrowprops={"arrowstyle": "->"},
         )
         ann.set_visible(True)
+        ann.set_animated(True)
         return ann
 
-    def _node_from_ind(self, ind: dict) -> str:
-        """Get node identifier from matplotlib event index."""
-        index = int(ind["ind"][0])
-        return str(self.nodes_list[index])
+    def _annotations(self) -> list[Annotation]:
+        return [self.annotation, *self.pinned_annotations.values()]
+
+    def on_draw(self, _event: Any) -> None:
+        """Caches the freshly drawn figure without annotations and draws the annotations on top of it."""
+        canvas = self.fig.canvas
+        if not canvas.supports_blit:
+            return
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        for annotation in self._annotations():
+            self.fig.draw_artist(annotation)
+
+    def _redraw_annotations(self) -> None:
+        """Blits the annotations over the cached background, or redraws the figure if there is none yet."""
+        canvas = self.fig.canvas
+        if self._background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        for annotation in self._annotations():
+            self.fig.draw_artist(annotation)
+        canvas.blit(self.fig.bbox)
+
+    def set_nodes(self, nodes_list: np.ndarray, pos: Mapping[str, tuple[float, float]]) -> None:
+        """Replaces the nodes that can be hovered and clicked, after the scatter has been redrawn with other nodes."""
+        self.nodes_list = nodes_list
+        self.pos = pos
+        self.invalidate_hit_test()
+        self._hovered = None
+        self.annotation.set_visible(False)
 
-    def _update_annotation(self, ind: dict) -> None:
+    def set_hidden(self, nodes: np.ndarray) -> None:
+        """Excludes `nodes` from hovering and clicking, e.g. because their node type is hidden."""
+        self._hidden = frozenset(nodes.tolist())
+        self.invalidate_hit_test()
+        if self._hovered in self._hidden:
+            self._hovered = None
+            self.annotation.set_visible(False)
+
+    def invalidate_hit_test(self, *_: Any) -> None:
+        """Drops the KD-tree, so it is rebuilt for the current view on the next mouse event."""
+        self._tree = None
+
+    def _build_hit_test(self) -> None:
+        """Builds the KD-tree over node positions in display coordinates and the marker radius of every node."""
+        coordinates = np.array([self.pos[node] for node in self.nodes_list], dtype=np.float64).reshape(-1, 2)
+        self._tree = cKDTree(self.ax.transData.transform(coordinates))
+        # Marker sizes are areas in points^2, hit-testing works with radii in pixels
+        sizes = np.broadcast_to(self.nodes.get_sizes(), (len(self.nodes_list),))
+        self._radii = np.sqrt(sizes) / 2 * self.fig.dpi / 72
+        self._hidden_mask = np.isin(self.nodes_list, list(self._hidden))
+
+    def node_at(self, event: Any) -> str | None:
+        """Returns the node whose marker contains the event position, preferring the closest one."""
+        if self._tree is None:
+            self._build_hit_test()
+        if not len(self.nodes_list):
+            return None
+        point = (event.x, event.y)
+        candidates = self._tree.query_ball_point(point, r=float(self._radii.max()))
+        if not candidates:
+            return None
+        candidates = np.asarray(candidates)
+        distances = np.hypot(*(self._tree.data[candidates] - point).T)
+        hits = (distances <= self._radii[candidates]) & ~self._hidden_mask[candidates]
+        if not hits.any():
+            return None
+        return str(self.nodes_list[candidates[hits][np.argmin(distances[hits])]])
+
+    def _update_annotation(self, node: str) -> None:
         """Update the hover annotation text and position."""
-        node = self._node_from_ind(ind)
-        xy = self.pos[node]
-        self.annotation.xy = xy
+        self.annotation.xy = self.pos[node]
         self.annotation.set_text(self._node_text(node))
 
     def on_hover(self, event: Any) -> None:
-        """Handle mouseover hover events to show node annotations."""
-        vis = self.annotation.get_visible()
-        if event.inaxes == self.ax:
-            cont, ind = self.nodes.contains(event)
-            if cont:
-                node = self._node_from_ind(ind)
-                if node in self.pinned_annotations:
-                    if vis:
-                        self.annotation.set_visible(False)
-                        self.fig.canvas.draw_idle()
-                    return
-
-                self._update_annotation(ind)
-                self.annotation.set_visible(True)
-                self.fig.canvas.draw_idle()
-            elif vis:
+        """Handle mouseover hover events to show node annotations, coalescing events within `hover_interval`."""
+        self._pending_event = event
+        elapsed = time.monotonic() - self._last_hover
+        if elapsed >= self.hover_interval:
+            self._handle_pending_hover()
+        elif self._timer is None:
+            # Handle the latest event once the interval has passed, so the annotation isn't left stale
+            self._timer = self.fig.canvas.new_timer(interval=max(1, int((self.hover_interval - elapsed) * 1000)))
+            self._timer.single_shot = True
+            self._timer.add_callback(self._handle_pending_hover)
+            self._timer.start()
+
+    def _handle_pending_hover(self) -> None:
+        self._timer = None
+        event, self._pending_event = self._pending_event, None
+        if event is None:
+            return
+        self._last_hover = time.monotonic()
+        node = self.node_at(event) if event.inaxes == self.ax else None
+        if node == self._hovered:
+            return
+        self._hovered = node
+        if node is None or node in self.pinned_annotations:
+            if self.annotation.get_visible():
                 self.annotation.set_visible(False)
-                self.fig.canvas.draw_idle()
+                self._redraw_annotations()
+            return
+        self._update_annotation(node)
+        self.annotation.set_visible(True)
+        self._redraw_annotations()
 
     def on_click(self, event: Any) -> None:
         """Handle click events to pin/unpin node annotations."""
@@ -84,33 +184,40 @@ class PlotInteractionHandler:
                     ann.remove()
                 self.pinned_annotations.clear()
                 self.annotation.set_visible(False)
-                self.fig.canvas.draw_idle()
+                self._hovered = None
+                self._redraw_annotations()
             return
 
-        # Only handle left-click for pin/unpin
-        if event.button != 1:
+        # Only handle left-click for pin/unpin, highlighting clicks are left to `PlotFilter`
+        if event.button != 1 or event.key == HIGHLIGHT_KEY:
             return
 
-        cont, ind = self.nodes.contains(event)
-        if not cont:
+        node = self.node_at(event)
+        if node is None:
             return
-
-        node = self._node_from_ind(ind)
+        # Let the next mouse move show the hover annotation again
+        self._hovered = None
 
         # Toggle pinned annotation off if already pinned
         if node in self.pinned_annotations:
             self.pinned_annotations[node].remove()
             del self.pinned_annotations[node]
-            self.fig.canvas.draw_idle()
+            self._redraw_annotations()
             return
 
         # Pin a new persistent annotation for this node
         xy = self.pos[node]
         self.pinned_annotations[node] = self._make_annotation(xy=xy, text=self._node_text(node))
         self.annotation.set_visible(False)
-        self.fig.canvas.draw_idle()
+        self._redraw_annotations()
 
     def connect(self) -> None:
         """Connect event handlers to the figure canvas."""
+        self.annotation.set_animated(True)
+        self.fig.canvas.mpl_connect("draw_event", self.on_draw)
         self.fig.canvas.mpl_connect("motion_notify_event", self.on_hover)
         self.fig.canvas.mpl_connect("button_press_event", self.on_click)
+        # Display coordinates of the nodes change when zooming, panning or resizing
+        self.ax.callbacks.connect("xlim_changed", self.invalidate_hit_test)
+        self.ax.callbacks.connect("ylim_changed", self.invalidate_hit_test)
+        self.fig.canvas.mpl_connect("resize_event", self.invalidate_hit_test)
@@ -0,0 +1,126 @@
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import networkx as nx
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.figure import Figure
+
+from ..layout import NodePositions, normalize_positions
+from .level_of_detail import LevelOfDetailRenderer
+from .plot_interaction import PlotInteractionHandler
+
+
+@dataclass
+class ProgressiveLayout:
+    """Computes the layout in a background thread and shows the intermediate positions while it is refined.
+
+    The `steps` iterator (e.g. `layout.barnes_hut_steps`) yields the positions of the nodes in `nodes_list` order
+    and runs in a daemon thread, which only keeps the most recent positions. A canvas timer draws them every
+    `frame_interval` seconds, so the plot refreshes at a fixed frame rate no matter how fast the layout iterates,
+    and the figure stays responsive. Pressing `stop_key` stops the layout early and keeps the current positions.
+
+    Positions are kept as an array in `nodes_list` order, and `pos` maps nodes to its rows, so no dict is built
+    per frame. Once all steps have run, `on_finish` is called with the final positions as a dict (see
+    `positions`), e.g. to cache them. It isn't called when the layout is stopped early. Closing the figure also
+    stops the layout.
+    """
+
+    fig: Figure
+    ax: Axes
+    graph: nx.Graph
+    steps: Iterator[np.ndarray]
+    nodes_list: np.ndarray
+    nodes: PathCollection
+    edges: LineCollection
+    handler: PlotInteractionHandler
+    pos: Mapping[str, np.ndarray]
+    renderer: LevelOfDetailRenderer | None = None
+    on_finish: Callable[[dict[str, np.ndarray]], None] | None = None
+    frame_interval: float = 1 / 15
+    stop_key: str = "enter"
+    finished: bool = field(default=False, init=False)
+    _latest: np.ndarray | None = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+    _timer: Any = field(default=None, init=False, repr=False)
+    _status: Any = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._node_index = node_index = {node: index for index, node in enumerate(self.nodes_list.tolist())}
+        self._xy = np.array([self.pos[node] for node in self.nodes_list], dtype=np.float64).reshape(-1, 2)
+        self._edge_index = np.array([(node_index[u], node_index[v]) for u, v in self.graph.edges()], dtype=np.int64).reshape(-1, 2)
+
+    def _run(self) -> None:
+        for xy in self.steps:
+            if self._stop.is_set():
+                return
+            with self._lock:
+                self._latest = xy
+        self.finished = True
+
+    def stop(self, *_: Any) -> None:
+        """Stops the layout after the current iteration."""
+        self._stop.set()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Blocks until the layout thread has stopped."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def positions(self) -> dict[str, np.ndarray]:
+        """Returns the current positions as a dict."""
+        return dict(zip(self.nodes_list.tolist(), self._xy, strict=True))
+
+    def _show(self, xy: np.ndarray) -> None:
+        self._xy = normalize_positions(xy)
+        self.pos = NodePositions(self._node_index, self._xy)
+        if self.renderer is not None:
+            self.renderer.set_xy(self._xy)
+            self.renderer.update()
+        else:
+            self.nodes.set_offsets(self._xy)
+            self.edges.set_segments(self._xy[self._edge_index])
+            self.handler.set_nodes(self.nodes_list, self.pos)
+        for node, annotation in self.handler.pinned_annotations.items():
+            if node in self.handler.pos:
+                annotation.xy = self.handler.pos[node]
+
+    def on_frame(self) -> None:
+        """Draws the most recent positions, and stops refreshing once the layout thread has stopped."""
+        running = self._thread is not None and self._thread.is_alive()
+        with self._lock:
+            xy, self._latest = self._latest, None
+        if xy is not None:
+            self._show(xy)
+        if not running:
+            if self._timer is not None:
+                self._timer.stop()
+            if self._status is not None:
+                self._status.remove()
+                self._status = None
+            if self.finished and self.on_finish is not None:
+                self.on_finish(self.positions())
+                self.on_finish = None
+        self.fig.canvas.draw_idle()
+
+    def on_key(self, event: Any) -> None:
+        if event.key == self.stop_key:
+            self.stop()
+
+    def connect(self) -> None:
+        """Starts the layout thread and the refresh timer, and connects event handlers to the figure canvas."""
+        self._status = self.ax.text(
+            0.01, 0.01, f"Refining layout, press {self.stop_key} to stop", transform=self.ax.transAxes, color="gray"
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._timer = self.fig.canvas.new_timer(interval=int(self.frame_interval * 1000))
+        self._timer.add_callback(self.on_frame)
+        self._timer.start()
+        self.fig.canvas.mpl_connect("key_press_event", self.on_key)
+        self.fig.canvas.mpl_connect("close_event", self.stop)
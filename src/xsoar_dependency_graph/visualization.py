@@ -1,33 +1,34 @@
 """Visualization functions for XSOAR content dependency graphs."""
 
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 
+from .layout import (
+    barnes_hut_steps,
+    cached_layout,
+    compute_layout,
+    layout_cache,
+    layout_cache_key,
+    normalize_positions,
+    plotted_component,
+)
+from .styles import DEFAULT_NODE_COLOR, NODE_PALETTE, NODE_TYPE_LABELS
+from .utils.level_of_detail import EDGE_ALPHA, LevelOfDetailRenderer
+from .utils.plot_filter import PlotFilter
 from .utils.plot_interaction import PlotInteractionHandler
-
-# Color palette for node types in graph visualization.
-# Uses colorblind-friendly colors from the Okabe-Ito palette.
-NODE_PALETTE = {
-    "Script": "#009E73",
-    "Playbook": "#0072B2",
-    "Content Pack": "#CC79A7",
-    "Layout": "#E69F00",
-    "CaseType": "#D55E00",
-    "Integration": "#56B4E9",
-    "Integration Command": "#F0E442",
-}
-
-# Display labels for node types in graph legend.
-NODE_TYPE_LABELS = {
-    "Script": "Scripts",
-    "Playbook": "Playbooks",
-    "Content Pack": "Content Packs",
-    "Layout": "Layouts",
-    "CaseType": "Case Types",
-    "Integration": "Integrations",
-    "Integration Command": "Integration Commands",
-}
+from .utils.progressive_layout import ProgressiveLayout
+from .writers.basic_writer import safe_file_names
 
 
 def _categorize_nodes_by_type(graph: nx.Graph) -> dict[str, list[str]]:
@@ -40,43 +41,130 @@ def _categorize_nodes_by_type(graph: nx.Graph) -> dict[str, list[str]]:
     return categorized
 
 
-def plot_graph(graph: nx.Graph) -> None:
-    """Plots the graph as a non-directional graph with interactive node inspection."""
+def _node_sizes(graph: nx.Graph, size_by: str | None, base_size: float = 30) -> dict[str, float]:
+    """Maps nodes to marker sizes. When `size_by` names a numeric node attribute (e.g. one of the centrality
+    metrics from `analytics.compute_centrality`), sizes are scaled linearly with the attribute value."""
+    if not size_by:
+        return dict.fromkeys(graph.nodes(), base_size)
+    values = dict(graph.nodes(data=size_by, default=0.0))
+    largest = max(values.values(), default=0.0)
+    if largest <= 0:
+        return dict.fromkeys(graph.nodes(), base_size)
+    return {node: base_size / 3 + base_size * 6 * value / largest for node, value in values.items()}
+
+
+def _node_colors(graph: nx.Graph, nodes_list: np.ndarray) -> tuple[list[str], list[str]]:
+    """Returns face and edge colours per node. Nodes of unknown types are drawn like plain networkx nodes."""
+    node_types = [graph.nodes[node].get("node_type") for node in nodes_list]
+    face_colors = [NODE_PALETTE.get(node_type, DEFAULT_NODE_COLOR) for node_type in node_types]
+    edge_colors = ["black" if node_type in NODE_PALETTE else "none" for node_type in node_types]
+    return face_colors, edge_colors
+
+
+def _legend_types(graph: nx.Graph) -> list[str]:
+    """Returns the node types shown in the legend, in order."""
+    return [node_type for node_type in _categorize_nodes_by_type(graph) if node_type in NODE_PALETTE]
+
+
+def _legend_handles(graph: nx.Graph) -> list[Line2D]:
+    """Returns one legend entry per node type present in the graph, as the nodes are drawn as a single scatter."""
+    return [
+        Line2D(
+            [],
+            [],
+            marker="o",
+            linestyle="",
+            markerfacecolor=NODE_PALETTE[node_type],
+            markeredgecolor="black",
+            markeredgewidth=0.8,
+            label=NODE_TYPE_LABELS.get(node_type, node_type),
+        )
+        for node_type in _legend_types(graph)
+    ]
+
+
+def _draw_graph(
+    ax: Axes, graph: nx.Graph, pos: dict[str, np.ndarray], nodes_list: np.ndarray, sizes: dict[str, float]
+) -> tuple[PathCollection, LineCollection]:
+    """Draws all edges as a single `LineCollection` and all nodes, in the order of `nodes_list`, as a single
+    scatter with per node colours and sizes."""
+    node_index = {node: index for index, node in enumerate(nodes_list)}
+    xy = np.array([pos[node] for node in nodes_list], dtype=np.float64).reshape(-1, 2)
+    edge_index = np.array([(node_index[u], node_index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    edges = LineCollection(xy[edge_index], colors=[(0.0, 0.0, 0.0, EDGE_ALPHA)], linewidths=1.0, zorder=1)
+    ax.add_collection(edges)
+    face_colors, edge_colors = _node_colors(graph, nodes_list)
+    nodes = ax.scatter(
+        xy[:, 0],
+        xy[:, 1],
+        s=[sizes[node] for node in nodes_list],
+        c=face_colors,
+        edgecolors=edge_colors,
+        linewidths=0.8,
+        zorder=2,
+    )
+    return nodes, edges
+
+
+def plot_graph(
+    graph: nx.Graph,
+    size_by: str | None = None,
+    *,
+    layout_engine: str = "spring",
+    use_cache: bool = False,
+    cache_dir: Path | None = None,
+    previous_pos: dict[str, np.ndarray] | None = None,
+    level_of_detail: bool = False,
+    max_nodes: int = 2000,
+    all_components: bool = False,
+    progressive: bool = False,
+) -> dict[str, np.ndarray]:
+    """Plots the graph as a non-directional graph with interactive node inspection. Nodes are sized by the node
+    attribute `size_by` if given. `layout_engine` is one of `layout.LAYOUT_ENGINES`, use "barnes-hut" for large
+    graphs. With `use_cache`, layout positions are cached in `cache_dir`, or `layout.DEFAULT_CACHE_DIR`, so
+    replotting an unchanged graph doesn't recompute the layout. Nothing is written to disk by default.
+
+    Returns the plotted positions. Pass them as `previous_pos` when replotting after a change, so that only new
+    nodes are placed and everything else stays where it was.
+
+    Only the largest connected component is plotted, unless `all_components` is set. All components are then
+    laid out in parallel and packed next to each other.
+
+    With `level_of_detail`, content packs are drawn as single nodes while more than `max_nodes` nodes are in view,
+    and only nodes and edges in view are drawn (see `LevelOfDetailRenderer`).
+
+    With `progressive`, a layout that isn't cached is computed in the background with the "barnes-hut" engine,
+    as the other engines can't report intermediate positions, and the plot is shown right away and refined while
+    the layout runs. Press Enter to stop refining early (see `ProgressiveLayout`).
+    """
+    if progressive and all_components:
+        msg = "Progressive layouts are only supported for the largest connected component"
+        raise ValueError(msg)
     fig = plt.figure("XSOAR content repository graph", figsize=(8, 8))
     axgrid = fig.add_gridspec(5, 4)
     ax0 = fig.add_subplot(axgrid[0:5, :])
 
-    # Create a subgraph of all connected components. We don't care about isolated
-    # nodes at this point.
-    gcc = graph.subgraph(sorted(nx.connected_components(graph), key=len, reverse=True)[0])
-    pos = nx.spring_layout(gcc, seed=10396953)
-
-    # Draw all nodes first (provides base layer), then draw colored nodes by type
-    nodes = nx.draw_networkx_nodes(gcc, pos, ax=ax0, node_size=30)
-
-    categorized_nodes = _categorize_nodes_by_type(gcc)
-    for node_type, node_list in categorized_nodes.items():
-        if node_type not in NODE_PALETTE:
-            continue
-        nx.draw_networkx_nodes(
-            gcc,
-            pos,
-            ax=ax0,
-            nodelist=node_list,
-            node_color=NODE_PALETTE[node_type],
-            edgecolors="black",
-            linewidths=0.8,
-            label=NODE_TYPE_LABELS.get(node_type, node_type),
-            node_size=30,
-        )
-    nx.draw_networkx_edges(gcc, pos, ax=ax0, alpha=0.4)
+    gcc = plotted_component(graph, all_components)
+    cache = layout_cache(use_cache, cache_dir)
+    steps = None
+    if progressive and not previous_pos and len(gcc) > 0:
+        layout_engine = "barnes-hut"
+        key = layout_cache_key(gcc, engine=layout_engine)
+        if cache is None or cached_layout(gcc, cache, key) is None:
+            steps = barnes_hut_steps(gcc)
+    if steps is not None:
+        pos = dict(zip(gcc.nodes(), normalize_positions(next(steps)), strict=True))
+    else:
+        pos = compute_layout(gcc, engine=layout_engine, cache=cache, previous_pos=previous_pos, per_component=all_components)
+    sizes = _node_sizes(gcc, size_by)
 
-    plt.legend(scatterpoints=1)
+    nodes_list = np.array(list(gcc.nodes()))
+    nodes, edges = _draw_graph(ax0, gcc, pos, nodes_list, sizes)
+
+    legend = ax0.legend(handles=_legend_handles(gcc), scatterpoints=1)
     ax0.set_axis_off()
     fig.tight_layout()
 
-    nodes_list = np.array(list(gcc.nodes()))
-
     # Define coordinates and styles of hover annotation
     annotation = ax0.annotate(
         "",
@@ -100,4 +188,163 @@ def plot_graph(graph: nx.Graph) -> None:
     )
     handler.connect()
 
+    face_colors, edge_colors = _node_colors(gcc, nodes_list)
+    face_colors, edge_colors = to_rgba_array(face_colors), to_rgba_array(edge_colors)
+    renderer = None
+    if level_of_detail:
+        renderer = LevelOfDetailRenderer(
+            ax=ax0,
+            graph=gcc,
+            pos=pos,
+            nodes_list=nodes_list,
+            sizes=np.array([sizes[node] for node in nodes_list]),
+            face_colors=face_colors,
+            edge_colors=edge_colors,
+            nodes=nodes,
+            edges=edges,
+            pack_color=NODE_PALETTE["Content Pack"],
+            handler=handler,
+            max_nodes=max_nodes,
+        )
+        renderer.connect()
+
+    # Legend entries toggle node types, shift-clicking a node highlights its neighbours
+    plot_filter = PlotFilter(
+        fig=fig,
+        ax=ax0,
+        graph=gcc,
+        nodes_list=nodes_list,
+        nodes=nodes,
+        edges=edges,
+        face_colors=face_colors,
+        edge_colors=edge_colors,
+        legend=legend,
+        legend_types=_legend_types(gcc),
+        handler=handler,
+        renderer=renderer,
+    )
+    plot_filter.connect()
+    # Matplotlib only keeps weak references to callbacks. The filter references the interaction handler and the
+    # level of detail renderer, so they stay connected for as long as the figure exists
+    fig.plot_filter = plot_filter
+
+    if steps is not None:
+        progressive_layout = ProgressiveLayout(
+            fig=fig,
+            ax=ax0,
+            graph=gcc,
+            steps=steps,
+            nodes_list=nodes_list,
+            nodes=nodes,
+            edges=edges,
+            handler=handler,
+            pos=pos,
+            renderer=renderer,
+            on_finish=(lambda final_pos: cache.put(key, final_pos)) if cache is not None else None,
+        )
+        progressive_layout.connect()
+
     plt.show()
+    if steps is not None:
+        # Closing the window or pressing the stop key stops the layout. Otherwise, e.g. on non-blocking backends,
+        # it runs to completion. Show and cache the final positions, in case there was no frame after the last step
+        progressive_layout.wait()
+        progressive_layout.on_frame()
+        return progressive_layout.positions()
+    return pos
+
+
+RENDER_FORMATS = ("png", "svg")
+
+
+def render_graph(
+    graph: nx.Graph,
+    filepath: Path,
+    size_by: str | None = None,
+    *,
+    title: str | None = None,
+    layout_engine: str = "spring",
+    use_cache: bool = False,
+    cache_dir: Path | None = None,
+    dpi: int = 100,
+) -> Path:
+    """Renders the whole graph to a PNG or SVG file, chosen by the suffix of `filepath`, without opening a window.
+
+    The figure is drawn on an Agg canvas that is not registered with pyplot, so this works without a display and
+    in worker processes. Layout options are the same as for `plot_graph`.
+    """
+    filepath = Path(filepath)
+    output_format = filepath.suffix.lstrip(".").lower()
+    if output_format not in RENDER_FORMATS:
+        msg = f"Output format {output_format} not one of {','.join(RENDER_FORMATS)}"
+        raise ValueError(msg)
+    pos = compute_layout(graph, engine=layout_engine, cache=layout_cache(use_cache, cache_dir))
+
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    nodes_list = np.array(list(graph.nodes()))
+    sizes = _node_sizes(graph, size_by)
+    _draw_graph(ax, graph, pos, nodes_list, sizes)
+    ax.legend(handles=_legend_handles(graph), scatterpoints=1)
+    if title:
+        ax.set_title(title)
+    ax.set_axis_off()
+    fig.tight_layout()
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(filepath, format=output_format, dpi=dpi)
+    return filepath
+
+
+def pack_subgraph(graph: nx.Graph, pack: str) -> nx.Graph:
+    """Returns the pack node, the items of the pack and their direct dependencies and dependents in other packs."""
+    members = {node for node, pack_name in graph.nodes(data="pack_name") if pack_name == pack}
+    if pack in graph:
+        members.add(pack)
+    neighbourhood = set(members)
+    for node in members:
+        neighbourhood.update(graph.neighbors(node))
+    return graph.subgraph(neighbourhood)
+
+
+def render_packs(
+    graph: nx.Graph,
+    output_path: Path,
+    packs: Iterable[str] | None = None,
+    *,
+    output_format: str = "png",
+    max_workers: int | None = None,
+    size_by: str | None = None,
+    layout_engine: str = "spring",
+    use_cache: bool = False,
+    cache_dir: Path | None = None,
+    dpi: int = 100,
+) -> dict[str, Path]:
+    """Renders the subgraph of every pack (see `pack_subgraph`) to `output_path`/<pack>.<output_format>, by
+    default for all content packs in the graph. Packs are laid out and rendered in parallel by up to `max_workers`
+    processes, each subgraph being laid out once. The remaining options are passed to `render_graph`. Returns the
+    written file of every pack, named as by `writers.basic_writer.safe_file_names`."""
+    if output_format not in RENDER_FORMATS:
+        msg = f"Output format {output_format} not one of {','.join(RENDER_FORMATS)}"
+        raise ValueError(msg)
+    if packs is None:
+        packs = [node for node, node_type in graph.nodes(data="node_type") if node_type == "Content Pack"]
+    output_path = Path(output_path)
+    file_names = safe_file_names(packs, f".{output_format}")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            pack: executor.submit(
+                render_graph,
+                # Copies are pickled to the workers instead of views holding the whole graph
+                pack_subgraph(graph, pack).copy(),
+                output_path / file_names[pack],
+                size_by,
+                title=pack,
+                layout_engine=layout_engine,
+                use_cache=use_cache,
+                cache_dir=cache_dir,
+                dpi=dpi,
+            )
+            for pack in packs
+        }
+        return {pack: future.result() for pack, future in futures.items()}
@@ -0,0 +1,88 @@
+import bz2
+import gzip
+import hashlib
+import lzma
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+import networkx as nx
+
+# Supported compression methods and the file name suffix used for each of them
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def compression_from_suffix(filepath: Path) -> str | None:
+    """Returns the compression method implied by the file name suffix, if any."""
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if filepath.suffix == suffix:
+            return compression
+    return None
+
+
+def safe_file_names(names: Iterable[str], suffix: str) -> dict[str, str]:
+    """Returns a file name for every name, replacing characters which aren't allowed in file names. Names that
+    only differ in such characters get the start of their hash appended, so they don't overwrite each other."""
+    sanitized = {name: re.sub(r"[^\w.-]", "_", name) for name in names}
+    counts = Counter(sanitized.values())
+    return {
+        name: (file_name if counts[file_name] == 1 else f"{file_name}-{hashlib.sha256(name.encode('utf-8')).hexdigest()[:8]}") + suffix
+        for name, file_name in sanitized.items()
+    }
+
+
+def open_output(filepath: Path, compression: str | None = None) -> TextIO:
+    """Opens `filepath` for writing text, compressing the output on the fly with `compression`."""
+    if compression is None:
+        return filepath.open("w", encoding="utf-8", newline="\n")
+    if compression == "gzip":
+        return gzip.open(filepath, "wt", encoding="utf-8", newline="\n")
+    if compression == "bz2":
+        return bz2.open(filepath, "wt", encoding="utf-8", newline="\n")
+    if compression == "xz":
+        return lzma.open(filepath, "wt", encoding="utf-8", newline="\n")
+    msg = f"Compression {compression} not one of {','.join(COMPRESSION_SUFFIXES)}"
+    raise ValueError(msg)
+
+
+class GraphWriter(ABC):
+    """Base class for writers of a graph to a file or directory."""
+
+    # Writers producing several files write them to a directory at `filepath` instead of a single file
+    writes_directory = False
+
+    def __init__(self, graph: nx.Graph) -> None:
+        self.graph = graph
+
+    def nodes(self) -> Iterator[tuple]:
+        """Yields (node, attributes) for the nodes to write."""
+        yield from self.graph.nodes(data=True)
+
+    def edges(self) -> Iterator[tuple]:
+        """Yields (source, target, attributes) for the edges to write."""
+        yield from self.graph.edges(data=True)
+
+    @abstractmethod
+    def write(self, filepath: Path, compression: str | None = None) -> None:
+        """Writes the graph to `filepath`, compressed with `compression`."""
+
+
+class BasicWriter(GraphWriter):
+    """Base class for writers streaming a graph to a single text file one node or edge at a time."""
+
+    def write(self, filepath: Path, compression: str | None = None) -> None:
+        with open_output(filepath, compression) as stream:
+            self.write_stream(stream)
+
+    @abstractmethod
+    def write_stream(self, stream: TextIO) -> None:
+        """Writes the graph to a text stream."""
+
+
+class DirectoryWriter(GraphWriter):
+    """Base class for writers producing a directory of files."""
+
+    writes_directory = True
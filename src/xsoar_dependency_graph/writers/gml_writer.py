@@ -0,0 +1,13 @@
+from typing import TextIO
+
+import networkx as nx
+
+from .basic_writer import BasicWriter
+
+
+class GMLWriter(BasicWriter):
+    """Writes GML line by line using the lazy GML generator in networkx."""
+
+    def write_stream(self, stream: TextIO) -> None:
+        for line in nx.generate_gml(self.graph):
+            stream.write(line + "\n")
@@ -0,0 +1,75 @@
+from itertools import chain
+from typing import Any, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from .basic_writer import BasicWriter
+
+_GRAPHML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+)
+
+# Same attribute type names as networkx.write_graphml, so files can be read back with networkx.read_graphml
+_XML_TYPES = {bool: "boolean", int: "long", float: "double", str: "string"}
+
+
+class GraphMLWriter(BasicWriter):
+    """Writes GraphML incrementally instead of building the whole XML document in memory.
+
+    Attribute keys have to be declared before the graph element, so the graph is traversed twice: once to
+    collect attribute names and types, and once to write nodes and edges. Attributes with values of different
+    types, or of types GraphML doesn't support, are written as strings.
+    """
+
+    def _collect_keys(self) -> dict[tuple[str, str], str]:
+        """Returns the GraphML type of every (scope, attribute name) in the graph."""
+        keys: dict[tuple[str, str], str] = {}
+        scoped_data = chain(
+            [("graph", self.graph.graph)],
+            (("node", data) for _, data in self.nodes()),
+            (("edge", data) for _, _, data in self.edges()),
+        )
+        for scope, data in scoped_data:
+            for name, value in data.items():
+                xml_type = _XML_TYPES.get(type(value), "string")
+                if keys.setdefault((scope, name), xml_type) != xml_type:
+                    keys[(scope, name)] = "string"
+        return keys
+
+    @staticmethod
+    def _data(key_ids: dict[tuple[str, str], str], scope: str, data: dict[str, Any], indent: str) -> str:
+        return "".join(
+            f"{indent}<data key={quoteattr(key_ids[(scope, name)])}>{escape(str(value))}</data>\n" for name, value in data.items()
+        )
+
+    def write_stream(self, stream: TextIO) -> None:
+        keys = self._collect_keys()
+        key_ids = {scope_name: f"d{index}" for index, scope_name in enumerate(keys)}
+
+        stream.write(_GRAPHML_HEADER)
+        for (scope, name), xml_type in keys.items():
+            key_id = key_ids[(scope, name)]
+            stream.write(f'  <key id="{key_id}" for="{scope}" attr.name={quoteattr(name)} attr.type="{xml_type}" />\n')
+        edgedefault = "directed" if self.graph.is_directed() else "undirected"
+        stream.write(f'  <graph edgedefault="{edgedefault}">\n')
+
+        for node, data in self.nodes():
+            if not data:
+                stream.write(f"    <node id={quoteattr(str(node))} />\n")
+                continue
+            stream.write(f"    <node id={quoteattr(str(node))}>\n")
+            stream.write(self._data(key_ids, "node", data, "      "))
+            stream.write("    </node>\n")
+
+        for source, target, data in self.edges():
+            element = f"    <edge source={quoteattr(str(source))} target={quoteattr(str(target))}"
+            if not data:
+                stream.write(f"{element} />\n")
+                continue
+            stream.write(f"{element}>\n")
+            stream.write(self._data(key_ids, "edge", data, "      "))
+            stream.write("    </edge>\n")
+
+        stream.write(self._data(key_ids, "graph", self.graph.graph, "    "))
+        stream.write("  </graph>\n</graphml>\n")
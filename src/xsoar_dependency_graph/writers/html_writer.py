@@ -0,0 +1,80 @@
+import base64
+import html
+import json
+from pathlib import Path
+from typing import Any, TextIO
+
+import numpy as np
+
+from ..layout import barnes_hut_layout
+from ..styles import DEFAULT_NODE_COLOR, NODE_PALETTE, NODE_TYPE_LABELS
+from .basic_writer import BasicWriter
+
+_TEMPLATE_PATH = Path(__file__).with_name("html_viewer.html")
+
+
+def _encode(values: np.ndarray) -> str:
+    """Encodes a numeric array as base64 of its little endian bytes, decoded into a typed array by the viewer."""
+    return base64.b64encode(values.astype(values.dtype.newbyteorder("<")).tobytes()).decode("ascii")
+
+
+class HTMLWriter(BasicWriter):
+    """Writes a self-contained HTML page drawing the graph on a canvas, with pan, zoom, hover and filtering by node
+    type. Positions, node types and edges are embedded as base64 encoded typed arrays, so the page needs no
+    network access and loads quickly even for graphs with tens of thousands of nodes.
+
+    Positions are taken from the `x` and `y` node attributes (see `ContentGraph.compute_layout`) when all nodes
+    have them. Otherwise, the whole graph is laid out with `layout.barnes_hut_layout`. Node colours are taken
+    from `styles.NODE_PALETTE`.
+    """
+
+    title = "XSOAR content repository graph"
+
+    def _positions(self, nodes: list[str], attributes: list[dict]) -> np.ndarray:
+        if all("x" in data and "y" in data for data in attributes):
+            return np.array([(data["x"], data["y"]) for data in attributes], dtype=np.float64).reshape(-1, 2)
+        pos = barnes_hut_layout(self.graph)
+        return np.array([pos[node] for node in nodes], dtype=np.float64).reshape(-1, 2)
+
+    def payload(self) -> dict[str, Any]:
+        nodes, attributes = [], []
+        for node, data in self.nodes():
+            nodes.append(node)
+            attributes.append(data)
+        node_index = {node: index for index, node in enumerate(nodes)}
+        positions = self._positions(nodes, attributes)
+
+        types = list(NODE_PALETTE)
+        types.extend(sorted({str(data.get("node_type")) for data in attributes} - set(types)))
+        type_index = {node_type: index for index, node_type in enumerate(types)}
+        node_types = np.array([type_index[str(data.get("node_type"))] for data in attributes], dtype=np.uint16)
+        # Only list types present in the graph, so the legend doesn't show empty entries
+        present = sorted(set(node_types.tolist()))
+        remap = np.zeros(len(types), dtype=np.uint16)
+        remap[present] = np.arange(len(present))
+        types = [types[index] for index in present]
+
+        packs = sorted({data["pack_name"] for data in attributes if data.get("pack_name")})
+        pack_index = {pack: index for index, pack in enumerate(packs)}
+        node_packs = np.array([pack_index.get(data.get("pack_name"), -1) for data in attributes], dtype=np.int32)
+        edges = np.array(
+            [(node_index[source], node_index[target]) for source, target, _ in self.edges()], dtype=np.uint32
+        ).reshape(-1, 2)
+        return {
+            "nodes": [str(node) for node in nodes],
+            "types": types,
+            "labels": [NODE_TYPE_LABELS.get(node_type, node_type) for node_type in types],
+            "colors": [NODE_PALETTE.get(node_type, DEFAULT_NODE_COLOR) for node_type in types],
+            "packs": packs,
+            "node_type": _encode(remap[node_types]),
+            "node_pack": _encode(node_packs),
+            "x": _encode(positions[:, 0].astype(np.float32)),
+            "y": _encode(positions[:, 1].astype(np.float32)),
+            "edges": _encode(edges.ravel()),
+        }
+
+    def write_stream(self, stream: TextIO) -> None:
+        # "</" would end the embedding script element early
+        data = json.dumps(self.payload(), separators=(",", ":")).replace("</", "<\\/")
+        page = _TEMPLATE_PATH.read_text(encoding="utf-8")
+        stream.write(page.replace("__TITLE__", html.escape(self.title)).replace("__GRAPH_DATA__", data))
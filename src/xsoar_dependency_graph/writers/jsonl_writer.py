@@ -0,0 +1,21 @@
+import json
+from typing import Any, TextIO
+
+from .basic_writer import BasicWriter
+
+
+def _dumps(record: dict[str, Any]) -> str:
+    # Sorted keys and fixed separators keep the output stable, so exports of unchanged graphs diff cleanly
+    return json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class JSONLWriter(BasicWriter):
+    """Writes one JSON record per line: a graph record with the graph attributes, followed by one record per node
+    and one record per edge. Values that aren't JSON serializable are written as strings."""
+
+    def write_stream(self, stream: TextIO) -> None:
+        stream.write(_dumps({"type": "graph", "directed": self.graph.is_directed(), "attributes": self.graph.graph}) + "\n")
+        for node, data in self.nodes():
+            stream.write(_dumps({"type": "node", "id": node, "attributes": data}) + "\n")
+        for source, target, data in self.edges():
+            stream.write(_dumps({"type": "edge", "source": source, "target": target, "attributes": data}) + "\n")
@@ -0,0 +1,121 @@
+import csv
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+import networkx as nx
+
+from .basic_writer import DirectoryWriter, open_output
+
+RELATIONSHIP_TYPE = "LINKED_TO"
+DEFAULT_LABEL = "Unknown"
+
+# Property types understood by neo4j-admin database import. Anything else is imported as a string
+_NEO4J_TYPES = {bool: "boolean", int: "long", float: "double", str: "string"}
+
+
+def _label(node_type: Any) -> str:  # noqa: ANN401
+    """Turns a node type such as "Content Pack" into a Neo4j label such as "ContentPack"."""
+    return "".join(str(node_type).split()) if node_type else DEFAULT_LABEL
+
+
+class _ShardedCSV:
+    """A group of CSV files sharing one header file, rolled over to a new shard every `shard_size` rows."""
+
+    def __init__(self, directory: Path, prefix: str, header: list[str], shard_size: int, compression: str | None) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.compression = compression
+        self.files = [f"{prefix}_header.csv"]
+        with (directory / self.files[0]).open("w", encoding="utf-8", newline="") as stream:
+            csv.writer(stream).writerow(header)
+        self._stream: TextIO | None = None
+        self._writer: Any = None
+        self._rows = 0
+
+    def writerow(self, row: list) -> None:
+        if self._stream is None or self._rows >= self.shard_size:
+            self.close()
+            suffix = ".csv.gz" if self.compression == "gzip" else ".csv"
+            self.files.append(f"{self.prefix}_{len(self.files) - 1:04d}{suffix}")
+            self._stream = open_output(self.directory / self.files[-1], self.compression)
+            self._writer = csv.writer(self._stream)
+            self._rows = 0
+        self._writer.writerow(row)
+        self._rows += 1
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class Neo4jWriter(DirectoryWriter):
+    """Writes CSV files for `neo4j-admin database import full`.
+
+    Nodes are written to one group of files per node type label and edges to a single relationship group. Each
+    group has a separate header file followed by data shards of at most `shard_size` rows, so large graphs can be
+    imported in parallel. The matching command line arguments are written to `import.args` and can be passed as
+    `neo4j-admin database import full @import.args <database>` from within the output directory. Only gzip compression is supported by Neo4j.
+    """
+
+    def __init__(self, graph: nx.Graph, shard_size: int = 1_000_000) -> None:
+        super().__init__(graph)
+        self.shard_size = shard_size
+
+    @staticmethod
+    def _collect_properties(items: Iterator[tuple[str, dict]]) -> dict[str, dict[str, str]]:
+        """Returns the property names and Neo4j types of every group."""
+        properties: dict[str, dict[str, str]] = {}
+        for group, data in items:
+            group_properties = properties.setdefault(group, {})
+            for name, value in data.items():
+                neo4j_type = _NEO4J_TYPES.get(type(value), "string")
+                if group_properties.setdefault(name, neo4j_type) != neo4j_type:
+                    group_properties[name] = "string"
+        return properties
+
+    @staticmethod
+    def _header(prefix: list[str], properties: dict[str, str]) -> list[str]:
+        return prefix + [f"{name}:{neo4j_type}" for name, neo4j_type in properties.items()]
+
+    @staticmethod
+    def _row(prefix: list, properties: dict[str, str], data: dict) -> list:
+        return prefix + [data.get(name, "") for name in properties]
+
+    def write(self, filepath: Path, compression: str | None = None) -> None:
+        if compression not in (None, "gzip"):
+            msg = f"Compression {compression} is not supported by neo4j-admin. Use gzip or no compression"
+            raise ValueError(msg)
+        filepath.mkdir(parents=True, exist_ok=True)
+
+        node_properties = self._collect_properties((_label(data.get("node_type")), data) for _, data in self.nodes())
+        edge_properties = self._collect_properties((RELATIONSHIP_TYPE, data) for _, _, data in self.edges()).get(
+            RELATIONSHIP_TYPE, {}
+        )
+
+        node_files: dict[str, _ShardedCSV] = {}
+        for label, properties in node_properties.items():
+            header = self._header(["id:ID", ":LABEL"], properties)
+            node_files[label] = _ShardedCSV(filepath, f"nodes_{label}", header, self.shard_size, compression)
+        try:
+            for node, data in self.nodes():
+                label = _label(data.get("node_type"))
+                node_files[label].writerow(self._row([node, label], node_properties[label], data))
+        finally:
+            for node_file in node_files.values():
+                node_file.close()
+
+        header = self._header([":START_ID", ":END_ID", ":TYPE"], edge_properties)
+        edge_file = _ShardedCSV(filepath, "relationships", header, self.shard_size, compression)
+        try:
+            for source, target, data in self.edges():
+                edge_file.writerow(self._row([source, target, RELATIONSHIP_TYPE], edge_properties, data))
+        finally:
+            edge_file.close()
+
+        with (filepath / "import.args").open("w", encoding="utf-8") as stream:
+            for label, node_file in node_files.items():
+                stream.write(f"--nodes={label}={','.join(node_file.files)}\n")
+            stream.write(f"--relationships={RELATIONSHIP_TYPE}={','.join(edge_file.files)}\n")
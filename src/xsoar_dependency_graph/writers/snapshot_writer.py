@@ -0,0 +1,155 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+import numpy as np
+
+from .basic_writer import DirectoryWriter
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "snapshot.json"
+
+_INT64_MIN, _INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+# NumPy dtype of each column kind. String and JSON columns hold indexes into the string table, and "numpy"
+# columns have the dtype of their values
+COLUMN_DTYPES = {"string": np.int64, "json": np.int64, "bool": np.bool_, "float": np.float64, "int": np.int64}
+
+
+class _StringTable:
+    """Interns strings, storing each distinct string once."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        return self.ids.setdefault(value, len(self.ids))
+
+    def save(self, directory: Path) -> None:
+        encoded = [value.encode("utf-8") for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        np.save(directory / "strings_offsets.npy", offsets)
+        np.save(directory / "strings_data.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def _is_json_value(value: object) -> bool:
+    """Returns whether `value` survives a JSON round trip unchanged, types included."""
+    if value is None or type(value) in (str, bool, int, float):
+        return True
+    if type(value) is list:
+        return all(_is_json_value(item) for item in value)
+    if type(value) is dict:
+        return all(type(key) is str and _is_json_value(item) for key, item in value.items())
+    return False
+
+
+def _column_kind(values: list[Any]) -> str:
+    """Returns how a column of attribute values is stored: as a native NumPy column when all values share a type,
+    and as JSON strings otherwise."""
+    types = {type(value) for value in values}
+    if types == {str}:
+        return "string"
+    if types == {bool}:
+        return "bool"
+    if types == {float}:
+        return "float"
+    if types == {int} and all(_INT64_MIN <= value <= _INT64_MAX for value in values):
+        return "int"
+    if len(types) == 1 and issubclass(next(iter(types)), np.number | np.bool_):
+        return "numpy"
+    return "json"
+
+
+def _check_json_value(value: object, description: str) -> None:
+    if not _is_json_value(value):
+        msg = (
+            f"Can't store {description} value {value!r} in a snapshot: values must be strings, numbers, booleans, "
+            "None, lists or string keyed dicts of these, or NumPy numbers of a single type per attribute"
+        )
+        raise ValueError(msg)
+
+
+class SnapshotWriter(DirectoryWriter):
+    """Writes a binary snapshot directory that `snapshot.GraphSnapshot` can open with NumPy memory mapping.
+
+    Every string (node names, string attribute values) is stored once in an interned string table. Edges are
+    stored both as an array of node index pairs and as CSR adjacency arrays, and every node and edge attribute is
+    stored as a column with one value per node or edge. Node names have to be strings.
+
+    Attribute values are restored with their exact type. Columns whose values are all `str`, `bool`, `float`,
+    `int` or all of one NumPy number type are stored natively, and any other column as JSON, so their values
+    (and graph attributes) have to be JSON values. Anything else, e.g. tuples, sets or NumPy numbers mixed with
+    other types, raises a `ValueError` instead of coming back as a different type.
+    """
+
+    def _save_columns(self, directory: Path, scope: str, items: list[dict], strings: _StringTable) -> list[dict]:
+        names: dict[str, None] = {}
+        for data in items:
+            names.update(dict.fromkeys(data))
+        columns = []
+        for index, name in enumerate(names):
+            present = np.array([name in data for data in items], dtype=bool)
+            values = [data[name] for data in items if name in data]
+            kind = _column_kind(values)
+            column = np.zeros(len(items), dtype=type(values[0]) if kind == "numpy" else COLUMN_DTYPES[kind])
+            if kind == "string":
+                values = [strings.intern(value) for value in values]
+            elif kind == "json":
+                for value in values:
+                    _check_json_value(value, f"{scope} attribute {name!r}")
+                values = [strings.intern(json.dumps(value)) for value in values]
+            column[present] = values
+            file_name = f"{scope}_{index}"
+            np.save(directory / f"{file_name}.npy", column)
+            np.save(directory / f"{file_name}_present.npy", present)
+            columns.append({"name": name, "kind": kind, "file": file_name})
+        return columns
+
+    def write(self, filepath: Path, compression: str | None = None) -> None:
+        if compression is not None:
+            msg = "Snapshots are memory mapped and can't be compressed"
+            raise ValueError(msg)
+        for name, value in self.graph.graph.items():
+            _check_json_value(value, f"graph attribute {name!r}")
+        filepath.mkdir(parents=True, exist_ok=True)
+        strings = _StringTable()
+
+        nodes = list(self.nodes())
+        for node, _ in nodes:
+            if not isinstance(node, str):
+                msg = f"Snapshot node names must be strings, got {node!r}"
+                raise TypeError(msg)
+        node_index = {node: index for index, (node, _) in enumerate(nodes)}
+        np.save(filepath / "nodes.npy", np.array([strings.intern(node) for node, _ in nodes], dtype=np.int64))
+        # Node indexes ordered by name, for binary search lookups by name without decoding every name
+        sorted_nodes = sorted(range(len(nodes)), key=lambda index: nodes[index][0])
+        np.save(filepath / "nodes_sorted.npy", np.array(sorted_nodes, dtype=np.int64))
+
+        edges = list(self.edges())
+        edge_array = np.array([(node_index[source], node_index[target]) for source, target, _ in edges], dtype=np.int64)
+        edge_array = edge_array.reshape(-1, 2)
+        np.save(filepath / "edges.npy", edge_array)
+
+        # CSR adjacency for neighbour queries. Undirected edges other than self loops are stored in both directions
+        sources, targets = edge_array[:, 0], edge_array[:, 1]
+        if not self.graph.is_directed():
+            loops = sources == targets
+            sources, targets = np.concatenate([sources, targets[~loops]]), np.concatenate([targets, sources[~loops]])
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(nodes)), out=indptr[1:])
+        np.save(filepath / "adjacency_indptr.npy", indptr)
+        np.save(filepath / "adjacency_indices.npy", targets[order])
+
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "directed": self.graph.is_directed(),
+            "graph": self.graph.graph,
+            "node_columns": self._save_columns(filepath, "node", [data for _, data in nodes], strings),
+            "edge_columns": self._save_columns(filepath, "edge", [data for _, _, data in edges], strings),
+        }
+        strings.save(filepath)
+        with (filepath / MANIFEST_FILE).open("w", encoding="utf-8") as stream:
+            json.dump(manifest, stream, indent=2)
@@ -1,23 +1,43 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
 import networkx as nx
 
+from .analytics import compute_centrality
 from .dependency_resolver import DependencyResolver
-from .exporter import Exporter
-from .graph_builder import GraphBuilder
-from .visualization import plot_graph
+from .exporter import EdgePredicate, Exporter, NodePredicate
+from .graph_builder import GraphBuilder, ReferenceReport
+from .importer import Importer
+from .layout import compute_layout, layout_cache, plotted_component, set_position_attributes
+from .pack_index import PackIndex
+from .sqlite_store import SQLiteGraph
+from .visualization import plot_graph, render_packs
 
 
 class ContentGraph:
-    def __init__(self, *, upstream_repo_path: Path | None = None, repo_path: Path, installed_content: dict | None = None) -> None:
-        self.custom_graph = nx.Graph()
+    def __init__(
+        self,
+        *,
+        upstream_repo_path: Path | None = None,
+        repo_path: Path | None,
+        installed_content: dict | None = None,
+        database_path: Path | None = None,
+    ) -> None:
+        # With a `database_path`, the custom graph is built into a SQLite database instead of in memory, and
+        # `custom_graph` is loaded from the database when first used
+        self._custom_store: nx.Graph | SQLiteGraph = SQLiteGraph(database_path) if database_path else nx.Graph()
+        self._custom_graph_view: nx.Graph | None = None
+        # Export the custom graph was restored from by `load`, which has none of the indexes recorded while parsing
+        self._loaded_from: Path | None = None
         self.upstream_graph = nx.Graph()
         self.repo_path = repo_path
-        self.pack_paths = list(repo_path.glob("Packs/*"))
+        self.pack_paths = list(repo_path.glob("Packs/*")) if repo_path else []
         resolver = DependencyResolver(installed_content)
+        self._resolver = resolver
         self._builder = GraphBuilder(resolver)
+        self._upstream_builder = GraphBuilder(resolver)
 
         if upstream_repo_path:
             self.upstream_paths = [
@@ -28,6 +48,39 @@ class ContentGraph:
         else:
             self.upstream_paths = []
 
+    @classmethod
+    def load(cls, path: Path, input_format: str | None = None, repo_path: Path | None = None) -> ContentGraph:
+        """Restores a content graph from a previous export (GML, GraphML, JSONL or Snapshot, optionally compressed)
+        without parsing any content. `repo_path` is only needed if the instance is going to build graphs as well.
+        Exports don't hold the indexes behind `get_affected_nodes` and `get_reference_report`, which raise on loaded
+        graphs."""
+        content_graph = cls(repo_path=repo_path)
+        content_graph._custom_store = Importer(path).load(input_format)
+        content_graph._loaded_from = Path(path)
+        return content_graph
+
+    @property
+    def custom_graph(self) -> nx.Graph:
+        """The custom content graph as a `networkx.Graph`. When building into a SQLite database, the graph is
+        loaded from the database on first access after a build."""
+        if isinstance(self._custom_store, nx.Graph):
+            return self._custom_store
+        if self._custom_graph_view is None:
+            self._custom_graph_view = self._custom_store.to_networkx()
+        return self._custom_graph_view
+
+    def close(self) -> None:
+        """Commits and closes the SQLite database, if the graph is built into one. A `custom_graph` loaded before
+        closing stays available. Also called when leaving a `with ContentGraph(...)` block."""
+        if isinstance(self._custom_store, SQLiteGraph):
+            self._custom_store.close()
+
+    def __enter__(self) -> ContentGraph:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
     def _create_graph_from_upstream_packs(self) -> None:
         """Adds nodes to the graph from the upstream content packs Base, CommonPlaybooks, CommonScripts. Requires a valid
         path to the upstream content in class constructor. Will silently continue if class is instantiated without a path
@@ -35,7 +88,7 @@ class ContentGraph:
         for pack in self.upstream_paths:
             try:
                 print(f"Creating from {pack}")
-                self._builder.create_nodes_from_pack(pack, self.upstream_graph)
+                self._upstream_builder.create_nodes_from_pack(pack, self.upstream_graph)
             except Exception as ex:
                 msg = f"Exception occurred when parsing pack {pack}"
                 raise RuntimeError(msg) from ex
@@ -50,37 +103,241 @@ class ContentGraph:
                 # someone wants to plot the entire upstream content repo
                 continue
             try:
-                self._builder.create_nodes_from_pack(pack, self.custom_graph)
+                self._builder.create_nodes_from_pack(pack, self._custom_store)
             except Exception as ex:
                 msg = f"Exception occurred when parsing pack {pack}"
                 raise RuntimeError(msg) from ex
 
+    def build_stages(self, pack_paths: list[Path] | None, exclude_list: list[str] | None = None) -> list[tuple[str, Callable[[], None]]]:
+        """Returns the stages of `create_content_graph` by name, in the order they have to run: "custom" parses the
+        custom packs, "upstream" the upstream packs, and "linking" links the two and finishes the build. Running
+        them one by one builds the same graph as `create_content_graph`, but lets callers time them separately or
+        run other steps in between."""
+
+        def link() -> None:
+            self._link_common_upstream_dependencies()
+            self._finish_build()
+
+        return [
+            ("custom", lambda: self._create_graph_from_custom_packs(pack_paths=pack_paths, exclude_list=exclude_list)),
+            ("upstream", self._create_graph_from_upstream_packs),
+            ("linking", link),
+        ]
+
     def create_content_graph(self, pack_paths: list[Path] | None, exclude_list: list[str] | None = None) -> None:
-        self._create_graph_from_custom_packs(pack_paths=pack_paths, exclude_list=exclude_list)
+        for _, stage in self.build_stages(pack_paths, exclude_list):
+            stage()
+
+    def create_pack_neighbourhood_graph(self, pack_path: Path, max_hops: int = 1, exclude_list: list[str] | None = None) -> None:
+        """Creates the content graph for a single pack and the packs it depends on, without parsing the rest of the
+        repository. References that can't be resolved within the packs parsed so far are looked up in a name to
+        pack index, and the packs defining them are parsed next. This is repeated at most `max_hops` times."""
+        excluded = set(exclude_list or []) | {"DeprecatedContent"}
+        index = PackIndex([pack for pack in self.pack_paths if pack.stem not in excluded])
+        parsed: set[Path] = set()
+        frontier = [pack_path]
+        for hop in range(max_hops + 1):
+            self._create_graph_from_custom_packs(pack_paths=frontier, exclude_list=exclude_list)
+            parsed.update(path.resolve() for path in frontier)
+            if hop == max_hops:
+                break
+            referenced = {pack for name in self._builder.get_unresolved_references() for pack in index.get_packs(name)}
+            frontier = sorted(pack for pack in referenced if pack.resolve() not in parsed)
+            if not frontier:
+                break
         self._create_graph_from_upstream_packs()
         self._link_common_upstream_dependencies()
+        self._finish_build()
+
+    def _finish_build(self) -> None:
+        """Commits the database, if any, so it can be queried directly, and drops any stale loaded view of it."""
+        if isinstance(self._custom_store, SQLiteGraph):
+            self._custom_store.commit()
+        self._custom_graph_view = None
 
     def _link_common_upstream_dependencies(self) -> None:
         """Adds nodes for and edges to Base, Common Playbooks and Common Scripts if references to those packs
         are found in the custom dependency graph."""
         for node, data in self.upstream_graph.nodes(data=True):
             try:
-                if self.custom_graph.has_node(node) and data["pack_name"] in ["Base", "Common Playbooks", "Common Scripts"]:
-                    self.custom_graph.add_node(data["pack_name"], currentVersion="666", node_type="Content Pack")
-                    self.custom_graph.add_edge(node, data["pack_name"])
+                if self._custom_store.has_node(node) and data["pack_name"] in ["Base", "Common Playbooks", "Common Scripts"]:
+                    self._custom_store.add_node(data["pack_name"], currentVersion="666", node_type="Content Pack")
+                    self._custom_store.add_edge(node, data["pack_name"])
             except KeyError:
                 continue
 
         pack_nodes = [x[0] for x in self.upstream_graph.nodes(data="node_type") if x[1] == "Content Pack"]
         for pack_name in pack_nodes:
-            self.custom_graph.add_node(pack_name, currentVersion="666", node_type="Content Pack")
+            self._custom_store.add_node(pack_name, currentVersion="666", node_type="Content Pack")
+
+    def _require_indexes(self) -> None:
+        if self._loaded_from is not None:
+            msg = (
+                f"The content graph was loaded from {self._loaded_from}, which doesn't record source files or reference"
+                " directions. Build it with create_content_graph to query affected nodes or references"
+            )
+            raise ValueError(msg)
+
+    def get_affected_nodes(self, changed_paths: list[Path]) -> set[str]:
+        """Returns the content items affected by changes to `changed_paths`, i.e. the items defined in the changed
+        files and every item that transitively references them. Relative paths are resolved against the content
+        repository. Uses the indexes recorded by `create_content_graph`, so the graph is not rebuilt."""
+        self._require_indexes()
+        paths = [path if Path(path).is_absolute() else self.repo_path / path for path in changed_paths]
+        changed_nodes = self._builder.nodes_from_paths(paths)
+        return {node for node in self._builder.get_dependents(changed_nodes) if self._custom_store.has_node(node)}
+
+    def get_reference_report(self) -> ReferenceReport:
+        """Reports references to content items that are defined nowhere, custom content items that nothing
+        references and references ignored when building the graph (e.g. Builtin commands). Items defined in the
+        upstream packs or in installed content count as defined."""
+        self._require_indexes()
+        external = self._upstream_builder.definitions.keys() | self._resolver.get_known_items()
+        return self._builder.get_reference_report(external_definitions=external)
+
+    def export(
+        self,
+        output_path: Path,
+        output_format: str,
+        file_name: str | None = None,
+        compression: str | None = None,
+        *,
+        nodes: Iterable[str] | None = None,
+        node_predicate: NodePredicate | None = None,
+        edge_predicate: EdgePredicate | None = None,
+    ) -> str:
+        """Exports the full graph (including isolated nodes) to `output_path`. The graph is streamed to the file, so
+        memory use does not grow with the size of the graph. Filenames ending in .gz, .bz2 or .xz will be compressed,
+        as will any file when `compression` is one of ["gzip", "bz2", "xz"]. Valid `output_format` options are one
+        of ["GML", "GraphML", "JSONL", "Neo4j", "Snapshot"]. "JSONL" writes one node or edge record per line. "Neo4j"
+        writes a directory of CSV files for `neo4j-admin database import`. "Snapshot" writes a binary, memory mappable
+        directory that can be opened with `snapshot.GraphSnapshot`. Also see networkx.org for documentation on reading
+        the graphs.
+
+        Use `nodes`, `node_predicate(node, data)` and `edge_predicate(source, target, data)` to export a subset of
+        the graph without copying it, e.g. `node_predicate=lambda node, data: data.get("node_type") == "Script"`."""
+        exporter = Exporter(self.custom_graph, nodes=nodes, node_predicate=node_predicate, edge_predicate=edge_predicate)
+        return exporter.export(output_path=output_path, output_format=output_format, file_name=file_name, compression=compression)
+
+    def export_shards(
+        self,
+        output_path: Path,
+        output_format: str,
+        compression: str | None = None,
+        max_workers: int | None = None,
+        *,
+        nodes: Iterable[str] | None = None,
+        node_predicate: NodePredicate | None = None,
+        edge_predicate: EdgePredicate | None = None,
+    ) -> dict:
+        """Exports one file per content pack, plus a shard with the edges between packs, along with a manifest of
+        shard content hashes. Unchanged shards are not rewritten. See `Exporter.export_shards`, and `export` for the
+        subset options."""
+        exporter = Exporter(self.custom_graph, nodes=nodes, node_predicate=node_predicate, edge_predicate=edge_predicate)
+        return exporter.export_shards(output_path=output_path, output_format=output_format, compression=compression, max_workers=max_workers)
+
+    def compute_centrality(
+        self,
+        *,
+        betweenness_samples: int | None = 256,
+        seed: int | None = 10396953,
+        batch_size: int = 64,
+        pagerank_alpha: float = 0.85,
+        pagerank_tol: float = 1.0e-6,
+        pagerank_max_iter: int = 100,
+    ) -> dict[str, dict]:
+        """Stores degree centrality, approximate betweenness and PageRank as node attributes on the graph. See
+        `analytics.compute_centrality` for the accuracy and speed options."""
+        return compute_centrality(
+            self.custom_graph,
+            betweenness_samples=betweenness_samples,
+            seed=seed,
+            batch_size=batch_size,
+            pagerank_alpha=pagerank_alpha,
+            pagerank_tol=pagerank_tol,
+            pagerank_max_iter=pagerank_max_iter,
+        )
+
+    def compute_layout(
+        self,
+        *,
+        layout_engine: str = "spring",
+        use_cache: bool = False,
+        cache_dir: Path | None = None,
+        previous_pos: dict | None = None,
+        all_components: bool = False,
+    ) -> dict:
+        """Computes (or reads from the layout cache, see `layout.layout_cache`) the positions used by
+        `plot_connected_components` and stores them as `x` and `y` node attributes, so they are included when the
+        graph is exported. Nodes with a position in `previous_pos` keep it, and the other nodes are then placed
+        regardless of `layout_engine` (see `layout.compute_layout`). Only the largest connected component is
+        laid out unless `all_components` is set."""
+        pos = compute_layout(
+            plotted_component(self.custom_graph, all_components),
+            engine=layout_engine,
+            cache=layout_cache(use_cache, cache_dir),
+            previous_pos=previous_pos,
+            per_component=all_components,
+        )
+        set_position_attributes(self.custom_graph, pos)
+        return pos
 
-    def export(self, output_path: Path, output_format: str) -> str:
-        """Exports the full graph (including isolated nodes) to `output_path`. Filenames ending in .gz or .bz2 will be compressed.
-        Valid `fmt` options are one of ["GraphML, "JSON"]. Also see networkx.org for documentation on reading and writing graphs."""
-        exporter = Exporter(self.custom_graph)
-        return exporter.export(output_path=output_path, output_format=output_format)
+    def plot_connected_components(
+        self,
+        size_by: str | None = None,
+        *,
+        layout_engine: str = "spring",
+        use_cache: bool = False,
+        cache_dir: Path | None = None,
+        previous_pos: dict | None = None,
+        level_of_detail: bool = False,
+        all_components: bool = False,
+        progressive: bool = False,
+    ) -> dict:
+        """Plots the graph as a non-directional graph with interactive node inspection. Use e.g.
+        `size_by="betweenness"` after `compute_centrality` to size nodes by a centrality metric, and
+        `layout_engine="barnes-hut"` and `level_of_detail=True` for large graphs, and `use_cache=True` to cache
+        layout positions in `cache_dir`, or `layout.DEFAULT_CACHE_DIR`. Returns the plotted positions, which can be
+        passed as `previous_pos` to keep the picture stable when replotting after a change. Use
+        `all_components=True` to plot every connected component instead of only the largest one, and
+        `progressive=True` to show the plot right away and refine the layout while it is computed in the
+        background."""
+        return plot_graph(
+            self.custom_graph,
+            size_by=size_by,
+            layout_engine=layout_engine,
+            use_cache=use_cache,
+            cache_dir=cache_dir,
+            previous_pos=previous_pos,
+            level_of_detail=level_of_detail,
+            all_components=all_components,
+            progressive=progressive,
+        )
 
-    def plot_connected_components(self) -> None:
-        """Plots the graph as a non-directional graph with interactive node inspection."""
-        plot_graph(self.custom_graph)
+    def render_packs(
+        self,
+        output_path: Path,
+        packs: Iterable[str] | None = None,
+        *,
+        output_format: str = "png",
+        max_workers: int | None = None,
+        size_by: str | None = None,
+        layout_engine: str = "spring",
+        use_cache: bool = False,
+        cache_dir: Path | None = None,
+        dpi: int = 100,
+    ) -> dict[str, Path]:
+        """Writes one PNG or SVG image per pack (all packs by default) to `output_path` without opening a window,
+        rendering packs in parallel. See `visualization.render_packs` for the options."""
+        return render_packs(
+            self.custom_graph,
+            output_path,
+            packs,
+            output_format=output_format,
+            max_workers=max_workers,
+            size_by=size_by,
+            layout_engine=layout_engine,
+            use_cache=use_cache,
+            cache_dir=cache_dir,
+            dpi=dpi,
+        )
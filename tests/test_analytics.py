@@ -0,0 +1,24 @@
+import networkx as nx
+import pytest
+
+from xsoar_dependency_graph.analytics import compute_centrality
+
+
+class TestClass:
+    def test_compute_centrality_matches_networkx(self) -> None:
+        graph = nx.les_miserables_graph()
+        compute_centrality(graph, betweenness_samples=None)
+        betweenness = nx.betweenness_centrality(graph)
+        pagerank = nx.pagerank(graph, weight=None)
+        degree = nx.degree_centrality(graph)
+        for node, data in graph.nodes(data=True):
+            assert data["betweenness"] == pytest.approx(betweenness[node], abs=1e-9)
+            assert data["pagerank"] == pytest.approx(pagerank[node], abs=1e-6)
+            assert data["degree_centrality"] == pytest.approx(degree[node])
+
+    def test_approximate_betweenness_is_seeded(self) -> None:
+        first = nx.karate_club_graph()
+        second = nx.karate_club_graph()
+        compute_centrality(first, betweenness_samples=10, seed=1)
+        compute_centrality(second, betweenness_samples=10, seed=1)
+        assert dict(first.nodes(data="betweenness")) == dict(second.nodes(data="betweenness"))
@@ -0,0 +1,62 @@
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from xsoar_dependency_graph.benchmark import STAGES, compare_results, main, run_benchmark
+from xsoar_dependency_graph.synthetic import SyntheticRepoSpec, generate_content_repo
+from xsoar_dependency_graph.xsoar_dependency_graph import ContentGraph
+
+SMALL_SPEC = SyntheticRepoSpec(packs=3, playbooks=2, scripts=4, layouts=1, integrations=1, commands_per_integration=2, upstream_items=3)
+
+
+def _files(path: Path) -> dict[str, bytes]:
+    return {str(file.relative_to(path)): file.read_bytes() for file in sorted(path.rglob("*")) if file.is_file()}
+
+
+class TestClass:
+    def test_generate_content_repo_is_deterministic(self, tmp_path: Path) -> None:
+        generate_content_repo(tmp_path / "first", SMALL_SPEC, seed=1)
+        generate_content_repo(tmp_path / "second", SMALL_SPEC, seed=1)
+        generate_content_repo(tmp_path / "other", SMALL_SPEC, seed=2)
+        assert _files(tmp_path / "first") == _files(tmp_path / "second")
+        assert _files(tmp_path / "first") != _files(tmp_path / "other")
+
+    def test_generated_repo_builds_into_content_graph(self, tmp_path: Path) -> None:
+        installed_content = generate_content_repo(tmp_path / "repo", SMALL_SPEC, upstream_path=tmp_path / "upstream")
+        content_graph = ContentGraph(
+            repo_path=tmp_path / "repo", upstream_repo_path=tmp_path / "upstream", installed_content=installed_content
+        )
+        content_graph.create_content_graph(pack_paths=None)
+        node_types = Counter(node_type for _, node_type in content_graph.custom_graph.nodes(data="node_type"))
+        assert node_types["Playbook"] >= SMALL_SPEC.packs * SMALL_SPEC.playbooks
+        assert node_types["Layout"] == SMALL_SPEC.packs * SMALL_SPEC.layouts
+        assert node_types["Integration"] == SMALL_SPEC.packs * SMALL_SPEC.integrations
+        assert content_graph.custom_graph.has_node("Synthetic000_Script000")
+        # Every reference resolves to generated, upstream or installed content
+        assert not content_graph.get_reference_report().dangling
+
+    def test_run_benchmark_times_every_stage(self, tmp_path: Path) -> None:
+        results = run_benchmark(tmp_path, SMALL_SPEC, repeat=2)
+        assert tuple(results["stages"]) == STAGES
+        assert all(len(timings["runs"]) == 2 for timings in results["stages"].values())
+        assert results["nodes"] > 0
+        assert json.loads(json.dumps(results)) == results
+
+        baseline = json.loads(json.dumps(results))
+        assert compare_results(results, baseline) == {}
+        baseline["stages"]["build"]["min"] = results["stages"]["build"]["min"] / 2 - 0.01
+        assert set(compare_results(results, baseline)) == {"build"}
+        with pytest.raises(ValueError, match="different synthetic repositories"):
+            compare_results(results, {**baseline, "seed": 1})
+
+    def test_main_reuses_work_dir(self, tmp_path: Path) -> None:
+        options = ["--packs", "2", "--playbooks", "1", "--scripts", "2", "--repeat", "1", "--work-dir", str(tmp_path)]
+        assert main([*options, "--output", str(tmp_path / "first.json")]) == 0
+        (generated,) = tmp_path.glob("synthetic-*")
+        files = _files(generated)
+        assert main([*options, "--output", str(tmp_path / "second.json")]) == 0
+        assert list(tmp_path.glob("synthetic-*")) == [generated]
+        assert _files(generated) == files
+        assert json.loads((tmp_path / "second.json").read_text())["nodes"] == json.loads((tmp_path / "first.json").read_text())["nodes"]
@@ -1,5 +1,11 @@
+import sqlite3
 from pathlib import Path
 
+import networkx as nx
+import pytest
+
+from xsoar_dependency_graph.graph_diff import diff
+from xsoar_dependency_graph.pack_index import PackIndex
 from xsoar_dependency_graph.xsoar_dependency_graph import ContentGraph
 
 
@@ -19,3 +25,114 @@ class TestClass:
     def test_read_global(self, shared_datadir: Path) -> None:
         contents = (shared_datadir / "hello.txt").read_text()
         assert contents == "Hello World!\n"
+
+    def test_get_affected_nodes(self, shared_datadir: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        obj = ContentGraph(repo_path=repo_path)
+        obj.create_content_graph(pack_paths=None)
+        affected = obj.get_affected_nodes([Path("Packs/MyOrg_EDR/Scripts/EDR_Triage/EDR_Triage.py")])
+        assert affected == {"EDR_Triage", "EDR_InitialTriage"}
+        affected = obj.get_affected_nodes([Path("Packs/MyOrg_CommonScripts/Scripts/GenericScript/GenericScript.yml")])
+        assert affected == {"GenericScript", "GenericPlaybook", "EDR_InitialTriage", "Layout-GenericLayout"}
+        assert obj.custom_graph.nodes["EDR_Triage"]["source_path"].endswith("EDR_Triage.yml")
+        assert obj.get_affected_nodes([Path("Packs/MyOrg_Layouts/README.md")]) == {"MyOrg_Layouts"}
+        assert obj.get_affected_nodes([Path("README.md")]) == set()
+
+    def test_diff_skips_unchanged_packs(self, shared_datadir: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        old = ContentGraph(repo_path=repo_path)
+        old.create_content_graph(pack_paths=None)
+        playbook_path = repo_path / "Packs/MyOrg_EDR/Playbooks/EDR_InitialTriage.yml"
+        playbook_path.write_text(playbook_path.read_text().replace("scriptName: EDR_FetchFile", "scriptName: EDR_Collect"))
+        new = ContentGraph(repo_path=repo_path)
+        new.create_content_graph(pack_paths=None)
+
+        assert diff(old.custom_graph, old.custom_graph).is_empty()
+        result = diff(old.custom_graph, new.custom_graph)
+        assert result.changed_packs == {"MyOrg_EDR"}
+        assert result.added_nodes == {"EDR_Collect"}
+        # EDR_FetchFile is no longer referenced, so it gets linked to its pack directly
+        assert result.added_edges == {("EDR_Collect", "EDR_InitialTriage"), ("EDR_FetchFile", "MyOrg_EDR")}
+        assert result.removed_edges == {("EDR_FetchFile", "EDR_InitialTriage")}
+        assert result.changed_attributes == {}
+
+        # Centralities, layout positions and ignored attributes are not reported as changes
+        new.compute_centrality()
+        new.custom_graph.nodes["EDR_InitialTriage"].update(x=0.5, y=0.5, reviewed=True)
+        assert diff(old.custom_graph, new.custom_graph, ignore_attributes={"reviewed"}).changed_attributes == {}
+        assert diff(old.custom_graph, new.custom_graph).changed_attributes == {"EDR_InitialTriage": {"reviewed": (None, True)}}
+
+    def test_reference_report(self, shared_datadir: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        playbook_path = repo_path / "Packs/MyOrg_EDR/Playbooks/EDR_InitialTriage.yml"
+        contents = playbook_path.read_text()
+        contents = contents.replace("scriptName: EDR_FetchFile", "scriptName: EDR_Collect", 1)
+        contents = contents.replace("scriptName: EDR_Triage", "scriptName: Builtin|||setIncident", 1)
+        playbook_path.write_text(contents)
+        obj = ContentGraph(repo_path=repo_path)
+        obj.create_content_graph(pack_paths=None)
+        report = obj.get_reference_report()
+        assert report.dangling == {"EDR_Collect": {"EDR_InitialTriage"}}
+        assert report.ignored == {"setIncident": {"EDR_InitialTriage"}}
+        assert report.orphans == {"EDR_InitialTriage", "EDR_Triage", "EDR_FetchFile", "LegacyItem", "Layout-GenericLayout"}
+
+    def test_reference_report_ignores_script_builtin_commands(self, shared_datadir: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        script_path = repo_path / "Packs/MyOrg_EDR/Scripts/EDR_FetchFile/EDR_FetchFile.py"
+        script_path.write_text(
+            script_path.read_text()
+            + '\n\ndemisto.executeCommand("closeInvestigation", {})\nexecute_command("setIncident", {"severity": 2})\n'
+        )
+        obj = ContentGraph(repo_path=repo_path)
+        obj.create_content_graph(pack_paths=None)
+        report = obj.get_reference_report()
+        assert report.dangling == {}
+        assert report.ignored == {"closeInvestigation": {"EDR_FetchFile"}, "setIncident": {"EDR_FetchFile"}}
+        # The calls stay in the graph, like any other executed command
+        assert obj.custom_graph.has_edge("EDR_FetchFile", "setIncident")
+
+    def test_create_pack_neighbourhood_graph(self, shared_datadir: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        obj = ContentGraph(repo_path=repo_path)
+        obj.create_pack_neighbourhood_graph(repo_path / "Packs/MyOrg_EDR", max_hops=0)
+        assert obj.custom_graph.nodes["GenericPlaybook"].get("pack_name") is None
+        obj = ContentGraph(repo_path=repo_path)
+        obj.create_pack_neighbourhood_graph(repo_path / "Packs/MyOrg_EDR", max_hops=1)
+        assert obj.custom_graph.nodes["GenericPlaybook"]["pack_name"] == "MyOrg_CommonPlaybooks"
+        assert obj.custom_graph.nodes["GenericScript"]["pack_name"] == "MyOrg_CommonScripts"
+        assert not obj.custom_graph.has_node("MyOrg_Layouts")
+
+    def test_pack_index(self, shared_datadir: Path, tmp_path: Path) -> None:
+        backup = shared_datadir / "mock_content_repo/backup"
+        index = PackIndex([backup / "TestPack1", backup / "TestPack2"])
+        assert index.get_packs("TestIntegration1") == {backup / "TestPack1"}
+        assert index.get_packs("baseintegration-dummy") == {backup / "TestPack1", backup / "TestPack2"}
+        assert index.get_packs("Layout-TestLayout") == {backup / "TestPack2"}
+        assert not index.get_packs("dummy")
+
+        # Command list items written at the indentation of the `commands` key, as PyYAML does
+        integration = tmp_path / "Pack/Integrations/Other/Other.yml"
+        integration.parent.mkdir(parents=True)
+        integration.write_text(
+            "commonfields:\n  id: Other\nscript:\n  commands:\n  - name: other-first\n    arguments:\n    - name: query\n"
+            "  - arguments: []\n    name: 'other-second'\n  type: python\n"
+        )
+        index = PackIndex([tmp_path / "Pack"])
+        assert {name for name in ("Other", "other-first", "other-second", "query") if index.get_packs(name)} == {"Other", "other-first", "other-second"}
+
+    def test_create_graph_in_sqlite_database(self, shared_datadir: Path, tmp_path: Path) -> None:
+        repo_path = shared_datadir / "mock_content_repo"
+        in_memory = ContentGraph(repo_path=repo_path)
+        in_memory.create_content_graph(pack_paths=None)
+        with ContentGraph(repo_path=repo_path, database_path=tmp_path / "graph.db") as obj:
+            obj.create_content_graph(pack_paths=None)
+            # No script of the mock repository is reachable from its pack only through other packs, where the
+            # adjacency check of the database would add a pack edge that the in-memory path search doesn't
+            assert nx.utils.graphs_equal(obj.custom_graph, in_memory.custom_graph)
+        with pytest.raises(sqlite3.ProgrammingError):
+            obj._custom_store.number_of_nodes()
+        connection = sqlite3.connect(tmp_path / "graph.db")
+        rows = connection.execute(
+            "SELECT name FROM nodes JOIN node_attributes ON node_id = id WHERE key = 'node_type' AND value = 'Playbook'"
+        ).fetchall()
+        assert sorted(row[0] for row in rows) == ["EDR_InitialTriage", "GenericPlaybook"]
@@ -0,0 +1,222 @@
+import base64
+import csv
+import gzip
+import json
+import lzma
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from xsoar_dependency_graph.exporter import Exporter
+from xsoar_dependency_graph.snapshot import GraphSnapshot
+from xsoar_dependency_graph.styles import NODE_PALETTE
+from xsoar_dependency_graph.writers.neo4j_writer import Neo4jWriter
+from xsoar_dependency_graph.xsoar_dependency_graph import ContentGraph
+
+
+@pytest.fixture
+def content_graph(shared_datadir: Path) -> ContentGraph:
+    obj = ContentGraph(repo_path=shared_datadir / "mock_content_repo")
+    obj.create_content_graph(pack_paths=None)
+    obj.compute_centrality()
+    return obj
+
+
+def assert_same_graph(first: nx.Graph, second: nx.Graph) -> None:
+    assert dict(first.nodes(data=True)) == dict(second.nodes(data=True))
+    assert {frozenset((u, v)) for u, v in first.edges()} == {frozenset((u, v)) for u, v in second.edges()}
+
+
+class TestClass:
+    @pytest.mark.parametrize(("file_name", "compression"), [(None, None), ("graph.graphml.gz", None), ("graph.graphml", "xz")])
+    def test_export_graphml(self, content_graph: ContentGraph, tmp_path: Path, file_name: str | None, compression: str | None) -> None:
+        output_path = tmp_path / "export"
+        output_path.mkdir()
+        content_graph.export(output_path, "GraphML", file_name=file_name, compression=compression)
+        (exported,) = output_path.iterdir()
+        if exported.suffix == ".xz":
+            # networkx only handles gzip and bz2 compressed files by itself
+            exported = lzma.open(exported)
+        nx.write_graphml(content_graph.custom_graph, tmp_path / "expected.graphml")
+        graph = nx.read_graphml(exported)
+        assert_same_graph(graph, nx.read_graphml(tmp_path / "expected.graphml"))
+        assert_same_graph(graph, content_graph.custom_graph)
+
+    def test_export_gml_bz2(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        content_graph.export(tmp_path, "GML", file_name="graph.gml.bz2")
+        assert_same_graph(nx.read_gml(tmp_path / "graph.gml.bz2"), content_graph.custom_graph)
+
+    def test_export_invalid_arguments(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="Output format"):
+            Exporter(nx.Graph()).export(tmp_path, "DOT")
+        with pytest.raises(ValueError, match="Compression"):
+            Exporter(nx.Graph()).export(tmp_path, "GML", compression="zip")
+
+    def test_export_neo4j(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        graph = content_graph.custom_graph
+        Neo4jWriter(graph, shard_size=2).write(tmp_path / "neo4j")
+        args = (tmp_path / "neo4j" / "import.args").read_text().splitlines()
+        assert "--nodes=Script=nodes_Script_header.csv,nodes_Script_0000.csv,nodes_Script_0001.csv" in args
+        nodes = {}
+        for arg in args:
+            kind, files = arg.split("=", 1)[1].split("=")
+            header, *shards = files.split(",")
+            with (tmp_path / "neo4j" / header).open() as stream:
+                columns = next(csv.reader(stream))
+            for shard in shards:
+                with (tmp_path / "neo4j" / shard).open() as stream:
+                    rows = list(csv.reader(stream))
+                assert 0 < len(rows) <= 2
+                if arg.startswith("--nodes"):
+                    nodes.update({row[0]: dict(zip(columns, row, strict=True)) for row in rows})
+        assert nodes.keys() == set(graph.nodes())
+        assert nodes["EDR_Triage"][":LABEL"] == "Script"
+        assert nodes["EDR_Triage"]["pack_name:string"] == "MyOrg_EDR"
+        assert float(nodes["EDR_Triage"]["pagerank:double"]) == graph.nodes["EDR_Triage"]["pagerank"]
+
+    def test_export_snapshot_round_trip(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        graph = content_graph.custom_graph
+        graph.graph["name"] = "content"
+        graph.nodes["EDR_Triage"]["tags"] = ["edr", 1]
+        graph.edges["EDR_Triage", "EDR_InitialTriage"]["weight"] = 2
+        content_graph.export(tmp_path, "Snapshot")
+        snapshot = GraphSnapshot(tmp_path / "snapshot")
+        assert snapshot.number_of_nodes == graph.number_of_nodes()
+        assert snapshot.node_attributes("EDR_Triage") == graph.nodes["EDR_Triage"]
+        assert sorted(snapshot.neighbors("EDR_InitialTriage")) == sorted(graph.neighbors("EDR_InitialTriage"))
+        restored = snapshot.to_networkx()
+        assert nx.utils.graphs_equal(restored, graph)
+        assert list(restored.nodes()) == list(graph.nodes())
+
+    def test_export_snapshot_value_types(self, tmp_path: Path) -> None:
+        graph = nx.Graph(name="types")
+        graph.add_node("First", rank=np.float32(0.5), count=np.int64(3), mixed=1, nested={"tags": ["a", None, 2.5]})
+        graph.add_node("Second", rank=np.float32(1.5), count=np.int64(4), mixed="one", flag=True)
+        graph.add_edge("First", "Second", weight=np.int8(2))
+        Exporter(graph).export(tmp_path, "Snapshot", file_name="types")
+        snapshot = GraphSnapshot(tmp_path / "types")
+        restored = snapshot.to_networkx()
+        assert nx.utils.graphs_equal(restored, graph)
+        for node, data in graph.nodes(data=True):
+            assert {name: type(value) for name, value in restored.nodes[node].items()} == {name: type(value) for name, value in data.items()}
+            assert {name: type(value) for name, value in snapshot.node_attributes(node).items()} == {name: type(value) for name, value in data.items()}
+        assert type(restored.edges["First", "Second"]["weight"]) is np.int8
+
+    @pytest.mark.parametrize(
+        ("attributes", "match"),
+        [
+            ({"node": ("a", "b")}, "node attribute 'value'"),
+            ({"node": {1: "a"}}, "node attribute 'value'"),
+            ({"node": [np.float64(1.0)]}, "node attribute 'value'"),
+            ({"mixed": np.float64(1.0)}, "node attribute 'value'"),
+            ({"graph": {"created": {"a", "b"}}}, "graph attribute 'created'"),
+        ],
+    )
+    def test_export_snapshot_unsupported_values(self, tmp_path: Path, attributes: dict, match: str) -> None:
+        graph = nx.Graph()
+        graph.graph.update(attributes.get("graph", {}))
+        graph.add_node("First", value=attributes.get("node", 1))
+        graph.add_node("Second", value=attributes.get("mixed", 1))
+        with pytest.raises(ValueError, match=match):
+            Exporter(graph).export(tmp_path, "Snapshot", file_name="snapshot")
+
+    def test_export_jsonl(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        content_graph.export(tmp_path, "JSONL", compression="gzip")
+        with gzip.open(tmp_path / "output.jsonl.gz", "rt") as stream:
+            lines = stream.read().splitlines()
+        records = [json.loads(line) for line in lines]
+        assert records[0]["type"] == "graph"
+        nodes = {record["id"]: record["attributes"] for record in records if record["type"] == "node"}
+        assert nodes == dict(content_graph.custom_graph.nodes(data=True))
+        assert sum(record["type"] == "edge" for record in records) == content_graph.custom_graph.number_of_edges()
+        assert all(line == json.dumps(record, sort_keys=True, separators=(",", ":")) for line, record in zip(lines, records, strict=True))
+
+    def test_export_shards(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        output_path = tmp_path / "shards"
+        manifest = content_graph.export_shards(output_path, "JSONL", compression="gzip", max_workers=2)
+        assert set(manifest["shards"]) == {"_cross_pack", "MyOrg_CommonPlaybooks", "MyOrg_CommonScripts", "MyOrg_EDR", "MyOrg_Layouts"}
+        assert sum(shard["edges"] for shard in manifest["shards"].values()) == content_graph.custom_graph.number_of_edges()
+        assert manifest["shards"]["_cross_pack"]["edges"] == 4
+
+        # Only the shards whose content changed are rewritten
+        edr_shard = output_path / manifest["shards"]["MyOrg_EDR"]["file"]
+        layouts_shard = output_path / manifest["shards"]["MyOrg_Layouts"]["file"]
+        edr_mtime, layouts_mtime = edr_shard.stat().st_mtime_ns, layouts_shard.stat().st_mtime_ns
+        content_graph.custom_graph.nodes["EDR_Triage"]["reviewed"] = True
+        updated = content_graph.export_shards(output_path, "JSONL", compression="gzip", max_workers=2)
+        assert updated["shards"]["MyOrg_EDR"]["sha256"] != manifest["shards"]["MyOrg_EDR"]["sha256"]
+        assert edr_shard.stat().st_mtime_ns != edr_mtime
+        assert layouts_shard.stat().st_mtime_ns == layouts_mtime
+
+    def test_export_shards_with_colliding_file_names(self, tmp_path: Path) -> None:
+        graph = nx.Graph()
+        graph.add_node("First", pack_name="My Pack")
+        graph.add_node("Second", pack_name="My/Pack")
+        graph.add_node("Third", pack_name="Other")
+        manifest = Exporter(graph).export_shards(tmp_path, "JSONL", max_workers=1)
+        files = {name: shard["file"] for name, shard in manifest["shards"].items()}
+        assert len(set(files.values())) == len(files)
+        assert files["Other"] == "Other.jsonl"
+        assert all((tmp_path / file).exists() for file in files.values())
+
+    @pytest.mark.parametrize(
+        ("output_format", "file_name"),
+        [("GraphML", "graph.graphml.xz"), ("GraphML", "graph.graphml"), ("GML", "graph.gml.gz"), ("JSONL", "graph.jsonl.bz2"), ("Snapshot", "snapshot")],
+    )
+    def test_load_export(self, content_graph: ContentGraph, tmp_path: Path, output_format: str, file_name: str) -> None:
+        content_graph.custom_graph.graph["name"] = "content"
+        content_graph.export(tmp_path, output_format, file_name=file_name)
+        loaded = ContentGraph.load(tmp_path / file_name)
+        assert nx.utils.graphs_equal(loaded.custom_graph, content_graph.custom_graph)
+        with pytest.raises(ValueError, match="create_content_graph"):
+            loaded.get_reference_report()
+
+    @pytest.mark.parametrize(
+        ("output_format", "file_name"),
+        [("GraphML", "graph.graphml"), ("GML", "graph.gml"), ("JSONL", "graph.jsonl"), ("Snapshot", "snapshot")],
+    )
+    def test_export_subset(self, content_graph: ContentGraph, tmp_path: Path, output_format: str, file_name: str) -> None:
+        graph = content_graph.custom_graph
+        content_graph.export(
+            tmp_path,
+            output_format,
+            file_name=file_name,
+            node_predicate=lambda _, data: data.get("node_type") in ("Script", "Playbook"),
+            edge_predicate=lambda source, target, _: "GenericScript" not in (source, target),
+        )
+        expected = graph.subgraph(node for node, node_type in graph.nodes(data="node_type") if node_type in ("Script", "Playbook")).copy()
+        expected.remove_edges_from(list(expected.edges("GenericScript")))
+        assert nx.utils.graphs_equal(ContentGraph.load(tmp_path / file_name).custom_graph, expected)
+
+    def test_export_node_set(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        content_graph.export(tmp_path, "JSONL", nodes={"EDR_Triage", "EDR_InitialTriage", "MyOrg_Layouts"})
+        loaded = ContentGraph.load(tmp_path / "output.jsonl").custom_graph
+        assert set(loaded.nodes()) == {"EDR_Triage", "EDR_InitialTriage", "MyOrg_Layouts"}
+        assert {frozenset(edge) for edge in loaded.edges()} == {frozenset(("EDR_Triage", "EDR_InitialTriage"))}
+
+    def test_export_html_viewer(self, content_graph: ContentGraph, tmp_path: Path) -> None:
+        tmp_path = tmp_path / "export"
+        tmp_path.mkdir()
+        content_graph.compute_layout(use_cache=False)
+        content_graph.export(tmp_path, "HTML", file_name="graph.html")
+        page = (tmp_path / "graph.html").read_text()
+        payload = json.loads(re.search(r'<script id="graph-data" type="application/json">(.*?)</script>', page).group(1))
+        graph = content_graph.custom_graph
+        assert len(payload["nodes"]) == graph.number_of_nodes()
+        edges = np.frombuffer(base64.b64decode(payload["edges"]), dtype="<u4")
+        assert len(edges) == 2 * graph.number_of_edges()
+        x = np.frombuffer(base64.b64decode(payload["x"]), dtype="<f4")
+        index = payload["nodes"].index("EDR_Triage")
+        assert x[index] == pytest.approx(graph.nodes["EDR_Triage"]["x"])
+        assert dict(zip(payload["types"], payload["colors"], strict=True))["Playbook"] == NODE_PALETTE["Playbook"]
+
+    def test_exporter_does_not_import_pyplot(self) -> None:
+        # A fresh interpreter, since other tests import pyplot into this one
+        code = "import sys, xsoar_dependency_graph.exporter; sys.exit('matplotlib.pyplot' in sys.modules)"
+        subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
@@ -0,0 +1,406 @@
+import gc
+from collections.abc import Iterator
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+import pytest
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.colors import to_hex
+
+from xsoar_dependency_graph import layout
+from xsoar_dependency_graph.layout import (
+    DEFAULT_CACHE_DIR,
+    LayoutCache,
+    barnes_hut_layout,
+    barnes_hut_steps,
+    compute_layout,
+    graph_fingerprint,
+    layout_cache,
+    normalize_positions,
+    plotted_component,
+)
+from xsoar_dependency_graph.utils.level_of_detail import LevelOfDetailRenderer, ViewIndex
+from xsoar_dependency_graph.utils.plot_filter import PlotFilter
+from xsoar_dependency_graph.utils.plot_interaction import PlotInteractionHandler
+from xsoar_dependency_graph.utils.progressive_layout import ProgressiveLayout
+from xsoar_dependency_graph.visualization import (
+    NODE_PALETTE,
+    _draw_graph,
+    _legend_handles,
+    _legend_types,
+    pack_subgraph,
+    plot_graph,
+    render_graph,
+    render_packs,
+)
+from xsoar_dependency_graph.xsoar_dependency_graph import ContentGraph
+
+
+class TestClass:
+    def test_graph_fingerprint_ignores_order_and_attributes(self) -> None:
+        graph = nx.Graph([("a", "b"), ("b", "c")])
+        reordered = nx.Graph([("c", "b"), ("b", "a")])
+        reordered.nodes["a"]["node_type"] = "Script"
+        assert graph_fingerprint(graph) == graph_fingerprint(reordered)
+        reordered.add_edge("a", "c")
+        assert graph_fingerprint(graph) != graph_fingerprint(reordered)
+
+    def test_compute_layout_uses_cache(self, tmp_path: Path) -> None:
+        graph = nx.relabel_nodes(nx.karate_club_graph(), str)
+        cache = LayoutCache(tmp_path)
+        pos = compute_layout(graph, cache=cache)
+        (cached_path,) = tmp_path.glob("*.npz")
+        # Tamper with the cached positions to prove they are read back instead of recomputed
+        cache.put(cached_path.stem, {node: xy + 1 for node, xy in pos.items()})
+        cached = compute_layout(graph, cache=cache)
+        assert all(np.allclose(cached[node], pos[node] + 1) for node in graph)
+
+    def test_layout_cache_is_opt_in(self, tmp_path: Path) -> None:
+        assert layout_cache(use_cache=False) is None
+        assert layout_cache(use_cache=True).cache_dir == DEFAULT_CACHE_DIR
+        assert layout_cache(use_cache=True, cache_dir=tmp_path).cache_dir == tmp_path
+        assert layout_cache(use_cache=False, cache_dir=tmp_path) is None
+
+    def test_barnes_hut_layout_is_seeded(self) -> None:
+        graph = nx.relabel_nodes(nx.balanced_tree(3, 5), str)
+        pos = compute_layout(graph, engine="barnes-hut")
+        assert pos.keys() == set(graph.nodes())
+        assert all(np.array_equal(pos[node], xy) for node, xy in compute_layout(graph, engine="barnes-hut").items())
+        positions = np.array(list(pos.values()))
+        assert np.abs(positions).max() == 1.0
+        # Neighbours are placed closer together than nodes on average
+        edge_lengths = [np.linalg.norm(pos[u] - pos[v]) for u, v in graph.edges()]
+        assert np.mean(edge_lengths) < np.mean(np.linalg.norm(positions - positions[::-1], axis=1))
+
+    def test_compute_layout_rejects_unknown_engine(self) -> None:
+        with pytest.raises(ValueError, match="Layout engine"):
+            compute_layout(nx.Graph([("a", "b")]), engine="circular")
+
+    def test_incremental_layout_only_moves_new_nodes_and_neighbours(self) -> None:
+        graph = nx.relabel_nodes(nx.balanced_tree(3, 4), str)
+        previous_pos = compute_layout(graph)
+        graph.add_edge("1", "new")
+        graph.add_edge("new", "newer")
+        graph.remove_node("120")
+        pos = compute_layout(graph, previous_pos=previous_pos)
+        assert pos.keys() == set(graph.nodes())
+        moved = {node for node in graph if node in previous_pos and not np.array_equal(pos[node], previous_pos[node])}
+        assert moved <= {"1"}
+        assert np.linalg.norm(pos["new"] - pos["1"]) < np.linalg.norm(pos["new"] - pos["2"])
+
+    def test_incremental_layout_only_computes_forces_near_the_change(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        graph = nx.relabel_nodes(nx.grid_2d_graph(40, 40), lambda node: f"{node[0]}-{node[1]}")
+        previous_pos = compute_layout(graph, engine="barnes-hut")
+        graph.add_edge("0-0", "new")
+        repulsion_sizes = []
+        repulsion = layout._barnes_hut_repulsion
+
+        def counting_repulsion(x: np.ndarray, *args: float) -> tuple[np.ndarray, np.ndarray]:
+            repulsion_sizes.append(len(x))
+            return repulsion(x, *args)
+
+        monkeypatch.setattr(layout, "_barnes_hut_repulsion", counting_repulsion)
+        pos = compute_layout(graph, previous_pos=previous_pos)
+        assert repulsion_sizes
+        assert max(repulsion_sizes) < graph.number_of_nodes() / 10
+        assert np.linalg.norm(pos["new"] - pos["0-0"]) < np.linalg.norm(pos["new"] - pos["39-39"])
+
+    def test_hover_hit_testing_redraws_only_on_change(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.Graph([("a", "b")])
+        pos = {"a": (0.0, 0.0), "b": (1.0, 1.0)}
+        fig, ax = plt.subplots()
+        nodes = ax.scatter([0.0, 1.0], [0.0, 1.0], s=100)
+        annotation = ax.annotate("", xy=(0, 0))
+        annotation.set_visible(False)
+        handler = PlotInteractionHandler(
+            graph=graph, fig=fig, ax=ax, pos=pos, nodes=nodes, nodes_list=np.array(["a", "b"]), annotation=annotation, hover_interval=0
+        )
+        handler.connect()
+        redraws = []
+        fig.canvas.draw_idle = lambda: redraws.append(True)
+
+        def move_to(xy: tuple[float, float]) -> None:
+            x, y = ax.transData.transform(xy)
+            handler.on_hover(MouseEvent("motion_notify_event", fig.canvas, x, y))
+
+        move_to((1.0, 1.0))
+        assert annotation.get_visible()
+        assert annotation.get_text().startswith("node_name: b")
+        move_to((1.0, 1.0))
+        assert len(redraws) == 1
+        move_to((0.5, 0.5))
+        assert not annotation.get_visible()
+        # Zooming rebuilds the KD-tree for the new display coordinates
+        ax.set_xlim(-0.1, 0.1)
+        ax.set_ylim(-0.1, 0.1)
+        move_to((0.0, 0.0))
+        assert annotation.get_text().startswith("node_name: a")
+        plt.close(fig)
+
+    def test_draw_graph_uses_single_collections(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.Graph([("a", "b"), ("b", "c")])
+        nx.set_node_attributes(graph, {"a": "Script", "b": "Playbook", "c": "Unknown"}, "node_type")
+        pos = {"a": np.array([0.0, 0.0]), "b": np.array([1.0, 0.0]), "c": np.array([1.0, 1.0])}
+        fig, ax = plt.subplots()
+        nodes, edges = _draw_graph(ax, graph, pos, np.array(["a", "b", "c"]), dict.fromkeys(graph, 30))
+        assert list(ax.collections) == [edges, nodes]
+        assert len(edges.get_segments()) == 2
+        assert to_hex(nodes.get_facecolors()[0]) == to_hex(NODE_PALETTE["Script"])
+        assert [handle.get_label() for handle in _legend_handles(graph)] == ["Scripts", "Playbooks"]
+        plt.close(fig)
+
+    def test_level_of_detail_aggregates_packs_when_zoomed_out(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.Graph()
+        for pack, offset in (("PackA", 0.0), ("PackB", 10.0)):
+            graph.add_node(pack, node_type="Content Pack")
+            for index in range(3):
+                item = f"{pack}_Script{index}"
+                graph.add_node(item, node_type="Script", pack_name=pack)
+                graph.add_edge(pack, item)
+        graph.add_edge("PackA_Script0", "PackB_Script0")
+        graph.add_edge("PackA_Script1", "PackB_Script1")
+        nodes_list = np.array(list(graph.nodes()))
+        pos = {node: np.array([10.0 if node.startswith("PackB") else 0.0, float(index)]) for index, node in enumerate(nodes_list)}
+        fig, ax = plt.subplots()
+        nodes, edges = _draw_graph(ax, graph, pos, nodes_list, dict.fromkeys(graph, 30))
+        renderer = LevelOfDetailRenderer(
+            ax=ax,
+            graph=graph,
+            pos=pos,
+            nodes_list=nodes_list,
+            sizes=np.full(len(nodes_list), 30.0),
+            face_colors=np.zeros((len(nodes_list), 4)),
+            edge_colors=np.zeros((len(nodes_list), 4)),
+            nodes=nodes,
+            edges=edges,
+            pack_color=NODE_PALETTE["Content Pack"],
+            max_nodes=4,
+        )
+        renderer.connect()
+        assert renderer.aggregated
+        assert len(nodes.get_offsets()) == 2
+        assert list(edges.get_linewidths()) == [2.0]
+
+        # Hidden nodes don't count towards the super-nodes and their edges
+        sizes = nodes.get_sizes().copy()
+        renderer.node_alpha = np.array([0.0 if node in ("PackA_Script0", "PackA_Script1") else 1.0 for node in nodes_list])
+        renderer.update()
+        assert renderer.aggregated
+        assert nodes.get_sizes()[0] < sizes[0]
+        assert len(edges.get_segments()) == 0
+        renderer.node_alpha = None
+        renderer.update()
+
+        # Zooming in on PackA shows its items only, updating once on the next draw
+        updates = []
+        update = renderer.update
+        renderer.update = lambda *args: updates.append(update(*args))
+        ax.set_xlim(-1, 1)
+        ax.set_ylim(-1, 3.5)
+        assert renderer.stale
+        assert not updates
+        fig.canvas.draw()
+        assert len(updates) == 1
+        assert not renderer.aggregated
+        assert len(nodes.get_offsets()) == 4
+        plt.close(fig)
+
+    def test_view_index_matches_a_full_scan(self) -> None:
+        rng = np.random.default_rng(0)
+        xy = rng.random((500, 2))
+        edge_index = rng.integers(0, 500, size=(800, 2))
+        view_index = ViewIndex(xy, edge_index)
+        inside = (xy[:, 0] >= 0.2) & (xy[:, 0] <= 0.5) & (xy[:, 1] >= 0.1) & (xy[:, 1] <= 0.3)
+        visible = view_index.points_in((0.5, 0.2), (0.1, 0.3))
+        assert visible.tolist() == np.flatnonzero(inside).tolist()
+        touching = inside[edge_index[:, 0]] | inside[edge_index[:, 1]]
+        assert view_index.edges_touching(visible).tolist() == np.flatnonzero(touching).tolist()
+
+    def test_plot_filter_hides_node_types_and_highlights_neighbours(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.Graph([("a", "b"), ("b", "c"), ("c", "d")])
+        nx.set_node_attributes(graph, {"a": "Script", "b": "Playbook", "c": "Script", "d": "Playbook"}, "node_type")
+        nodes_list = np.array(["a", "b", "c", "d"])
+        pos = {node: np.array([float(index), 0.0]) for index, node in enumerate(nodes_list)}
+        fig, ax = plt.subplots()
+        nodes, edges = _draw_graph(ax, graph, pos, nodes_list, dict.fromkeys(graph, 100))
+        legend = ax.legend(handles=_legend_handles(graph))
+        annotation = ax.annotate("", xy=(0, 0))
+        handler = PlotInteractionHandler(
+            graph=graph, fig=fig, ax=ax, pos=pos, nodes=nodes, nodes_list=nodes_list, annotation=annotation
+        )
+        plot_filter = PlotFilter(
+            fig=fig,
+            ax=ax,
+            graph=graph,
+            nodes_list=nodes_list,
+            nodes=nodes,
+            edges=edges,
+            face_colors=nodes.get_facecolors().copy(),
+            edge_colors=nodes.get_edgecolors().copy(),
+            legend=legend,
+            legend_types=_legend_types(graph),
+            handler=handler,
+        )
+        assert sorted(plot_filter.neighbours(1).tolist()) == [0, 2]
+
+        def click(node: str, key: str | None = "shift") -> MouseEvent:
+            x, y = ax.transData.transform(pos[node])
+            return MouseEvent("button_press_event", fig.canvas, x, y, button=1, key=key)
+
+        # A plain click pins the annotation of "b" without highlighting
+        handler.on_click(click("b", key=None))
+        plot_filter.on_click(click("b", key=None))
+        assert list(handler.pinned_annotations) == ["b"]
+        assert plot_filter.highlighted is None
+
+        # Shift-clicking "b" only highlights it, dimming "d" and the edge between "c" and "d"
+        handler.on_click(click("b"))
+        plot_filter.on_click(click("b"))
+        assert list(handler.pinned_annotations) == ["b"]
+        assert plot_filter.highlighted == 1
+        assert list(nodes.get_facecolors()[:, 3] < 1) == [False, False, False, True]
+        assert edges.get_colors()[2, 3] < edges.get_colors()[0, 3]
+
+        # Hiding the playbooks hides their edges and excludes them from hit-testing
+        plot_filter.highlighted = None
+        plot_filter.on_pick(type("PickEvent", (), {"artist": legend.get_texts()[1]})())
+        assert plot_filter.hidden_types == {"Playbook"}
+        assert list(nodes.get_facecolors()[:, 3]) == [1.0, 0.0, 1.0, 0.0]
+        assert not edges.get_colors()[:, 3].any()
+        assert handler.node_at(click("b")) is None
+        assert handler.node_at(click("c")) == "c"
+        plt.close(fig)
+
+    def test_plot_graph_keeps_legend_and_click_handlers_connected(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.Graph()
+        graph.add_node("a", node_type="Script")
+        graph.add_node("b", node_type="Playbook")
+        graph.add_node("c", node_type="Script")
+        graph.add_edges_from([("a", "b"), ("b", "c")])
+        pos = plot_graph(graph)
+        gc.collect()
+        fig = plt.gcf()
+        ax = fig.axes[0]
+        fig.canvas.draw()
+
+        def click(xy: tuple[float, float], key: str | None = None) -> None:
+            fig.canvas.callbacks.process("button_press_event", MouseEvent("button_press_event", fig.canvas, *xy, button=1, key=key))
+
+        # Clicking a legend entry picks it and hides its node type
+        text = ax.get_legend().get_texts()[1]
+        click(text.get_window_extent().get_points().mean(axis=0))
+        assert text.get_alpha() == 0.3
+
+        # Clicks with other modifier keys than the highlight key still pin annotations
+        click(ax.transData.transform(pos["a"]), key="control")
+        assert list(fig.plot_filter.handler.pinned_annotations) == ["a"]
+        plt.close(fig)
+
+    def test_progressive_layout_streams_barnes_hut_steps(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.relabel_nodes(nx.grid_2d_graph(12, 12), lambda node: f"{node[0]}_{node[1]}")
+        nodes_list = np.array(list(graph.nodes()))
+        steps = list(barnes_hut_steps(graph, min_coarse_nodes=20))
+        assert len({len(np.unique(xy, axis=0)) for xy in steps}) > 1  # coarse levels share positions
+        expected = barnes_hut_layout(graph, min_coarse_nodes=20)
+        assert np.allclose(normalize_positions(steps[-1]), [expected[node] for node in nodes_list])
+
+        fig, ax = plt.subplots()
+        pos = dict(zip(nodes_list, normalize_positions(steps[0]), strict=True))
+        nodes, edges = _draw_graph(ax, graph, pos, nodes_list, dict.fromkeys(graph, 30))
+        annotation = ax.annotate("", xy=(0, 0))
+        handler = PlotInteractionHandler(graph=graph, fig=fig, ax=ax, pos=pos, nodes=nodes, nodes_list=nodes_list, annotation=annotation)
+        finished = []
+        progressive = ProgressiveLayout(
+            fig=fig,
+            ax=ax,
+            graph=graph,
+            steps=iter(steps),
+            nodes_list=nodes_list,
+            nodes=nodes,
+            edges=edges,
+            handler=handler,
+            pos=pos,
+            on_finish=finished.append,
+        )
+        progressive.connect()
+        progressive.wait()
+        progressive.on_frame()
+        assert progressive.finished
+        assert np.allclose(nodes.get_offsets(), normalize_positions(steps[-1]))
+        (final_pos,) = finished
+        assert isinstance(final_pos, dict)
+        assert all(np.array_equal(final_pos[node], progressive.pos[node]) for node in nodes_list)
+        assert handler.pos is progressive.pos
+
+        # Stopping early keeps the positions shown so far and doesn't report a finished layout
+        def endless() -> Iterator[np.ndarray]:
+            while True:
+                yield steps[0]
+
+        stopped = ProgressiveLayout(
+            fig=fig, ax=ax, graph=graph, steps=endless(), nodes_list=nodes_list, nodes=nodes, edges=edges, handler=handler, pos=pos
+        )
+        stopped.on_finish = finished.append
+        stopped.connect()
+        stopped.on_key(type("KeyEvent", (), {"key": "enter"})())
+        stopped.wait()
+        stopped.on_frame()
+        assert not stopped.finished
+        assert len(finished) == 1
+        plt.close(fig)
+
+    def test_progressive_plot_runs_layout_to_completion_on_non_blocking_backends(self) -> None:
+        plt.switch_backend("Agg")
+        graph = nx.relabel_nodes(nx.grid_2d_graph(12, 12), lambda node: f"{node[0]}_{node[1]}")
+        pos = plot_graph(graph, progressive=True)
+        expected = barnes_hut_layout(graph)
+        assert all(np.allclose(pos[node], expected[node]) for node in graph)
+        plt.close("all")
+
+    def test_render_packs_writes_one_image_per_pack(self, shared_datadir: Path, tmp_path: Path) -> None:
+        content_graph = ContentGraph(repo_path=shared_datadir / "mock_content_repo")
+        content_graph.create_content_graph(pack_paths=None)
+        output_path = tmp_path / "images"
+        written = content_graph.render_packs(output_path, output_format="svg", max_workers=2, use_cache=True, cache_dir=tmp_path / "layouts")
+        assert len(list((tmp_path / "layouts").glob("*.npz"))) == len(written)
+        assert set(written) == {"MyOrg_Layouts", "MyOrg_CommonScripts", "MyOrg_CommonPlaybooks", "MyOrg_EDR"}
+        assert all(path.parent == output_path and path.read_text().lstrip().startswith("<?xml") for path in written.values())
+        png = render_graph(pack_subgraph(content_graph.custom_graph, "MyOrg_EDR"), tmp_path / "edr.png", use_cache=False)
+        assert png.read_bytes().startswith(b"\x89PNG")
+        with pytest.raises(ValueError, match="Output format"):
+            content_graph.render_packs(output_path, output_format="pdf")
+
+    def test_render_packs_with_colliding_file_names(self, tmp_path: Path) -> None:
+        graph = nx.Graph()
+        graph.add_node("My Pack", node_type="Content Pack")
+        graph.add_node("My/Pack", node_type="Content Pack")
+        graph.add_edge("My Pack", "First")
+        graph.add_edge("My/Pack", "Second")
+        written = render_packs(graph, tmp_path, output_format="svg", max_workers=1)
+        assert len(set(written.values())) == 2
+        assert all(path.exists() for path in written.values())
+
+    def test_component_layout_packs_all_components(self) -> None:
+        graph = nx.disjoint_union_all([nx.balanced_tree(2, 6), nx.balanced_tree(3, 4), nx.path_graph(3), nx.empty_graph(2)])
+        graph = nx.relabel_nodes(graph, str)
+        pos = compute_layout(graph, engine="barnes-hut", per_component=True, max_workers=2)
+        assert pos.keys() == set(graph.nodes())
+        positions = np.array(list(pos.values()))
+        assert np.abs(positions).max() == pytest.approx(1.0)
+        # Bounding boxes of the components don't overlap
+        boxes = []
+        for component in nx.connected_components(graph):
+            xy = np.array([pos[node] for node in component])
+            boxes.append((xy.min(axis=0), xy.max(axis=0)))
+        for index, (low, high) in enumerate(boxes):
+            for other_low, other_high in boxes[index + 1 :]:
+                assert (high < other_low).any() or (other_high < low).any()
+        assert plotted_component(graph).number_of_nodes() == 127